@@ -1,9 +1,16 @@
-from fastapi import APIRouter, HTTPException, Request
-from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, HTTPException, Request, Query, WebSocket
+from typing import Optional, List, Dict, Any, Literal
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import json
 import logging
 from config import settings
-from ...services.chatService import ChatService
+from ...services.chatChannel import create_chat_channel
+from ...services.chatService import get_chat_service
+from ...services.executors import io_pool
+from ...services.llmGateway import LLMGatewayError
+from ...services.ttsService import sentences_from_tokens, stream_speech
+from .speechRoutes import audio_file_response
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,62 +19,176 @@ logger = logging.getLogger(__name__)
 # Initialize router
 router = APIRouter(tags=["chat"])
 
-# Initialize chat service
-chat_service = ChatService()
-
 # Request models
 class TextRequest(BaseModel):
     query: str
     session_id: Optional[str] = None
     output_as_voice: bool = False
+    # "full" returns every message, "delta" only those after last_index, "none" just the count
+    history_mode: Literal["full", "delta", "none"] = "full"
+    last_index: Optional[int] = None
 
 class EditRequest(BaseModel):
     session_id: str
     message_index: int
     new_content: str
+    history_mode: Literal["full", "delta", "none"] = "full"
+
+class RegenerateRequest(EditRequest):
+    # Delta responses start at the edited message unless given
+    last_index: Optional[int] = None
 
 class DeleteSessionRequest(BaseModel):
     session_id: str
 
 @router.get("/chat-sessions/")
-async def get_chat_sessions():
-    """Get all chat sessions"""
+async def get_chat_sessions(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    sort: Literal["created", "last_activity"] = "created",
+    order: Literal["asc", "desc"] = "asc"
+):
+    """Get a page of chat sessions"""
+    chat_service = get_chat_service()
     return {
-        "sessions": chat_service.get_chat_sessions()
+        "sessions": await io_pool.run(chat_service.get_chat_sessions, offset, limit, sort, order),
+        "total": await io_pool.run(chat_service.count_chat_sessions)
     }
 
+@router.get("/chat-history/{session_id}")
+async def get_chat_history(
+    session_id: str,
+    offset: Optional[int] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Get a page of messages from a chat session"""
+    try:
+        return await io_pool.run(get_chat_service().get_history_page, session_id, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/chat-history/{session_id}/messages/{message_index}/audio")
+async def get_message_audio(session_id: str, message_index: int, http_request: Request):
+    """Serve a message spoken aloud (the audio_url of voice responses)"""
+    try:
+        key, path = await get_chat_service().message_audio(session_id, message_index)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error generating speech: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Failed to generate speech: {str(e)}")
+    # Editing the message changes its audio, so revalidate by ETag instead of caching for good
+    return await audio_file_response(http_request, key, path, cache_control="no-cache")
+
 @router.post("/text-query/")
 async def text_query(request: TextRequest):
     """Process a text query and return response"""
     try:
         logger.info(f"Received text query: {request.query}")
-        response_data = chat_service.process_text_query(
+        response_data = await get_chat_service().process_text_query(
             query=request.query,
             session_id=request.session_id,
-            output_as_voice=request.output_as_voice
+            output_as_voice=request.output_as_voice,
+            history_mode=request.history_mode,
+            last_index=request.last_index
         )
         return response_data
+    except LLMGatewayError as e:
+        logger.error(f"Upstream error processing text query: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=f"Error processing query: {e.message}", headers=e.http_headers())
     except Exception as e:
         logger.error(f"Error processing text query: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
+def encode_event(event: Dict[str, Any], stream_format: str) -> str:
+    """Encode one stream event as an SSE frame or an NDJSON line"""
+    if stream_format == "ndjson":
+        return json.dumps(event, ensure_ascii=False) + "\n"
+    data = json.dumps({k: v for k, v in event.items() if k != "event"}, ensure_ascii=False)
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+@router.post("/text-query/stream")
+async def text_query_stream(request: TextRequest, format: Literal["sse", "ndjson"] = "sse"):
+    """Process a text query and stream the answer tokens as they are generated"""
+    logger.info(f"Received streaming text query: {request.query}")
+
+    async def event_stream():
+        async for event in get_chat_service().stream_text_query(query=request.query, session_id=request.session_id):
+            yield encode_event(event, format)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        event_stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/edit-message/")
 async def edit_message(request: EditRequest):
     """Edit a message in chat history"""
     try:
         logger.info(f"Edit request: {request.dict()}")
-        return chat_service.edit_message(
-            session_id=request.session_id,
-            message_index=request.message_index,
-            new_content=request.new_content
+        # Journal writes may wait on an fsync; keep them off the event loop
+        return await io_pool.run(
+            get_chat_service().edit_message,
+            request.session_id,
+            request.message_index,
+            request.new_content,
+            request.history_mode
+        )
+    except ValueError as e:
+        logger.error(f"Edit error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Edit error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error editing message: {str(e)}")
+
+@router.post("/edit-message/regenerate")
+async def edit_and_regenerate(request: RegenerateRequest):
+    """Edit a user message and replace everything after it with a freshly generated answer"""
+    try:
+        logger.info(f"Edit and regenerate request: {request.dict()}")
+        return await get_chat_service().edit_and_regenerate(
+            request.session_id,
+            request.message_index,
+            request.new_content,
+            request.history_mode,
+            request.last_index
         )
     except ValueError as e:
         logger.error(f"Edit error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
+    except LLMGatewayError as e:
+        logger.error(f"Upstream error regenerating answer: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=f"Error processing query: {e.message}", headers=e.http_headers())
     except Exception as e:
         logger.error(f"Edit error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error editing message: {str(e)}")
 
+@router.post("/edit-message/regenerate/stream")
+async def edit_and_regenerate_stream(request: EditRequest, format: Literal["sse", "ndjson"] = "sse"):
+    """Edit a user message and stream the regenerated answer as it is generated"""
+    logger.info(f"Streaming edit and regenerate request: {request.dict()}")
+    events = get_chat_service().stream_edit_and_regenerate(request.session_id, request.message_index, request.new_content)
+    # Validation happens before the first event; fail with a status code rather than mid-stream
+    try:
+        first = await events.__anext__()
+    except ValueError as e:
+        logger.error(f"Edit error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def event_stream():
+        yield encode_event(first, format)
+        async for event in events:
+            yield encode_event(event, format)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        event_stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/voice-query/")
 async def voice_query(request: TextRequest):
     """Process a voice query"""
@@ -76,12 +197,42 @@ async def voice_query(request: TextRequest):
     request.output_as_voice = True
     return await text_query(request)
 
+@router.post("/voice-query/stream")
+async def voice_query_stream(request: TextRequest):
+    """Process a voice query and stream the spoken answer while it is being generated"""
+    logger.info(f"Received streaming voice query: {request.query}")
+    chat_service = get_chat_service()
+    session_id, _ = await io_pool.run(chat_service.get_chat_history, request.session_id)
+    language = chat_service.detect_language(request.query)
+
+    async def answer_tokens():
+        # A new session must keep the id already sent in X-Session-Id
+        async for event in chat_service.stream_text_query(query=request.query, session_id=request.session_id, new_session_id=session_id):
+            if event["event"] == "token":
+                yield event["content"]
+            elif event["event"] == "done" and "session_id" not in event:
+                # Refusals arrive as a single closing event
+                yield event["text_response"]
+            elif event["event"] == "error":
+                logger.error(f"Streaming voice query failed: {event['detail']}")
+
+    return StreamingResponse(
+        stream_speech(sentences_from_tokens(answer_tokens()), language),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Session-Id": session_id}
+    )
+
+@router.websocket("/chat/ws")
+async def chat_socket(websocket: WebSocket, session_id: Optional[str] = None):
+    """Persistent chat channel: queries, edits and cancels in; tokens, answers and audio frames out"""
+    await create_chat_channel(websocket, get_chat_service(), session_id).run()
+
 @router.delete("/chat-session/")
 async def delete_chat_session(request: DeleteSessionRequest):
     """Delete a chat session"""
     try:
         logger.info(f"Delete session request: {request.session_id}")
-        result = chat_service.delete_chat_session(session_id=request.session_id)
+        result = await io_pool.run(get_chat_service().delete_chat_session, request.session_id)
         return {"status": "success", "message": "Chat session deleted successfully"}
     except ValueError as e:
         logger.error(f"Delete error: {str(e)}")
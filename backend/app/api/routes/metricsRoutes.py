@@ -0,0 +1,77 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from typing import Dict
+from ...services.chatService import session_cache_stats
+from ...services.executors import executor_stats
+from ...services.languageDetector import detect_language
+from ...services.metrics import CONTENT_TYPE, Labels, register_callback, registry
+from ...services.translationService import translation_cache, translation_flight
+from ...services.ttsService import audio_cache, tts_flight
+from ...services.upstreamScheduler import upstream_scheduler
+
+router = APIRouter(tags=["metrics"])
+
+CACHE_EVENTS = ("hits", "disk_hits", "misses", "evictions", "expirations", "bypasses")
+
+def cache_events() -> Dict[Labels, float]:
+    """Hit/miss/eviction counters of every cache"""
+    values: Dict[Labels, float] = {}
+    caches = (
+        ("translation", translation_cache.get_stats()),
+        ("tts_audio", audio_cache.get_stats()),
+        ("chat_sessions", session_cache_stats())
+    )
+    for cache, stats in caches:
+        for event in CACHE_EVENTS:
+            if event in stats:
+                values[(cache, event)] = stats[event]
+    info = detect_language.cache_info()
+    values[("language_detect", "hits")] = info.hits
+    values[("language_detect", "misses")] = info.misses
+    return values
+
+def cache_entries() -> Dict[Labels, float]:
+    return {
+        ("translation",): translation_cache.get_stats()["entries"],
+        ("tts_audio",): audio_cache.get_stats()["entries"],
+        ("chat_sessions",): session_cache_stats().get("entries"),
+        ("language_detect",): detect_language.cache_info().currsize
+    }
+
+def single_flight_calls() -> Dict[Labels, float]:
+    values: Dict[Labels, float] = {}
+    for flight in (translation_flight, tts_flight):
+        for result in ("executions", "coalesced"):
+            values[(flight.name, result)] = flight.stats[result]
+    return values
+
+def executor_values(key: str) -> Dict[Labels, float]:
+    return {(pool,): stats[key] for pool, stats in executor_stats().items()}
+
+def upstream_values(key: str) -> Dict[Labels, float]:
+    return {(model,): stats[key] for model, stats in upstream_scheduler.get_stats()["models"].items()}
+
+register_callback("inclusive_cache_events_total", "Cache lookups and evictions", "counter", ["cache", "event"], cache_events)
+register_callback("inclusive_cache_entries", "Entries held per cache", "gauge", ["cache"], cache_entries)
+register_callback("inclusive_chat_session_cache_bytes", "Approximate memory held by cached chat sessions", "gauge", [], lambda: {
+    (): session_cache_stats().get("bytes")
+})
+register_callback("inclusive_single_flight_calls_total", "Calls that ran versus joined an identical in-flight call", "counter", ["flight", "result"], single_flight_calls)
+register_callback("inclusive_executor_queue_depth", "Blocking jobs waiting for a worker", "gauge", ["pool"], lambda: executor_values("queue_depth"))
+register_callback("inclusive_executor_active", "Blocking jobs running", "gauge", ["pool"], lambda: executor_values("active"))
+register_callback("inclusive_executor_failed_total", "Blocking jobs that raised", "counter", ["pool"], lambda: executor_values("failed"))
+register_callback("inclusive_upstream_in_flight", "Admitted upstream LLM calls in flight", "gauge", ["model"], lambda: upstream_values("in_flight"))
+register_callback("inclusive_upstream_waiting", "Upstream LLM calls queued for admission", "gauge", ["model"], lambda: upstream_values("waiting"))
+register_callback("inclusive_upstream_shed_total", "Upstream LLM calls rejected by load shedding", "counter", ["model"], lambda: upstream_values("shed"))
+register_callback("inclusive_upstream_breaker_rejections_total", "Upstream LLM calls rejected by an open circuit breaker", "counter", ["model"], lambda: upstream_values("breaker_rejections"))
+register_callback("inclusive_upstream_breaker_open", "1 while the model's circuit breaker is open", "gauge", ["model"], lambda: {
+    labels: int(value) for labels, value in upstream_values("breaker_open").items()
+})
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics: stage and upstream latency histograms, cache,
+    executor and admission counters, and token usage.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from gtts import gTTS
-import tempfile
-import os
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Literal, Optional, Tuple
+import json
 import logging
+from python_multipart.multipart import MultipartParser, parse_options_header
+from config import settings
+from ...services.executors import executor_stats, read_file
+from ...services.llmGateway import LLMGatewayError
+from ...services.speechPipeline import SpeechPipeline
+from ...services.startup import timed
+from ...services.ttsService import get_or_synthesize, tts_stats, split_sentences, stream_speech, wait_for_audio
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,62 +19,407 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Unprefixed legacy endpoints, mounted at the application root
+legacy_router = APIRouter(tags=["speech"])
+
+# Content-addressed audio never changes for a given key
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 class SpeakRequest(BaseModel):
     text: str
     language: str = "en"
+    slow: bool = False
 
-@router.post("/text-to-speech")
-async def text_to_speech(request: SpeakRequest):
+SPEECH_LANGUAGES = ['en', 'hi', 'te', 'kn', 'ta']
+
+def speech_language(language: str) -> str:
     """
-    Generate speech audio for the given text using gTTS.
+    Accept language names ("Hindi") as well as codes ("hi").
+    """
+    return settings.LANGUAGE_CODES.get(language, language)
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header into an inclusive (start, end) pair.
+    Returns None if the range is malformed or unsatisfiable.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_str, _, end_str = spec.strip().partition("-")
+    try:
+        if not start_str:
+            # Suffix range: the last N bytes
+            length = int(end_str)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+        start = int(start_str)
+        end = int(end_str) if end_str else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+async def audio_file_response(
+    request: Request,
+    key: str,
+    path: str,
+    cache_control: str = AUDIO_CACHE_CONTROL
+) -> Response:
+    """
+    Serve cached audio with a strong ETag, If-None-Match revalidation and Range support.
+    """
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": 'attachment; filename="output.mp3"'
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    # Read eagerly (on the I/O pool) so a concurrent eviction cannot break the response
+    data = await read_file(path)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(range_header, len(data))
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{len(data)}"})
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        return Response(data[start:end + 1], status_code=206, media_type="audio/mpeg", headers=headers)
+
+    return Response(data, media_type="audio/mpeg", headers=headers)
+
+def validate_speech_request(text: str, language: str) -> str:
+    """
+    Validate text and language code for synthesis; returns the stripped text.
     """
-    text = request.text.strip()
-    language = request.language
-    
+    text = text.strip()
+
     if not text:
         logger.error("No text provided for speech generation")
         raise HTTPException(status_code=400, detail="No text provided")
-    
-    if language not in ['en', 'hi', 'te', 'kn', 'ta']:
+
+    if language not in SPEECH_LANGUAGES:
         logger.warning(f"Unsupported language code: {language}")
         raise HTTPException(status_code=400, detail=f"Language '{language}' is not supported for speech")
 
-    logger.info(f"Generating speech for text: '{text}' in language: {language}")
-    
-    temp_file_path = None
+    return text
+
+async def synthesize_response(request: Request, text: str, language: str, slow: bool = False) -> Response:
+    """
+    Validate a speech request, synthesize (or reuse cached) audio and serve it.
+    """
+    text = validate_speech_request(text, language)
+
+    try:
+        key, path = await get_or_synthesize(text, language, slow)
+    except Exception as e:
+        logger.error(f"Error generating speech: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate speech: {str(e)}")
+    return await audio_file_response(request, key, path)
+
+@router.post("/text-to-speech")
+async def text_to_speech(request: SpeakRequest, http_request: Request):
+    """
+    Generate speech audio for the given text using gTTS.
+    """
+    return await synthesize_response(http_request, request.text, speech_language(request.language), request.slow)
+
+@router.post("/speak")
+async def speak(request: SpeakRequest, http_request: Request):
+    """
+    Alias of text-to-speech.
+    """
+    return await text_to_speech(request, http_request)
+
+@legacy_router.post("/speak")
+async def speak_legacy(request: SpeakRequest, http_request: Request):
+    """
+    Legacy endpoint for speech generation.
+    """
+    return await text_to_speech(request, http_request)
+
+def streaming_speech_response(text: str, language: str, slow: bool = False) -> StreamingResponse:
+    """
+    Stream audio sentence by sentence; playback can begin after the first one is synthesized.
+    """
+    text = validate_speech_request(text, language)
+    return StreamingResponse(
+        stream_speech(split_sentences(text), language, slow),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/text-to-speech/stream")
+async def text_to_speech_stream(request: SpeakRequest):
+    """
+    Generate speech audio as a chunked stream, synthesizing sentences in parallel.
+    """
+    return streaming_speech_response(request.text, speech_language(request.language), request.slow)
+
+@router.get("/text-to-speech")
+async def text_to_speech_get(http_request: Request, text: str, language: str = "en", slow: bool = False):
+    """
+    Cacheable GET variant of text-to-speech.
+    """
+    return await synthesize_response(http_request, text, speech_language(language), slow)
+
+@router.get("/audio/{audio_id}")
+async def get_audio(audio_id: str, http_request: Request):
+    """
+    Serve synthesized audio by its content key, waiting for it if it is still being synthesized.
+    """
     try:
-        # Generate speech using gTTS
-        tts = gTTS(text=text, lang=language, slow=False)
-        
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-            temp_file_path = temp_file.name
-            tts.save(temp_file_path)
-            logger.info(f"Audio saved to temporary file: {temp_file_path}")
-        
-        # Define cleanup callback
-        async def cleanup():
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    logger.info(f"Cleaned up temporary file: {temp_file_path}")
-                except Exception as e:
-                    logger.error(f"Failed to clean up temporary file: {str(e)}")
-
-        # Return FileResponse with cleanup callback
-        return FileResponse(
-            temp_file_path,
-            media_type="audio/mpeg",
-            filename="output.mp3",
-            background=cleanup
-        )
+        path = await wait_for_audio(audio_id) if audio_id.isalnum() else None
     except Exception as e:
         logger.error(f"Error generating speech: {str(e)}")
-        # Clean up if file was created
-        if temp_file_path and os.path.exists(temp_file_path):
+        raise HTTPException(status_code=503, detail=f"Failed to generate speech: {str(e)}")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return await audio_file_response(http_request, audio_id, path)
+
+@router.get("/text-to-speech/cache-stats")
+async def tts_cache_stats():
+    """
+    Get audio cache and request-coalescing counters.
+    """
+    return tts_stats()
+
+@router.get("/executor-stats")
+async def get_executor_stats():
+    """
+    Get queue depth and wait-time metrics for the blocking-work executor pools.
+    """
+    return executor_stats()
+
+async def read_audio_upload(request: Request) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Read an uploaded recording into memory, either as the raw request body or
+    as the "file" part of a multipart form. The body is parsed as it streams
+    in, so nothing is spooled to temporary files. Returns the audio bytes and
+    any other (text) form fields.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    received = 0
+
+    def check_size(size: int) -> None:
+        if size > settings.STT_MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Audio upload too large")
+
+    if content_type != b"multipart/form-data":
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            check_size(len(body))
+        return bytes(body), {}
+
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=400, detail="Missing multipart boundary")
+
+    parts = []
+    current: Dict = {}
+    header = [bytearray(), bytearray()]
+
+    def on_part_begin() -> None:
+        current.clear()
+        current.update(headers={}, data=bytearray())
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header[0] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header[1] += data[start:end]
+
+    def on_header_end() -> None:
+        current["headers"][bytes(header[0]).lower()] = bytes(header[1])
+        header[0].clear()
+        header[1].clear()
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        current["data"] += data[start:end]
+
+    def on_part_end() -> None:
+        _, disposition = parse_options_header(current["headers"].get(b"content-disposition", b""))
+        parts.append((disposition.get(b"name", b"").decode(), b"filename" in disposition, current["data"]))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+    async for chunk in request.stream():
+        received += len(chunk)
+        check_size(received)
+        parser.write(chunk)
+    parser.finalize()
+
+    audio = b""
+    fields: Dict[str, str] = {}
+    for name, is_file, data in parts:
+        if name == "file" or (is_file and not audio):
+            audio = bytes(data)
+        elif not is_file:
+            fields[name] = data.decode("utf-8", errors="replace")
+    return audio, fields
+
+@lru_cache(maxsize=None)
+def load_stt() -> Tuple[Any, Any]:
+    """
+    Import the speech-to-text stack (speech_recognition and sttService) on
+    first use; returns (speech_recognition, sttService).
+    """
+    with timed("speech_recognition"):
+        import speech_recognition
+        from ...services import sttService
+    return speech_recognition, sttService
+
+async def speech_to_text_response(request: Request, language: str = "en") -> Dict:
+    """
+    Transcribe an uploaded recording (raw body or multipart "file" part).
+    A multipart "language" field overrides the language argument.
+    """
+    audio, fields = await read_audio_upload(request)
+    if not audio:
+        raise HTTPException(status_code=400, detail="No audio provided")
+
+    language = fields.get("language", language)
+    language = speech_language(language)
+    if language not in SPEECH_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Language '{language}' is not supported for speech")
+
+    sr, stt = load_stt()
+    try:
+        return await stt.transcribe(audio, language)
+    except stt.AudioDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except sr.RequestError as e:
+        logger.error(f"Speech recognition service error: {str(e)}")
+        raise HTTPException(status_code=502, detail=f"Speech recognition failed: {str(e)}")
+
+@router.post("/speech-to-text")
+async def speech_to_text(http_request: Request, language: str = "en"):
+    """
+    Transcribe speech. Send WAV, AIFF or FLAC as the raw request body or as a
+    multipart "file" part; long recordings are split on silence and the
+    chunks recognized in parallel.
+    """
+    return await speech_to_text_response(http_request, language)
+
+def speech_pipeline_error(e: Exception, sr: Any, stt: Any) -> HTTPException:
+    """
+    Map a failed speech-to-speech stage to an HTTP error.
+    """
+    if isinstance(e, stt.AudioDecodeError):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, sr.RequestError):
+        logger.error(f"Speech recognition service error: {str(e)}")
+        return HTTPException(status_code=502, detail=f"Speech recognition failed: {str(e)}")
+    if isinstance(e, LLMGatewayError):
+        logger.error(f"Translation error: {e.message}")
+        return HTTPException(status_code=e.status_code, detail=f"Translation failed: {e.message}", headers=e.http_headers())
+    logger.error(f"Error generating speech: {str(e)}")
+    return HTTPException(status_code=500, detail=f"Failed to generate speech: {str(e)}")
+
+@router.post("/speech-to-speech")
+async def speech_to_speech(
+    http_request: Request,
+    source_language: str = "en",
+    target_language: str = "hi",
+    slow: bool = False,
+    format: Literal["json", "ndjson", "audio"] = "json"
+):
+    """
+    Translate speech into speech in one round trip. Send the recording as
+    for speech-to-text; multipart "source_language" and "target_language"
+    fields override the query parameters. Each chunk of the recording is
+    translated and synthesized as soon as it is recognized, while later
+    chunks are still being recognized.
+
+    format=json returns the transcript, the translation and every segment
+    with its audio_url and stage timings; ndjson streams one "segment"
+    event per chunk as it is ready, then a "done" event with the timings;
+    audio streams the translated speech as MP3.
+    """
+    audio, fields = await read_audio_upload(http_request)
+    if not audio:
+        raise HTTPException(status_code=400, detail="No audio provided")
+
+    source = speech_language(fields.get("source_language", source_language))
+    target = speech_language(fields.get("target_language", target_language))
+    for language in (source, target):
+        if language not in SPEECH_LANGUAGES:
+            raise HTTPException(status_code=400, detail=f"Language '{language}' is not supported for speech")
+
+    sr, stt = load_stt()
+    pipeline = SpeechPipeline(source, target, slow)
+    segments = pipeline.run(audio)
+
+    # Wait for the first segment, so a bad upload or failed stage is still an HTTP error
+    try:
+        first = await segments.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except Exception as e:
+        raise speech_pipeline_error(e, sr, stt)
+
+    async def results() -> AsyncIterator[Tuple[Dict[str, Any], str]]:
+        if first is None:
+            return
+        yield first
+        async for result in segments:
+            yield result
+
+    def with_url(segment: Dict[str, Any]) -> Dict[str, Any]:
+        return {**segment, "audio_url": f"{settings.API_V1_STR}/audio/{segment['audio_id']}"}
+
+    if format == "json":
+        collected = []
+        try:
+            async for segment, _ in results():
+                collected.append(with_url(segment))
+        except Exception as e:
+            raise speech_pipeline_error(e, sr, stt)
+        return {
+            "text": " ".join(segment["text"] for segment in collected),
+            "translation": " ".join(segment["translation"] for segment in collected),
+            "source_language": source,
+            "target_language": target,
+            "segments": collected,
+            **pipeline.summary()
+        }
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if format == "audio":
+        async def speech() -> AsyncIterator[bytes]:
             try:
-                os.unlink(temp_file_path)
-                logger.info(f"Cleaned up temporary file on error: {temp_file_path}")
-            except Exception:
-                pass
-        raise HTTPException(status_code=500, detail=f"Failed to generate speech: {str(e)}") 
\ No newline at end of file
+                async for _, path in results():
+                    yield await read_file(path)
+            except Exception as e:
+                # Headers are gone; end the stream early
+                logger.error(f"Speech-to-speech failed mid-stream: {str(e)}")
+        return StreamingResponse(speech(), media_type="audio/mpeg", headers=headers)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for segment, _ in results():
+                yield json.dumps({"event": "segment", **with_url(segment)}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            error = speech_pipeline_error(e, sr, stt)
+            yield json.dumps({"event": "error", "detail": error.detail}, ensure_ascii=False) + "\n"
+            return
+        yield json.dumps({"event": "done", "source_language": source, "target_language": target, **pipeline.summary()}, ensure_ascii=False) + "\n"
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers=headers)
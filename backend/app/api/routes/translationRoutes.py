@@ -1,95 +1,79 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-import requests
+from pydantic import BaseModel, Field
 import logging
 from typing import List
-import os
-from dotenv import load_dotenv
+from config import settings
+from ...services.llmGateway import LLMGatewayError
+from ...services.translationService import translate_batch, translate_text, translation_stats
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
 router = APIRouter()
 
-# Groq API configuration
-GROQ_API_KEY = os.getenv('GROQ_API_KEY');
-GROQ_API_URL = os.getenv('GROQ_API_URL');
-
 class TranslationRequest(BaseModel):
     text: str
     source_language: str
     target_language: str
+    bypass_cache: bool = False
 
 class TranslationResponse(BaseModel):
     translated_text: str
 
+class BatchTranslationRequest(BaseModel):
+    segments: List[str] = Field(..., max_length=500)
+    source_language: str
+    target_languages: List[str] = Field(..., min_length=1, max_length=10)
+    bypass_cache: bool = False
+
 class LanguageListResponse(BaseModel):
     languages: List[str]
 
-def translate_text(text: str, source_language: str, target_language: str) -> str:
+@router.post("/translate", response_model=TranslationResponse)
+async def translate(request: TranslationRequest):
     """
-    Call the Groq API to translate text from source_language to target_language.
-    Returns only the translated text.
+    Handle translation requests.
     """
-    if not text or not target_language:
-        return "Please provide text and select a language."
-
-    prompt = (
-        f"Translate the following text from {source_language} to {target_language}. "
-        f"Return only the translated text, with no additional explanation, transliteration, or formatting: {text}"
-    )
-    
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": GROQ_MODEL,  # Ensure this is properly loaded from environment or hardcoded
-        "messages": [{"role": "user", "content": prompt}],
-        "max_tokens": 1000,
-        "temperature": 0.7
-    }
-    
     try:
-        response = requests.post(GROQ_API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        result = response.json()
+        translated_text = await translate_text(
+            request.text,
+            request.source_language,
+            request.target_language,
+            bypass_cache=request.bypass_cache
+        )
+    except LLMGatewayError as e:
+        logger.error(f"Translation error: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=f"Translation failed: {e.message}", headers=e.http_headers())
+    return {"translated_text": translated_text}
 
-        # Check if the API response contains the expected data structure
-        if "choices" not in result or not result["choices"]:
-            logger.error(f"Invalid response structure from Groq API: {result}")
-            raise HTTPException(status_code=500, detail="Unexpected response format from Groq API")
-        
-        translated_text = result["choices"][0]["message"]["content"].strip()
-        return translated_text
-    except requests.RequestException as e:
-        logger.error(f"Translation error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
-    except ValueError as e:
-        logger.error(f"Error parsing response from Groq API: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error processing translation: {str(e)}")
+@router.post("/translate/batch")
+async def translate_batch_endpoint(request: BatchTranslationRequest):
+    """
+    Translate many segments into one or more languages in a single round trip.
+    """
+    try:
+        results = await translate_batch(
+            request.segments,
+            request.source_language,
+            request.target_languages,
+            bypass_cache=request.bypass_cache
+        )
+    except LLMGatewayError as e:
+        logger.error(f"Batch translation error: {e.message}")
+        raise HTTPException(status_code=e.status_code, detail=f"Translation failed: {e.message}", headers=e.http_headers())
+    return {"results": results}
 
-@router.post("/translate", response_model=TranslationResponse)
-async def translate(request: TranslationRequest):
+@router.get("/translate/cache-stats")
+async def translation_cache_stats():
     """
-    Handle translation requests.
+    Get translation cache and request-coalescing counters.
     """
-    translated_text = translate_text(
-        request.text,
-        request.source_language,
-        request.target_language
-    )
-    return {"translated_text": translated_text}
+    return translation_stats()
 
 @router.get("/languages", response_model=LanguageListResponse)
 async def get_languages():
     """
     Get list of supported languages.
     """
-    languages = ["English", "Hindi", "Telugu", "Kannada", "Tamil"]
-    return {"languages": languages} 
\ No newline at end of file
+    return {"languages": settings.SUPPORTED_LANGUAGES} 
\ No newline at end of file
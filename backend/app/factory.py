@@ -0,0 +1,114 @@
+import os
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from config import settings
+from .services.metrics import MetricsMiddleware
+from .services.startup import WARM_UP_MODES, register_warm_up, start_warm_up, startup_timings, timed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Created at startup if missing (video config is served from here)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+def create_app(warm_up: Optional[str] = None) -> FastAPI:
+    """
+    Build the API application; both main.py and app/main.py serve its result.
+    uvicorn can also call it directly: uvicorn app.factory:create_app --factory
+
+    Importing the routes is cheap. The moderation term lists, the chat
+    service (session store, Groq client), langdetect profiles, gTTS and
+    speech_recognition are initialized on first use. warm_up ("off", "background" or "blocking",
+    default WARM_UP) decides whether they are initialized ahead of
+    traffic. The time taken by each subsystem is logged, exported as
+    inclusive_startup_seconds and served at /startup-stats.
+    """
+    started = time.perf_counter()
+    warm_up = warm_up or settings.WARM_UP
+    if warm_up not in WARM_UP_MODES:
+        raise ValueError(f"Unknown warm-up mode: {warm_up}")
+
+    with timed("routes"):
+        from .api.routes import chatRoutes, metricsRoutes, speechRoutes, translationRoutes
+        from .api.routes.speechRoutes import load_stt
+        from .services.chatService import close_chat_service, get_chat_service
+        from .services.executors import shutdown_executors
+        from .services.groqClient import close_clients
+        from .services.languageDetector import load_langdetect
+        from .services.moderation import get_moderation_filter
+        from .services.translationService import translation_cache
+        from .services.ttsService import load_gtts
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        """
+        Create the static directory and initialize lazily loaded subsystems
+        according to WARM_UP; on shutdown close pooled upstream connections,
+        stop executor pools and close the session store and translation cache.
+        """
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        start_warm_up(warm_up)
+        yield
+        await close_clients()
+        shutdown_executors()
+        close_chat_service()
+        translation_cache.close()
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        description="Backend API for Inclusive AI application",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # CORS setup
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.ALLOW_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Request latency and in-flight metrics
+    app.add_middleware(MetricsMiddleware)
+
+    # API routes
+    app.include_router(translationRoutes.router, prefix=settings.API_V1_STR, tags=["translation"])
+    app.include_router(chatRoutes.router, prefix=settings.API_V1_STR, tags=["chat"])
+    app.include_router(speechRoutes.router, prefix=settings.API_V1_STR, tags=["speech"])
+    app.include_router(speechRoutes.legacy_router)
+
+    # Prometheus scrape endpoint, unprefixed by convention
+    app.include_router(metricsRoutes.router)
+
+    # Cheapest first, so a background warm-up helps the likeliest first requests soonest
+    register_warm_up("moderation", get_moderation_filter)
+    register_warm_up("chat_service", get_chat_service)
+    register_warm_up("langdetect", load_langdetect)
+    register_warm_up("gtts", load_gtts)
+    register_warm_up("speech_recognition", load_stt)
+
+    @app.get(f"{settings.API_V1_STR}/startup-stats")
+    async def get_startup_stats():
+        """
+        Seconds spent importing or initializing each subsystem so far.
+        """
+        return {"warm_up": warm_up, "subsystems": startup_timings()}
+
+    @app.get("/")
+    async def root():
+        return {
+            "message": f"Welcome to {settings.PROJECT_NAME}",
+            "version": "1.0.0",
+            "docs_url": "/docs"
+        }
+
+    logger.info(f"Created app in {(time.perf_counter() - started) * 1000:.1f} ms (warm-up: {warm_up})")
+    return app
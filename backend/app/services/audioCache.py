@@ -0,0 +1,111 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_audio_key(text: str, lang: str, slow: bool, engine: str) -> str:
+    """Content address for one synthesis request"""
+    raw = "\x1f".join([text, lang, "slow" if slow else "normal", engine])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Size-bounded, content-addressed on-disk cache of synthesized audio.
+
+    Files are named by their key, written atomically, and evicted least
+    recently used first once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, suffix: str = ".mp3"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # Rebuild the LRU from disk, oldest access first
+        entries = []
+        for name in os.listdir(cache_dir):
+            if name.endswith(suffix):
+                path = os.path.join(cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-len(suffix)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self._total_bytes += size
+
+    def path_for(self, key: str) -> str:
+        """Filesystem path for a key"""
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file path for a key, or None on a miss"""
+        path = self.path_for(key)
+        with self._lock:
+            if key in self._sizes and os.path.exists(path):
+                self._sizes.move_to_end(key)
+                self.stats["hits"] += 1
+                return path
+            if key in self._sizes:
+                # File removed behind our back
+                self._total_bytes -= self._sizes.pop(key)
+            elif os.path.exists(path):
+                # Written by another worker sharing the directory
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    size = None
+                if size is not None:
+                    self._sizes[key] = size
+                    self._total_bytes += size
+                    self._evict_locked(keep=key)
+                    self.stats["hits"] += 1
+                    return path
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store audio bytes under a key and return the file path"""
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if key in self._sizes:
+                self._total_bytes -= self._sizes[key]
+            self._sizes[key] = len(data)
+            self._sizes.move_to_end(key)
+            self._total_bytes += len(data)
+            self._evict_locked(keep=key)
+        return path
+
+    def _evict_locked(self, keep: str) -> None:
+        """Evict least recently used files until under max_bytes (caller holds _lock)"""
+        while self._total_bytes > self.max_bytes and len(self._sizes) > 1:
+            key, size = next(iter(self._sizes.items()))
+            if key == keep:
+                break
+            del self._sizes[key]
+            self._total_bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                os.unlink(self.path_for(key))
+            except OSError as e:
+                logger.warning(f"Failed to evict cached audio {key}: {str(e)}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Snapshot of the cache counters"""
+        with self._lock:
+            return {**self.stats, "entries": len(self._sizes), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
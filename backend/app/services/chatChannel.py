@@ -0,0 +1,301 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Set, Union
+from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+from config import settings
+from .chatService import AsyncChatService
+from .executors import io_pool
+from .metrics import Counter, Gauge, registry
+from .ttsService import sentences_from_tokens, stream_speech
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ws_connections: Gauge = registry.register(Gauge(
+    "inclusive_chat_ws_connections", "Open chat WebSocket connections"
+))
+ws_turns: Counter = registry.register(Counter(
+    "inclusive_chat_ws_turns_total", "Chat WebSocket turns by type and outcome", ["type", "outcome"]
+))
+
+# Close code when the client stops answering heartbeats
+CLOSE_IDLE = 4408
+
+Frame = Union[Dict[str, Any], bytes]
+
+
+class ChatChannel:
+    """One chat WebSocket connection, bound to a session.
+
+    Client frames are JSON objects with a "type":
+      query  {"query", "voice"?, "id"?}       ask a question
+      edit   {"message_index", "new_content", "id"?}  edit a user message and regenerate
+      cancel {"id"?}                          stop the running (or a queued) turn
+      ping / pong                             heartbeat
+    Turns run one at a time in arrival order. Each turn streams "token"
+    frames, then "done" (or "error" / "cancelled"), all tagged with its id.
+    With "voice", the answer is also spoken while it is generated: an
+    "audio_start" frame, binary MP3 frames, then "audio_end".
+
+    Backpressure: at most send_queue token/audio frames wait for the
+    client; past that the turn stops pulling from Groq and TTS until the
+    client catches up. Control frames (pongs, errors) never wait, so
+    cancel and ping keep working on a congested connection. The server
+    pings every ping_interval seconds and closes the connection after
+    idle_timeout seconds without any client frame.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        chat_service: AsyncChatService,
+        session_id: Optional[str] = None,
+        send_queue: int = 64,
+        max_pending: int = 8,
+        ping_interval: float = 20.0,
+        idle_timeout: float = 60.0
+    ):
+        self.websocket = websocket
+        self.chat_service = chat_service
+        self.session_id = session_id
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+
+        self._outbox: "asyncio.Queue[tuple[Frame, bool]]" = asyncio.Queue()
+        self._credits = asyncio.Semaphore(send_queue)
+        self._turns: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_pending)
+        self._cancelled: Set[Any] = set()
+        self._current: Optional[Dict[str, Any]] = None
+        self._current_task: Optional[asyncio.Task] = None
+        self._last_seen = time.monotonic()
+        self._close_code = 1000
+
+    # ------------------------------------------------------------------
+    # Outgoing frames
+    # ------------------------------------------------------------------
+    async def _send_data(self, frame: Frame) -> None:
+        """Queue a token or audio frame, waiting while send_queue frames are outstanding"""
+        await self._credits.acquire()
+        self._outbox.put_nowait((frame, True))
+
+    def _send_control(self, frame: Dict[str, Any]) -> None:
+        """Queue a frame without waiting for the client"""
+        self._outbox.put_nowait((frame, False))
+
+    async def _send_loop(self) -> None:
+        while True:
+            frame, counted = await self._outbox.get()
+            try:
+                if isinstance(frame, bytes):
+                    await self.websocket.send_bytes(frame)
+                else:
+                    await self.websocket.send_text(json.dumps(frame, ensure_ascii=False))
+            finally:
+                if counted:
+                    self._credits.release()
+
+    # ------------------------------------------------------------------
+    # Incoming frames
+    # ------------------------------------------------------------------
+    def _error(self, detail: str, request_id: Any = None) -> None:
+        self._send_control({"type": "error", "id": request_id, "detail": detail})
+
+    def _enqueue_turn(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "query":
+            if not isinstance(message.get("query"), str) or not message["query"].strip():
+                self._error("query must be a non-empty string", message.get("id"))
+                return
+        elif not isinstance(message.get("message_index"), int) or not isinstance(message.get("new_content"), str):
+            self._error("edit needs an integer message_index and a string new_content", message.get("id"))
+            return
+        try:
+            self._turns.put_nowait(message)
+        except asyncio.QueueFull:
+            self._error("Too many pending requests", message.get("id"))
+
+    def _cancel(self, request_id: Any) -> None:
+        current = self._current
+        if current is not None and (request_id is None or request_id == current.get("id")):
+            self._current_task.cancel()
+        elif request_id is not None:
+            # Skipped when it comes up
+            self._cancelled.add(request_id)
+
+    async def _receive_loop(self) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            self._last_seen = time.monotonic()
+            try:
+                frame = json.loads(message.get("text") or "")
+                if not isinstance(frame, dict):
+                    raise ValueError("not an object")
+            except ValueError:
+                self._error("Frames must be JSON objects")
+                continue
+
+            kind = frame.get("type")
+            if kind in ("query", "edit"):
+                self._enqueue_turn(frame)
+            elif kind == "cancel":
+                self._cancel(frame.get("id"))
+            elif kind == "ping":
+                self._send_control({"type": "pong"})
+            elif kind != "pong":
+                self._error(f"Unknown frame type: {kind}", frame.get("id"))
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            if time.monotonic() - self._last_seen > self.idle_timeout:
+                logger.info(f"Closing idle chat WebSocket for session {self.session_id}")
+                self._close_code = CLOSE_IDLE
+                return
+            self._send_control({"type": "ping"})
+
+    # ------------------------------------------------------------------
+    # Turns
+    # ------------------------------------------------------------------
+    async def _turn_loop(self) -> None:
+        while True:
+            request = await self._turns.get()
+            request_id = request.get("id")
+            if request_id is not None and request_id in self._cancelled:
+                self._cancelled.discard(request_id)
+                self._send_control({"type": "cancelled", "id": request_id})
+                ws_turns.inc((request["type"], "cancelled"))
+                continue
+
+            self._current = request
+            self._current_task = asyncio.create_task(self._run_turn(request))
+            try:
+                # wait() leaves a cancelled turn's CancelledError in the task
+                await asyncio.wait({self._current_task})
+            finally:
+                self._current_task.cancel()
+            if self._current_task.cancelled():
+                self._send_control({"type": "cancelled", "id": request_id})
+                ws_turns.inc((request["type"], "cancelled"))
+            elif self._current_task.exception() is not None:
+                logger.error(f"Chat WebSocket turn failed: {str(self._current_task.exception())}")
+                self._error(f"Error processing query: {str(self._current_task.exception())}", request_id)
+                ws_turns.inc((request["type"], "error"))
+            self._current = self._current_task = None
+
+    def _events(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        if request["type"] == "query":
+            return self.chat_service.stream_text_query(
+                query=request["query"], session_id=self.session_id, new_session_id=self.session_id
+            )
+        return self.chat_service.stream_edit_and_regenerate(
+            self.session_id, request["message_index"], request["new_content"]
+        )
+
+    async def _run_turn(self, request: Dict[str, Any]) -> None:
+        request_id = request.get("id")
+        text = request["query"] if request["type"] == "query" else request["new_content"]
+        outcome = "error"
+
+        # Voice turns feed answer tokens to a concurrent speech pipeline
+        tokens: Optional["asyncio.Queue[Optional[str]]"] = None
+        speaker: Optional[asyncio.Task] = None
+        if request.get("voice"):
+            tokens = asyncio.Queue()
+            speaker = asyncio.create_task(self._speak(request_id, tokens, self.chat_service.detect_language(text)))
+
+        try:
+            async for event in self._events(request):
+                kind = event.pop("event")
+                if kind == "token":
+                    if tokens is not None:
+                        tokens.put_nowait(event["content"])
+                    await self._send_data({"type": "token", "id": request_id, "content": event["content"]})
+                elif kind == "done":
+                    if tokens is not None and "session_id" not in event:
+                        # Refusals arrive as a single closing event
+                        tokens.put_nowait(event["text_response"])
+                    self._send_control({"type": "done", "id": request_id, **event})
+                    outcome = "done"
+                else:
+                    self._error(event["detail"], request_id)
+            if speaker is not None:
+                tokens.put_nowait(None)
+                await speaker
+        except ValueError as e:
+            self._error(str(e), request_id)
+        finally:
+            if speaker is not None:
+                speaker.cancel()
+        ws_turns.inc((request["type"], outcome))
+
+    async def _speak(self, request_id: Any, tokens: "asyncio.Queue[Optional[str]]", language: str) -> None:
+        async def answer_tokens() -> AsyncIterator[str]:
+            while True:
+                token = await tokens.get()
+                if token is None:
+                    return
+                yield token
+
+        started = False
+        try:
+            async for chunk in stream_speech(sentences_from_tokens(answer_tokens()), language):
+                if not started:
+                    await self._send_data({"type": "audio_start", "id": request_id, "media_type": "audio/mpeg"})
+                    started = True
+                await self._send_data(chunk)
+        except Exception as e:
+            logger.error(f"Chat WebSocket speech error: {str(e)}")
+            self._error(f"Speech synthesis failed: {str(e)}", request_id)
+        if started:
+            await self._send_data({"type": "audio_end", "id": request_id})
+
+    # ------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------
+    async def run(self) -> None:
+        """Serve the connection until either side closes it"""
+        await self.websocket.accept()
+        # Unknown or missing ids get a new session, created with its first turn
+        self.session_id, history = await io_pool.run(self.chat_service.get_chat_history, self.session_id)
+        self._send_control({"type": "session", "session_id": self.session_id, "message_count": len(history)})
+
+        ws_connections.inc()
+        tasks = [
+            asyncio.create_task(self._receive_loop()),
+            asyncio.create_task(self._send_loop()),
+            asyncio.create_task(self._turn_loop()),
+            asyncio.create_task(self._heartbeat())
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None and not isinstance(task.exception(), WebSocketDisconnect):
+                    logger.error(f"Chat WebSocket error: {str(task.exception())}")
+                    self._close_code = 1011
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            ws_connections.dec()
+            if self.websocket.application_state == WebSocketState.CONNECTED and self.websocket.client_state == WebSocketState.CONNECTED:
+                try:
+                    await self.websocket.close(code=self._close_code)
+                except Exception:
+                    pass
+
+
+def create_chat_channel(websocket: WebSocket, chat_service: AsyncChatService, session_id: Optional[str] = None) -> ChatChannel:
+    """A ChatChannel configured from settings"""
+    return ChatChannel(
+        websocket,
+        chat_service,
+        session_id,
+        send_queue=settings.CHAT_WS_SEND_QUEUE,
+        max_pending=settings.CHAT_WS_MAX_PENDING,
+        ping_interval=settings.CHAT_WS_PING_INTERVAL,
+        idle_timeout=settings.CHAT_WS_IDLE_TIMEOUT
+    )
@@ -0,0 +1,414 @@
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+from .sessionStore import SESSION_SORT_KEYS, SessionStore
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Supported fsync policies for journal writes
+FSYNC_ALWAYS = "always"      # write + fsync before the mutating call returns
+FSYNC_INTERVAL = "interval"  # group commit: write + fsync once per flush interval
+FSYNC_NEVER = "never"        # group commit, leave durability to the OS page cache
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+
+class ChatJournal(SessionStore):
+    """Append-only journaled storage for chat sessions.
+
+    State lives in memory and every mutation is recorded as one JSON line in
+    ``<snapshot>.journal``. Records are flushed in groups by a background
+    writer, and a compactor periodically folds the journal into an atomic
+    snapshot at ``snapshot_path``. On startup the snapshot is loaded and the
+    journal replayed on top of it; a torn tail record is dropped.
+    The state is private to one process, so run a single worker with it.
+    """
+
+    in_memory = True
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        fsync_policy: str = FSYNC_INTERVAL,
+        flush_interval: float = 0.05,
+        max_batch: int = 256,
+        compact_interval: float = 300.0,
+        compact_bytes: int = 4 * 1024 * 1024,
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+
+        self.snapshot_path = snapshot_path
+        self.journal_path = f"{snapshot_path}.journal"
+        self.rotated_path = f"{snapshot_path}.journal.1"
+        self.fsync_policy = fsync_policy
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.compact_interval = compact_interval
+        self.compact_bytes = compact_bytes
+
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self._seq = 0
+        self._pending: List[str] = []
+        self._journal_bytes = 0
+
+        # _lock guards state, the pending buffer and the journal file handle;
+        # _compact_lock serializes compactions with each other.
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._replay()
+        if os.path.exists(self.rotated_path):
+            # A previous compaction was interrupted; its records are now in
+            # memory, so persist them before the rotated file can be reused.
+            self._write_snapshot(self._snapshot_json())
+            os.unlink(self.rotated_path)
+            open(self.journal_path, "w").close()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal_bytes = self._journal.tell()
+
+        self._writer = threading.Thread(target=self._writer_loop, name="chat-journal-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+    def _replay(self) -> None:
+        """Load the snapshot and replay journal records newer than it"""
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and "sessions" in data and "seq" in data:
+                    self.sessions = data["sessions"]
+                    snapshot_seq = int(data["seq"])
+                else:
+                    # Legacy whole-file format: {session_id: session}
+                    self.sessions = data
+            except json.JSONDecodeError:
+                logger.error(f"Error decoding chat snapshot file: {self.snapshot_path}")
+                self.sessions = {}
+        self._seq = snapshot_seq
+
+        replayed = 0
+        for path in (self.rotated_path, self.journal_path):
+            replayed += self._replay_file(path, snapshot_seq)
+        if replayed:
+            logger.info(f"Replayed {replayed} chat journal records on top of snapshot seq {snapshot_seq}")
+
+    def _replay_file(self, path: str, snapshot_seq: int) -> int:
+        """Apply the records in one journal file, truncating a torn tail"""
+        if not os.path.exists(path):
+            return 0
+
+        applied = 0
+        good_offset = 0
+        with open(path, "rb") as f:
+            for raw in f:
+                try:
+                    if not raw.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    record = json.loads(raw)
+                except ValueError:
+                    logger.warning(f"Dropping torn chat journal tail in {path} at offset {good_offset}")
+                    break
+                good_offset += len(raw)
+                seq = record.get("seq", 0)
+                if seq <= snapshot_seq:
+                    continue
+                self._apply(record)
+                self._seq = max(self._seq, seq)
+                applied += 1
+
+        if good_offset != os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good_offset)
+        return applied
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply one journal record to the in-memory state"""
+        op = record["op"]
+        sid = record["sid"]
+        if op == "create":
+            session = self.sessions.setdefault(sid, {"messages": [], "created": record["created"]})
+            session["updated"] = record.get("ts", record["created"])
+        elif op == "append":
+            session = self.sessions.setdefault(sid, {"messages": [], "created": record.get("ts", "")})
+            session["messages"].append(record["msg"])
+            session["updated"] = record.get("ts", session["created"])
+        elif op == "edit":
+            session = self.sessions.get(sid)
+            if session and 0 <= record["index"] < len(session["messages"]):
+                session["messages"][record["index"]].update(record["fields"])
+                session["updated"] = record.get("ts", session["created"])
+                if record["index"] < session.get("summary_upto", 0):
+                    # The summary covers the edited message; rebuild it from scratch
+                    session.pop("summary", None)
+                    session.pop("summary_upto", None)
+        elif op == "replace":
+            session = self.sessions.get(sid)
+            if session and 0 <= record["start"] <= len(session["messages"]):
+                del session["messages"][record["start"]:]
+                session["messages"].extend(record["msgs"])
+                session["updated"] = record.get("ts", session["created"])
+                if record["start"] < session.get("summary_upto", 0):
+                    session.pop("summary", None)
+                    session.pop("summary_upto", None)
+        elif op == "summary":
+            session = self.sessions.get(sid)
+            if session:
+                session["summary"] = record["summary"]
+                session["summary_upto"] = record["upto"]
+        elif op == "delete":
+            self.sessions.pop(sid, None)
+        else:
+            logger.warning(f"Ignoring unknown chat journal op: {op}")
+
+    # ------------------------------------------------------------------
+    # Mutations
+    # ------------------------------------------------------------------
+    def _log_locked(self, *records: Dict[str, Any]) -> None:
+        """Apply records and queue them for the journal (caller holds _lock)"""
+        for record in records:
+            self._seq += 1
+            record["seq"] = self._seq
+            record["ts"] = datetime.now().isoformat()
+            self._apply(record)
+            self._pending.append(json.dumps(record, ensure_ascii=False) + "\n")
+        if self.fsync_policy == FSYNC_ALWAYS:
+            self._flush_locked()
+        elif len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    def _log(self, *records: Dict[str, Any]) -> int:
+        """
+        Apply records and queue them for the journal (caller holds no lock).
+        Returns the message count of the last record's session afterwards.
+        """
+        with self._lock:
+            self._log_locked(*records)
+            session = self.sessions.get(records[-1]["sid"])
+            return len(session["messages"]) if session else 0
+
+    def create_session(self, session_id: str, created: str) -> None:
+        """Record creation of an empty session"""
+        self._log({"op": "create", "sid": session_id, "created": created})
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> int:
+        """Record a message appended to a session"""
+        return self._log({"op": "append", "sid": session_id, "msg": message})
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        """Record several messages appended to a session, with no other writes in between"""
+        return self._log(*({"op": "append", "sid": session_id, "msg": message} for message in messages))
+
+    # Conditional mutations check and apply under one hold of _lock, so a
+    # concurrent write cannot invalidate the check before the record lands.
+    def edit_message(self, session_id: str, message_index: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record an in-place update of one message"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if not session or not 0 <= message_index < len(session["messages"]):
+                return None
+            self._log_locked({"op": "edit", "sid": session_id, "index": message_index, "fields": fields})
+            return dict(session["messages"][message_index])
+
+    def replace_messages(self, session_id: str, start: int, messages: List[Dict[str, Any]]) -> Optional[int]:
+        """Record a session truncated at start with messages appended, as a single journal record"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if not session or not 0 <= start <= len(session["messages"]):
+                return None
+            self._log_locked({"op": "replace", "sid": session_id, "start": start, "msgs": messages})
+            return len(session["messages"])
+
+    def set_summary(
+        self,
+        session_id: str,
+        summary: str,
+        summary_upto: int,
+        based_on: Optional[Tuple[int, str]] = None
+    ) -> bool:
+        """Record the rolling summary covering messages before summary_upto"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if not session:
+                return False
+            if based_on is not None and based_on != (
+                session.get("summary_upto", 0), session.get("updated", session["created"])
+            ):
+                return False
+            self._log_locked({"op": "summary", "sid": session_id, "summary": summary, "upto": summary_upto})
+            return True
+
+    def delete_session(self, session_id: str) -> bool:
+        """Record deletion of a session"""
+        with self._lock:
+            if session_id not in self.sessions:
+                return False
+            self._log_locked({"op": "delete", "sid": session_id})
+            return True
+
+    def expire_sessions(self, updated_before: str) -> int:
+        """Record deletion of sessions idle since updated_before"""
+        with self._lock:
+            expired = [
+                session_id for session_id, session in self.sessions.items()
+                if session.get("updated", session["created"]) < updated_before
+            ]
+            if expired:
+                self._log_locked(*({"op": "delete", "sid": session_id} for session_id in expired))
+            return len(expired)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def session_exists(self, session_id: str) -> bool:
+        return session_id in self.sessions
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            return {
+                "created": session["created"],
+                "updated": session.get("updated", session["created"]),
+                "summary": session.get("summary", ""),
+                "summary_upto": session.get("summary_upto", 0),
+                "message_count": len(session["messages"])
+            }
+
+    def get_messages(self, session_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return []
+            end = None if limit is None else offset + limit
+            return [dict(message) for message in session["messages"][offset:end]]
+
+    def message_count(self, session_id: str) -> int:
+        with self._lock:
+            session = self.sessions.get(session_id)
+            return len(session["messages"]) if session else 0
+
+    def list_sessions(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "created",
+        order: str = "asc"
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        if sort_by not in SESSION_SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort_by}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Invalid sort order: {order}")
+        with self._lock:
+            items = [
+                (session_id, {
+                    "created": session["created"],
+                    "last_activity": session.get("updated", session["created"]),
+                    "message_count": len(session["messages"])
+                })
+                for session_id, session in self.sessions.items()
+            ]
+        # Sessions are kept in creation order, so only other orders need a sort
+        if sort_by != "created":
+            items.sort(key=lambda item: item[1][sort_by])
+        if order == "desc":
+            items.reverse()
+        end = None if limit is None else offset + limit
+        return items[offset:end]
+
+    def count_sessions(self) -> int:
+        return len(self.sessions)
+
+    # ------------------------------------------------------------------
+    # Flushing and compaction
+    # ------------------------------------------------------------------
+    def _flush_locked(self) -> None:
+        """Write pending records to the journal (caller holds _lock)"""
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending.clear()
+        self._journal.write(data)
+        self._journal.flush()
+        if self.fsync_policy != FSYNC_NEVER:
+            os.fsync(self._journal.fileno())
+        self._journal_bytes += len(data.encode("utf-8"))
+
+    def flush(self) -> None:
+        """Force pending records to the journal"""
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def _writer_loop(self) -> None:
+        """Background group-commit and compaction loop"""
+        last_compaction = time.monotonic()
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                now = time.monotonic()
+                if self._journal_bytes >= self.compact_bytes or (
+                    self.compact_interval > 0 and now - last_compaction >= self.compact_interval
+                ):
+                    last_compaction = now
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Chat journal writer error: {str(e)}")
+
+    def _snapshot_json(self) -> str:
+        """Serialize the current state (caller holds _lock or is single-threaded)"""
+        return json.dumps({"seq": self._seq, "sessions": self.sessions}, ensure_ascii=False)
+
+    def _write_snapshot(self, snapshot: str) -> None:
+        """Atomically replace the snapshot file"""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot and start a new journal"""
+        with self._compact_lock:
+            with self._lock:
+                if self._closed or (self._journal_bytes == 0 and not self._pending):
+                    return
+                self._flush_locked()
+                snapshot = self._snapshot_json()
+                # Rotate so new records land in a fresh journal while the
+                # snapshot is written outside the lock.
+                self._journal.close()
+                os.replace(self.journal_path, self.rotated_path)
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+                self._journal_bytes = 0
+
+            self._write_snapshot(snapshot)
+            os.unlink(self.rotated_path)
+            logger.info(f"Compacted chat journal into snapshot: {self.snapshot_path}")
+
+    def close(self) -> None:
+        """Flush pending records and stop the background writer"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._journal.close()
+        self._wakeup.set()
@@ -1,20 +1,25 @@
-import os
-import json
+import time
+import asyncio
 import logging
 import uuid
-import io
-import base64
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from tempfile import NamedTemporaryFile
-from gtts import gTTS
-from groq import Groq
-from langdetect import detect, DetectorFactory
-from langdetect.lang_detect_exception import LangDetectException
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, AsyncIterator, Tuple
 from config import settings
+from .sessionStore import create_session_store
+from .contextBuilder import SUMMARY_TEMPERATURE, as_chat_messages, build_summary_prompt, estimate_tokens, select_window
+from .groqClient import get_async_groq
+from .llmGateway import LLMGatewayError
+from .upstreamScheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE, classify_error, upstream_scheduler
+from .languageDetector import detect_language
+from .moderation import get_moderation_filter
+from .metrics import record_token_usage, stage, stage_seconds
+from .executors import io_pool
+from .startup import timed
+from .ttsService import get_or_synthesize, start_synthesis
 
-# Ensure consistent language detection
-DetectorFactory.seed = 0
+if TYPE_CHECKING:
+    from groq import AsyncGroq
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -29,73 +34,128 @@ LANGUAGE_MAPPING = {
     'ta': 'Tamil'
 }
 
+# Supported history modes for chat responses
+HISTORY_MODES = ("full", "delta", "none")
+
 class ChatService:
+    """Session bookkeeping and prompt building; AsyncChatService adds the Groq calls"""
+
     def __init__(self):
-        self.groq_client = Groq(api_key=settings.GROQ_API_KEY)
-        self.chat_storage_path = "chat_histories.json"
-        self.chat_histories = self._load_chat_histories()
+        self.groq_client = self._create_client()
+        # Sessions and messages live in the configured backend (CHAT_STORE_BACKEND)
+        self.store = create_session_store()
+        # Summary refreshes in flight by session; holding the tasks keeps them from being garbage-collected
+        self._summarizing: Dict[str, asyncio.Task] = {}
     
-    def _load_chat_histories(self) -> Dict[str, Dict[str, Any]]:
-        """Load chat histories from storage file"""
-        if os.path.exists(self.chat_storage_path):
-            try:
-                with open(self.chat_storage_path, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                logger.error(f"Error decoding chat histories file: {self.chat_storage_path}")
-                return {}
-        return {}
+    def _create_client(self) -> Any:
+        """Create the Groq client used for completions (provided by subclasses)"""
+        raise NotImplementedError
     
-    def _save_chat_histories(self) -> None:
-        """Save chat histories to storage file"""
-        with open(self.chat_storage_path, 'w') as f:
-            json.dump(self.chat_histories, f)
-    
-    def get_chat_sessions(self) -> Dict[str, Dict[str, Any]]:
-        """Get all chat sessions with metadata"""
+    def get_chat_sessions(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "created",
+        order: str = "asc"
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get a page of chat sessions with metadata, sorted by created or last-activity time"""
+        return dict(self.store.list_sessions(offset=offset, limit=limit, sort_by=sort_by, order=order))
+
+    def count_chat_sessions(self) -> int:
+        """Total number of chat sessions"""
+        return self.store.count_sessions()
+
+    def get_history_page(self, session_id: str, offset: Optional[int] = None, limit: int = 50) -> Dict[str, Any]:
+        """Get one page of a session's messages; without an offset the most recent page is returned"""
+        if not self.store.session_exists(session_id):
+            raise ValueError("Session not found")
+
+        total = self.store.message_count(session_id)
+        if offset is None:
+            offset = max(total - limit, 0)
+        end = min(offset + limit, total)
         return {
-            sid: {"created": info["created"], "message_count": len(info["messages"])}
-            for sid, info in self.chat_histories.items()
+            "session_id": session_id,
+            "messages": self.store.get_messages(session_id, offset, end - offset) if end > offset else [],
+            "offset": offset,
+            "total": total,
+            "prev_offset": max(offset - limit, 0) if offset > 0 else None,
+            "next_offset": end if end < total else None
         }
+
+    def _history_payload(
+        self,
+        session_id: str,
+        history_mode: str,
+        last_index: Optional[int],
+        message_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build the history part of a response according to the requested mode.
+
+        message_count pins the history to the first message_count messages
+        (e.g. the count right after this request's append), so writes from
+        concurrent requests do not leak into the response.
+        """
+        if message_count is None:
+            message_count = self.store.message_count(session_id)
+        if history_mode == "full":
+            return {"chat_history": self.store.get_messages(session_id, 0, message_count), "message_count": message_count}
+        if history_mode == "delta":
+            start = 0 if last_index is None else min(max(last_index + 1, 0), message_count)
+            return {
+                "chat_history_delta": self.store.get_messages(session_id, start, message_count - start) if message_count > start else [],
+                "history_start": start,
+                "message_count": message_count
+            }
+        return {"message_count": message_count}
     
-    def get_chat_history(self, session_id: Optional[str] = None) -> tuple[str, List[Dict[str, Any]]]:
-        """Get or create a chat session"""
-        if not session_id or session_id not in self.chat_histories:
-            session_id = str(uuid.uuid4())
-            self.chat_histories[session_id] = {"messages": [], "created": datetime.now().isoformat()}
-        return session_id, self.chat_histories[session_id]["messages"]
+    def get_chat_history(
+        self,
+        session_id: Optional[str] = None,
+        new_session_id: Optional[str] = None
+    ) -> tuple[str, List[Dict[str, Any]]]:
+        """Get a chat session, or an id for a new one; returns the id and a copy of its messages.
+
+        New sessions are only stored once their first turn is appended, so
+        unknown or expired ids do not leave empty sessions behind. A new
+        session gets new_session_id if given (an id already handed to the
+        client), else a random UUID.
+        """
+        if not session_id or not self.store.session_exists(session_id):
+            return new_session_id or str(uuid.uuid4()), []
+        return session_id, self.store.get_messages(session_id)
     
     def detect_language(self, text: str) -> str:
-        """Detect the language of the input text with improved accuracy"""
-        try:
-            # Check for specific patterns that might indicate a language more reliably
-            if any(word in text.lower() for word in ['namaste', 'hindi', 'बात', 'नमस्ते', 'हिंदी']):
-                logger.info("Hindi language detected based on specific patterns")
-                return 'hi'
-            
-            if any(word in text.lower() for word in ['telugu', 'తెలుగు', 'నమస్కారం']):
-                logger.info("Telugu language detected based on specific patterns")
-                return 'te'
-            
-            # Try standard detection
-            detected_language = detect(text)
-            logger.info(f"Detected language: {detected_language}")
-            
-            # Map to supported languages or default to English
-            if detected_language in ['en', 'hi', 'te', 'kn', 'ta']:
-                return detected_language
-            return "en"
-        except LangDetectException:
-            logger.warning("Language detection failed. Defaulting to English.")
-            return "en"
+        """Detect the language of the input text (script-aware, memoized)"""
+        return detect_language(text)
     
     def get_language_name(self, lang_code: str) -> str:
         """Convert language code to language name"""
         return LANGUAGE_MAPPING.get(lang_code, "English")
     
-    def generate_response(self, query: str, chat_history: List[Dict[str, Any]]) -> str:
-        """Generate a response using the Groq API with language awareness"""
-        detected_language = self.detect_language(query)
+    def _turn_context(
+        self,
+        session_id: Optional[str] = None,
+        new_session_id: Optional[str] = None
+    ) -> tuple[str, List[Dict[str, Any]], str]:
+        """Session id, the messages its summary does not cover, and the summary, for a new turn.
+
+        Unknown ids get a new session id as in get_chat_history.
+        """
+        session = self.store.get_session(session_id) if session_id else None
+        if session is None:
+            return new_session_id or str(uuid.uuid4()), [], ""
+        return session_id, self.store.get_messages(session_id, session["summary_upto"]), session["summary"]
+    
+    def _build_messages(self, query: str, chat_history: List[Dict[str, Any]], summary: str = "") -> tuple[List[Dict[str, str]], str]:
+        """Build the language-aware prompt messages and return them with the detected language.
+
+        chat_history holds the messages the summary does not cover; as many of
+        the most recent as fit in CHAT_HISTORY_TOKEN_BUDGET are sent as chat
+        messages, and older turns are represented by the session's rolling summary.
+        """
+        with stage("detect_language"):
+            detected_language = self.detect_language(query)
         language_name = self.get_language_name(detected_language)
         
         # Create a language-aware system prompt
@@ -103,115 +163,466 @@ class ChatService:
 When users speak to you in a particular language, you MUST ALWAYS respond in that same language.
 Currently, the user is communicating in {language_name}.
 YOUR RESPONSE MUST BE ENTIRELY IN {language_name}.
-Maintain a helpful, friendly, and professional tone in your responses."""
-        
-        # Create the user prompt
-        user_prompt = f"""
-User query: {query}
-Previous context: {chat_history[-5:] if chat_history else []}
-
-Remember to respond ONLY in {language_name}.
-Current date: {datetime.now().strftime("%B %d, %Y")}
-"""
+Maintain a helpful, friendly, and professional tone in your responses.
+Current date: {datetime.now().strftime("%B %d, %Y")}"""
+        if summary:
+            system_prompt += f"\n\nSummary of the earlier conversation:\n{summary}"
         
-        try:
-            response = self.groq_client.chat.completions.create(
-                model=settings.CHAT_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=settings.MAX_TOKENS,
-                temperature=settings.TEMPERATURE
-            )
-            answer = response.choices[0].message.content.strip()
-            
-            # Check if response is in correct language (basic check)
+        with stage("build_context"):
+            window_start = select_window(chat_history, settings.CHAT_HISTORY_TOKEN_BUDGET)
+            messages = [
+                {"role": "system", "content": system_prompt},
+                *as_chat_messages(chat_history[window_start:]),
+                {"role": "user", "content": query}
+            ]
+        return messages, detected_language
+    
+    def _summary_request(self, session_id: str) -> Optional[tuple[List[Dict[str, str]], int, tuple[int, str]]]:
+        """Return (prompt, new summary_upto, based_on) once unsummarized turns overflow the window.
+
+        based_on is the session's (summary_upto, updated) for set_summary. Folding stops CHAT_SUMMARY_TRIGGER messages past the window (keeping
+        the latest exchange verbatim), so the next refresh is a few turns away.
+        """
+        session = self.store.get_session(session_id)
+        if not session:
+            return None
+        summary_upto = session["summary_upto"]
+        pending = self.store.get_messages(session_id, summary_upto)
+        window_start = select_window(pending, settings.CHAT_HISTORY_TOKEN_BUDGET)
+        if window_start == 0:
+            return None
+        fold = max(window_start, min(window_start + settings.CHAT_SUMMARY_TRIGGER, len(pending) - 2))
+        prompt = build_summary_prompt(session["summary"], pending[:fold], settings.CHAT_SUMMARY_MAX_TOKENS)
+        return prompt, summary_upto + fold, (summary_upto, session["updated"])
+    
+    def _check_answer_language(self, answer: str, detected_language: str) -> str:
+        """Prefix an apology if the answer is not in the user's language"""
+        # Check if response is in correct language (basic check)
+        with stage("language_check"):
             response_language = self.detect_language(answer)
-            if response_language != detected_language:
-                logger.warning(f"Response language mismatch: expected {detected_language}, got {response_language}")
-                # For safety, add a note in the detected language
-                if detected_language == 'hi':
-                    answer = f"मुझे खेद है, मैं अपना उत्तर हिंदी में देने में असमर्थ था। {answer}"
-                elif detected_language == 'te':
-                    answer = f"క్షమించండి, నేను తెలుగులో సమాధానం ఇవ్వలేకపోయాను. {answer}"
-                
-            return answer
-        except Exception as e:
-            logger.error(f"Error with Groq API: {str(e)}")
-            raise Exception(f"Error processing query with AI: {str(e)}")
+        if response_language != detected_language:
+            logger.warning(f"Response language mismatch: expected {detected_language}, got {response_language}")
+            # For safety, add a note in the detected language
+            if detected_language == 'hi':
+                answer = f"मुझे खेद है, मैं अपना उत्तर हिंदी में देने में असमर्थ था। {answer}"
+            elif detected_language == 'te':
+                answer = f"క్షమించండి, నేను తెలుగులో సమాధానం ఇవ్వలేకపోయాను. {answer}"
+        return answer
     
-    def process_text_query(self, query: str, session_id: Optional[str] = None, output_as_voice: bool = False) -> Dict[str, Any]:
-        """Process a text query and return the response"""
-        # Check for inappropriate content
-        if any(word in query.lower() for word in ["hate", "kill", "death", "violence"]):
-            if "deserve" in query.lower() and "death" in query.lower():
-                return {"text_response": "As an AI, I am not allowed to make choices about who deserves the death penalty."}
-            return {"text_response": "Sorry, I cannot assist with inappropriate or harmful content."}
-        
-        # Get or create a chat session
-        session_id, chat_history = self.get_chat_history(session_id)
-        
-        # If just loading history
-        if query.lower().strip() == "load history":
-            return {"text_response": "", "session_id": session_id, "chat_history": chat_history}
-        
-        # Generate response
-        answer = self.generate_response(query, chat_history)
-        
-        # Update chat history
+    def _screen_query(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a refusal response for inappropriate content, or None if the query is fine"""
+        with stage("moderation"):
+            rule = get_moderation_filter().screen(query)
+        if rule is not None:
+            return {"text_response": rule.response}
+        return None
+    
+    def _record_turn(
+        self,
+        session_id: str,
+        query: str,
+        answer: str,
+        history_mode: str,
+        last_index: Optional[int],
+        replace_from: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Persist a query/answer pair and build the response.
+
+        With replace_from, the pair replaces the messages from that index on
+        (in the same single write) instead of being appended.
+        """
         current_time = datetime.now().strftime("%H:%M")
-        chat_history.append({"role": "user", "content": query, "time": current_time})
-        chat_history.append({"role": "assistant", "content": answer, "time": current_time})
-        self._save_chat_histories()
+        turn = [
+            {"role": "user", "content": query, "time": current_time},
+            {"role": "assistant", "content": answer, "time": current_time}
+        ]
+        with stage("persist"):
+            if replace_from is None:
+                message_count = self.store.append_messages(session_id, turn)
+            else:
+                message_count = self.store.replace_messages(session_id, replace_from, turn)
+                if message_count is None:
+                    raise ValueError("Message was removed while regenerating")
         
-        # Prepare response
-        response_data = {
+        return {
             "text_response": answer,
             "session_id": session_id,
-            "chat_history": chat_history
+            **self._history_payload(session_id, history_mode, last_index, message_count)
         }
-        
-        # Generate audio if requested
-        if output_as_voice:
-            detected_language = self.detect_language(answer)
-            lang_code = detected_language if detected_language in ["te", "hi", "en"] else "en"
-            
-            try:
-                tts = gTTS(text=answer, lang=lang_code)
-                with io.BytesIO() as audio_buffer:
-                    tts.write_to_fp(audio_buffer)
-                    audio_buffer.seek(0)
-                    response_data["audio_response"] = base64.b64encode(audio_buffer.read()).decode('utf-8')
-            except Exception as e:
-                logger.error(f"TTS error: {str(e)}")
-                response_data["audio_response"] = None
-        
-        return response_data
     
-    def edit_message(self, session_id: str, message_index: int, new_content: str) -> Dict[str, Any]:
+    def _speech_language(self, text: str) -> str:
+        """Language to speak text in (gTTS covers fewer languages than the chat)"""
+        detected_language = self.detect_language(text)
+        return detected_language if detected_language in ["te", "hi", "en"] else "en"
+    
+    def _audio_handle(self, session_id: str, message_index: int, audio_id: str) -> Dict[str, str]:
+        """Audio fields of a voice response; clients fetch the MP3 from audio_url.
+
+        audio_url addresses the message, so any worker can serve (or
+        synthesize) it; audio_id is the content key, also served at /audio/{audio_id}.
+        """
+        return {
+            "audio_id": audio_id,
+            "audio_url": f"{settings.API_V1_STR}/chat-history/{session_id}/messages/{message_index}/audio"
+        }
+    
+    def edit_message(self, session_id: str, message_index: int, new_content: str, history_mode: str = "full") -> Dict[str, Any]:
         """Edit a message in the chat history"""
-        if session_id not in self.chat_histories:
+        if history_mode not in HISTORY_MODES:
+            raise ValueError(f"Invalid history mode: {history_mode}")
+        if not self.store.session_exists(session_id):
             raise ValueError("Session not found")
             
-        chat_history = self.chat_histories[session_id]["messages"]
-        if 0 <= message_index < len(chat_history):
-            chat_history[message_index]["content"] = new_content
-            chat_history[message_index]["time"] = datetime.now().strftime("%H:%M")
-            self._save_chat_histories()
-            return {"status": "success", "chat_history": chat_history}
-        else:
+        message = self.store.edit_message(session_id, message_index, {
+            "content": new_content,
+            "time": datetime.now().strftime("%H:%M")
+        })
+        if message is None:
             raise ValueError("Invalid message index")
+        if history_mode == "delta":
+            # Only the edited message changed
+            return {
+                "status": "success",
+                "message_index": message_index,
+                "message": message,
+                "message_count": self.store.message_count(session_id)
+            }
+        return {"status": "success", **self._history_payload(session_id, history_mode, None)}
             
+    def _regeneration_context(self, session_id: str, message_index: int) -> tuple[List[Dict[str, Any]], str]:
+        """History before a user message about to be edited, and the summary if it predates the message.
+
+        As for _turn_context, the history starts where the summary ends.
+        """
+        session = self.store.get_session(session_id)
+        if session is None:
+            raise ValueError("Session not found")
+        if not 0 <= message_index < session["message_count"]:
+            raise ValueError("Invalid message index")
+        history = self.store.get_messages(session_id, 0, message_index + 1)
+        if len(history) <= message_index or history[message_index].get("role") != "user":
+            raise ValueError("Only user messages can be regenerated")
+        if session["summary_upto"] <= message_index:
+            return history[session["summary_upto"]:message_index], session["summary"]
+        return history[:message_index], ""
+    
     def delete_chat_session(self, session_id: str) -> Dict[str, Any]:
         """Delete a chat session"""
-        if session_id not in self.chat_histories:
+        if not self.store.delete_session(session_id):
             raise ValueError("Session not found")
-            
-        # Remove the session from chat histories
-        del self.chat_histories[session_id]
-        
-        # Save changes
-        self._save_chat_histories()
         
         return {"status": "success"}
+
+
+class AsyncChatService(ChatService):
+    """ChatService that awaits Groq on the shared pooled async client.
+
+    Completions do not block the event loop, so one worker can keep many
+    chat requests in flight. Session bookkeeping is inherited from
+    ChatService and runs on the I/O pool.
+    """
+
+    def _create_client(self) -> "AsyncGroq":
+        """Use the process-wide pooled AsyncGroq client"""
+        return get_async_groq()
+
+    def _schedule_summary(self, session_id: str) -> None:
+        """Refresh the rolling summary in the background, off the response path"""
+        if session_id in self._summarizing:
+            return
+        task = self._summarizing[session_id] = asyncio.create_task(self._refresh_summary(session_id))
+        task.add_done_callback(lambda _: self._summarizing.pop(session_id, None))
+
+    async def _refresh_summary(self, session_id: str) -> None:
+        """Fold turns that fell out of the history window into the session summary"""
+        # The trigger check reads the unsummarized history, so it runs on the I/O pool too
+        request = await io_pool.run(self._summary_request, session_id)
+        if request is None:
+            return
+        prompt, summary_upto, based_on = request
+        try:
+            with stage("summary"):
+                response = await upstream_scheduler.run(
+                    settings.CHAT_MODEL,
+                    PRIORITY_BULK,
+                    self._estimate_request_tokens(prompt, settings.CHAT_SUMMARY_MAX_TOKENS),
+                    lambda: self.groq_client.chat.completions.create(
+                        model=settings.CHAT_MODEL,
+                        messages=prompt,
+                        max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+                        temperature=SUMMARY_TEMPERATURE,
+                        timeout=settings.GROQ_READ_TIMEOUT
+                    ),
+                    usage=self._completion_usage
+                )
+            summary = response.choices[0].message.content.strip()
+            if not await io_pool.run(self.store.set_summary, session_id, summary, summary_upto, based_on):
+                logger.info(f"Discarded summary of chat session {session_id}: it changed while summarizing")
+        except Exception as e:
+            logger.error(f"Error summarizing chat history: {str(e)}")
+
+    @staticmethod
+    def _estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Upper-bound token reservation for a completion request"""
+        return sum(estimate_tokens(message["content"]) for message in messages) + max_tokens
+
+    @staticmethod
+    def _completion_usage(response: Any) -> Optional[Dict[str, Any]]:
+        """Token usage block of a Groq completion"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens
+        }
+
+    async def generate_response(self, query: str, chat_history: List[Dict[str, Any]], summary: str = "") -> str:
+        """Generate a response using the async Groq client with language awareness"""
+        messages, detected_language = self._build_messages(query, chat_history, summary)
+        
+        try:
+            with stage("llm_completion"):
+                response = await upstream_scheduler.run(
+                    settings.CHAT_MODEL,
+                    PRIORITY_INTERACTIVE,
+                    self._estimate_request_tokens(messages, settings.MAX_TOKENS),
+                    lambda: self.groq_client.chat.completions.create(
+                        model=settings.CHAT_MODEL,
+                        messages=messages,
+                        max_tokens=settings.MAX_TOKENS,
+                        temperature=settings.TEMPERATURE,
+                        timeout=settings.GROQ_READ_TIMEOUT
+                    ),
+                    usage=self._completion_usage
+                )
+            answer = response.choices[0].message.content.strip()
+            return self._check_answer_language(answer, detected_language)
+        except LLMGatewayError:
+            raise
+        except Exception as e:
+            logger.error(f"Error with Groq API: {str(e)}")
+            retryable, retry_after = classify_error(e)
+            if retryable:
+                # Upstream is overloaded or rate limiting us; let the client back off
+                raise LLMGatewayError(
+                    f"Error processing query with AI: {str(e)}",
+                    status_code=503,
+                    retryable=True,
+                    retry_after=retry_after
+                )
+            raise Exception(f"Error processing query with AI: {str(e)}")
+
+    async def process_text_query(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        output_as_voice: bool = False,
+        history_mode: str = "full",
+        last_index: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Process a text query and return the response.
+
+        history_mode selects how much history is returned: "full" (every message),
+        "delta" (only messages after last_index) or "none" (just the message count).
+        """
+        if history_mode not in HISTORY_MODES:
+            raise ValueError(f"Invalid history mode: {history_mode}")
+
+        refusal = self._screen_query(query)
+        if refusal:
+            return refusal
+        
+        session_id, chat_history, summary = await io_pool.run(self._turn_context, session_id)
+        
+        if query.lower().strip() == "load history":
+            history = await io_pool.run(self._history_payload, session_id, history_mode, last_index)
+            return {"text_response": "", "session_id": session_id, **history}
+        
+        answer = await self.generate_response(query, chat_history, summary)
+        response_data = await io_pool.run(self._record_turn, session_id, query, answer, history_mode, last_index)
+        self._schedule_summary(session_id)
+        
+        if output_as_voice:
+            # Answer now; the audio is synthesized in the background and fetched from audio_url
+            response_data.update(self._start_audio(session_id, response_data["message_count"] - 1, answer))
+        
+        return response_data
+
+    async def edit_and_regenerate(
+        self,
+        session_id: str,
+        message_index: int,
+        new_content: str,
+        history_mode: str = "full",
+        last_index: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Edit a user message and answer it again in one call.
+
+        The edited message and the new answer replace everything from
+        message_index on in a single write, so no stale replies are left
+        behind. In "delta" mode last_index defaults to message_index - 1,
+        i.e. the delta starts at the edited message.
+        """
+        if history_mode not in HISTORY_MODES:
+            raise ValueError(f"Invalid history mode: {history_mode}")
+
+        refusal = self._screen_query(new_content)
+        if refusal:
+            return refusal
+
+        chat_history, summary = await io_pool.run(self._regeneration_context, session_id, message_index)
+        answer = await self.generate_response(new_content, chat_history, summary)
+        response_data = await io_pool.run(
+            self._record_turn, session_id, new_content, answer, history_mode,
+            message_index - 1 if last_index is None else last_index,
+            message_index
+        )
+        self._schedule_summary(session_id)
+        return response_data
+
+    def _start_audio(self, session_id: str, message_index: int, answer: str) -> Dict[str, str]:
+        """Start synthesizing the answer in the background and return its audio handle"""
+        return self._audio_handle(session_id, message_index, start_synthesis(answer, self._speech_language(answer)))
+
+    async def message_audio(self, session_id: str, message_index: int) -> Tuple[str, str]:
+        """(key, path) of a message spoken aloud, joining or starting its synthesis if not cached"""
+        messages = await io_pool.run(self.store.get_messages, session_id, message_index, 1) if message_index >= 0 else []
+        if not messages or not messages[0].get("content"):
+            raise ValueError("Message not found")
+        text = messages[0]["content"]
+        return await get_or_synthesize(text, self._speech_language(text))
+
+    async def stream_response(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Yield answer tokens for prompt messages as Groq produces them (stream=True)"""
+        tokens = self._estimate_request_tokens(messages, settings.MAX_TOKENS)
+        async with upstream_scheduler.admit(settings.CHAT_MODEL, PRIORITY_INTERACTIVE, tokens):
+            started = time.perf_counter()
+            first_token = True
+            stream = await self.groq_client.chat.completions.create(
+                model=settings.CHAT_MODEL,
+                messages=messages,
+                max_tokens=settings.MAX_TOKENS,
+                temperature=settings.TEMPERATURE,
+                timeout=settings.GROQ_READ_TIMEOUT,
+                stream=True
+            )
+            async for chunk in stream:
+                # Groq reports usage on the final chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                if getattr(x_groq, "usage", None) is not None:
+                    record_token_usage(settings.CHAT_MODEL, self._completion_usage(x_groq))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token:
+                        stage_seconds.observe(time.perf_counter() - started, ("llm_first_token",))
+                        first_token = False
+                    yield delta
+
+    async def stream_text_query(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        new_session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Process a text query, yielding token events and then a closing "done" event.
+
+        The final answer is persisted to the session before the "done" event,
+        which carries the session_id and the index of the assistant message.
+        """
+        refusal = self._screen_query(query)
+        if refusal:
+            yield {"event": "done", **refusal}
+            return
+
+        session_id, chat_history, summary = await io_pool.run(self._turn_context, session_id, new_session_id)
+        async for event in self._stream_turn(session_id, query, chat_history, summary):
+            yield event
+
+    async def stream_edit_and_regenerate(
+        self,
+        session_id: str,
+        message_index: int,
+        new_content: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming edit_and_regenerate: token events, then a "done" event once the turn is persisted.
+
+        An unknown session, a bad index or a non-user message raises
+        ValueError from the first iteration, before any event.
+        """
+        refusal = self._screen_query(new_content)
+        if refusal:
+            yield {"event": "done", **refusal}
+            return
+
+        chat_history, summary = await io_pool.run(self._regeneration_context, session_id, message_index)
+        async for event in self._stream_turn(session_id, new_content, chat_history, summary, replace_from=message_index):
+            yield event
+
+    async def _stream_turn(
+        self,
+        session_id: str,
+        query: str,
+        chat_history: List[Dict[str, Any]],
+        summary: str,
+        replace_from: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the answer to query and persist the turn (see _record_turn for replace_from)"""
+        messages, detected_language = self._build_messages(query, chat_history, summary)
+
+        parts: List[str] = []
+        try:
+            async for token in self.stream_response(messages):
+                parts.append(token)
+                yield {"event": "token", "content": token}
+        except Exception as e:
+            logger.error(f"Error with Groq API stream: {str(e)}")
+            yield {"event": "error", "detail": f"Error processing query with AI: {str(e)}", "session_id": session_id}
+            return
+
+        answer = self._check_answer_language("".join(parts).strip(), detected_language)
+        try:
+            response_data = await io_pool.run(self._record_turn, session_id, query, answer, "none", None, replace_from)
+        except ValueError as e:
+            yield {"event": "error", "detail": str(e), "session_id": session_id}
+            return
+        self._schedule_summary(session_id)
+        yield {
+            "event": "done",
+            **response_data,
+            "message_index": response_data["message_count"] - 1
+        }
+
+
+# Shared chat service, created on first use (or by the warm-up hook) so that
+# importing the routes does not open the session store or the Groq client
+_chat_service: Optional[AsyncChatService] = None
+_chat_service_lock = threading.Lock()
+
+
+def get_chat_service() -> AsyncChatService:
+    """Get the process-wide chat service, creating it on first call"""
+    global _chat_service
+    if _chat_service is None:
+        with _chat_service_lock:
+            if _chat_service is None:
+                with timed("chat_service"):
+                    _chat_service = AsyncChatService()
+    return _chat_service
+
+
+def session_cache_stats() -> Dict[str, Any]:
+    """Hot-session cache statistics, or {} if the chat service has not started yet"""
+    return _chat_service.store.get_stats() if _chat_service is not None else {}
+
+
+def close_chat_service() -> None:
+    """Flush and close the session store; call on application shutdown"""
+    global _chat_service
+    with _chat_service_lock:
+        if _chat_service is not None:
+            _chat_service.store.close()
+            _chat_service = None
@@ -0,0 +1,58 @@
+import math
+from typing import Dict, List, Any
+
+# Fixed per-message cost of chat formatting (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Summaries should be factual rather than creative
+SUMMARY_TEMPERATURE = 0.2
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheaply estimate the token count of text.
+    Uses UTF-8 length so Indic scripts (3 bytes per character, and far fewer
+    characters per token than English) are not undercounted.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text.encode("utf-8")) / 3)
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Estimated tokens for one chat message"""
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def select_window(history: List[Dict[str, Any]], budget: int) -> int:
+    """Return the start index of the longest recent suffix of history that fits in budget"""
+    used = 0
+    start = len(history)
+    while start > 0:
+        cost = message_tokens(history[start - 1])
+        if used + cost > budget:
+            break
+        used += cost
+        start -= 1
+    return start
+
+
+def as_chat_messages(history: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Strip stored messages down to the role/content pairs the API expects"""
+    return [{"role": message["role"], "content": message["content"]} for message in history]
+
+
+def build_summary_prompt(previous_summary: str, messages: List[Dict[str, Any]], max_tokens: int) -> List[Dict[str, str]]:
+    """Prompt that folds newly dropped messages into the running conversation summary"""
+    transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    instructions = (
+        "You maintain a running summary of a conversation between a user and an AI assistant. "
+        "Update the summary with the new messages below. Keep facts, names, preferences and open questions; "
+        "drop pleasantries. Write it in English, in at most "
+        f"{max_tokens * 3 // 4} words. Return only the summary."
+    )
+    content = f"Current summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"
+    return [
+        {"role": "system", "content": instructions},
+        {"role": "user", "content": content}
+    ]
@@ -0,0 +1,181 @@
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from config import settings
+from .metrics import Histogram, registry
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+POOL_KINDS = ("thread", "process")
+
+# Time jobs spend queued for a free worker, per pool
+executor_wait_seconds: Histogram = registry.register(Histogram(
+    "inclusive_executor_wait_seconds", "Time blocking jobs wait for a free executor worker", ["pool"]
+))
+
+
+def _timed_call(fn: Callable[..., T], *args: Any) -> Tuple[float, T, float]:
+    """Process-side wrapper returning (start time, result, end time)"""
+    started_at = time.time()
+    result = fn(*args)
+    return started_at, result, time.time()
+
+
+class ExecutorPool:
+    """A bounded thread or process pool for one kind of blocking work.
+
+    Work is awaited from async handlers via run(), so a slow call only
+    occupies a worker of its own pool instead of the event loop. Tracks
+    queue depth and the time calls spend waiting for a free worker.
+    """
+
+    def __init__(self, name: str, max_workers: int, kind: str = "thread"):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.max_workers = max(max_workers, 1)
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.stats: Dict[str, float] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "max_queue_depth": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "run_time_total": 0.0
+        }
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use so idle pools cost nothing"""
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool")
+            return self._executor
+
+    def _started(self, submitted_at: float) -> None:
+        wait = time.monotonic() - submitted_at
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.stats["wait_time_total"] += wait
+            self.stats["wait_time_max"] = max(self.stats["wait_time_max"], wait)
+        executor_wait_seconds.observe(wait, (self.name,))
+
+    def _finished(self, started_at: float, failed: bool) -> None:
+        with self._lock:
+            self.active -= 1
+            self.stats["run_time_total"] += time.monotonic() - started_at
+            self.stats["failed" if failed else "completed"] += 1
+
+    def _discard_if_cancelled(self, future: Future) -> None:
+        """A job cancelled before it started never reaches _call"""
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def _call(self, submitted_at: float, fn: Callable[..., T], *args: Any) -> T:
+        """Worker-side wrapper (thread pools) that records wait and run times"""
+        self._started(submitted_at)
+        started_at = time.monotonic()
+        failed = True
+        try:
+            result = fn(*args)
+            failed = False
+            return result
+        finally:
+            self._finished(started_at, failed)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on this pool and await its result"""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        with self._lock:
+            self.queued += 1
+            self.stats["submitted"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queued)
+
+        if self.kind == "thread":
+            future = executor.submit(self._call, submitted_at, fn, *args)
+            future.add_done_callback(self._discard_if_cancelled)
+            return await asyncio.wrap_future(future, loop=loop)
+
+        # Process workers cannot update this object, so the child reports its
+        # wall-clock start time and the counters are settled on completion.
+        submitted_wall = time.time()
+        try:
+            started_wall, result, finished_wall = await loop.run_in_executor(executor, _timed_call, fn, *args)
+        except BaseException:
+            self._started(submitted_at)
+            self._finished(time.monotonic(), True)
+            raise
+        self._started(submitted_at + max(started_wall - submitted_wall, 0.0))
+        self._finished(time.monotonic() - (finished_wall - started_wall), False)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, wait-time and throughput counters"""
+        with self._lock:
+            started = self.stats["submitted"] - self.queued
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "active": self.active,
+                **self.stats,
+                "wait_time_avg": round(self.stats["wait_time_total"] / started, 4) if started else 0.0,
+                "run_time_avg": round(self.stats["run_time_total"] / (self.stats["completed"] + self.stats["failed"]), 4)
+                if self.stats["completed"] + self.stats["failed"] else 0.0
+            }
+
+    def shutdown(self) -> None:
+        """Stop the workers; the pool is recreated lazily if used again"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Network-bound gTTS synthesis
+tts_pool = ExecutorPool("tts", settings.EXECUTOR_TTS_WORKERS)
+# Audio decoding and recognition (CPU-heavy decoding can use processes)
+stt_pool = ExecutorPool("stt", settings.EXECUTOR_STT_WORKERS, settings.EXECUTOR_STT_KIND)
+# File reads/writes and chat journal persistence
+io_pool = ExecutorPool("io", settings.EXECUTOR_IO_WORKERS)
+
+POOLS = (tts_pool, stt_pool, io_pool)
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def read_file(path: str) -> bytes:
+    """Read a whole file on the I/O pool"""
+    return await io_pool.run(_read_bytes, path)
+
+
+def executor_stats() -> Dict[str, Any]:
+    """Per-pool queue depth and wait-time metrics"""
+    return {pool.name: pool.get_stats() for pool in POOLS}
+
+
+def shutdown_executors() -> None:
+    """Stop every pool's workers"""
+    for pool in POOLS:
+        pool.shutdown()
@@ -0,0 +1,69 @@
+import logging
+from typing import TYPE_CHECKING, Optional
+import httpx
+from config import settings
+from .startup import timed
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Process-wide pooled clients, created lazily on first use
+_http_client: Optional[httpx.AsyncClient] = None
+_async_groq: Optional["AsyncGroq"] = None
+
+
+def get_timeout() -> httpx.Timeout:
+    """Build the default upstream timeout from settings"""
+    return httpx.Timeout(
+        settings.GROQ_READ_TIMEOUT,
+        connect=settings.GROQ_CONNECT_TIMEOUT
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive (optionally HTTP/2) client used for all Groq traffic"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY
+            ),
+            timeout=get_timeout(),
+            http2=settings.GROQ_HTTP2
+        )
+        logger.info(
+            f"Created shared Groq HTTP client (max_connections={settings.GROQ_MAX_CONNECTIONS}, "
+            f"max_keepalive={settings.GROQ_MAX_KEEPALIVE_CONNECTIONS}, http2={settings.GROQ_HTTP2})"
+        )
+    return _http_client
+
+
+def get_async_groq() -> "AsyncGroq":
+    """Get the shared AsyncGroq client built on the pooled HTTP client (groq is imported on first use)"""
+    global _async_groq
+    if _async_groq is None or _http_client is None or _http_client.is_closed:
+        with timed("groq"):
+            from groq import AsyncGroq
+        _async_groq = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            http_client=get_http_client(),
+            timeout=get_timeout(),
+            # Retries are handled by the upstream scheduler, which honors Retry-After
+            max_retries=0
+        )
+    return _async_groq
+
+
+async def close_clients() -> None:
+    """Close the shared clients; call on application shutdown"""
+    global _http_client, _async_groq
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+    _async_groq = None
@@ -0,0 +1,109 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+import numpy as np
+from config import settings
+from .startup import timed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUPPORTED_CODES = ('en', 'hi', 'te', 'kn', 'ta')
+
+# Each supported Indic script occupies exactly one 128-code-point Unicode block,
+# so (code point >> 7) identifies it. Index = block - FIRST_BLOCK.
+FIRST_BLOCK = 0x0900 >> 7
+SCRIPT_BLOCKS = {
+    (0x0900 >> 7) - FIRST_BLOCK: 'hi',  # Devanagari
+    (0x0B80 >> 7) - FIRST_BLOCK: 'ta',  # Tamil
+    (0x0C00 >> 7) - FIRST_BLOCK: 'te',  # Telugu
+    (0x0C80 >> 7) - FIRST_BLOCK: 'kn',  # Kannada
+}
+LAST_BLOCK = 0x0C80 >> 7
+
+# Words that reliably indicate the user wants a given language
+HINT_WORDS = (
+    ('hi', ('namaste', 'hindi', 'बात', 'नमस्ते', 'हिंदी')),
+    ('te', ('telugu', 'తెలుగు', 'నమస్కారం')),
+)
+
+# Share of letters a single Indic script needs before we trust it outright
+SCRIPT_CONFIDENCE = 0.5
+
+
+def script_histogram(text: str) -> tuple[dict, int]:
+    """Count letters per supported Indic script and Latin letters in one vectorized pass"""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    blocks = codes >> 7
+    indic = blocks[(blocks >= FIRST_BLOCK) & (blocks <= LAST_BLOCK)] - FIRST_BLOCK
+    counts = np.bincount(indic, minlength=LAST_BLOCK - FIRST_BLOCK + 1) if indic.size else None
+    histogram = {
+        lang: int(counts[index]) if counts is not None else 0
+        for index, lang in SCRIPT_BLOCKS.items()
+    }
+    folded = codes | 0x20
+    latin = int(np.count_nonzero((folded >= ord('a')) & (folded <= ord('z')) & (codes < 0x80)))
+    latin += int(np.count_nonzero((codes >= 0xC0) & (codes <= 0x24F)))
+    return histogram, latin
+
+
+def _hint_language(text: str) -> Optional[str]:
+    """Return the language indicated by a hint word, or None"""
+    lowered = text.lower()
+    for lang, hints in HINT_WORDS:
+        if any(word in lowered for word in hints):
+            return lang
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_langdetect() -> tuple:
+    """
+    Import langdetect and load its language profiles (about 0.4 s) once.
+    Returns (detect, LangDetectException). Run by the warm-up hook so the
+    first mixed-script query does not pay for it.
+    """
+    with timed("langdetect"):
+        from langdetect import DetectorFactory, detect
+        from langdetect.detector_factory import init_factory
+        from langdetect.lang_detect_exception import LangDetectException
+        # Ensure consistent language detection
+        DetectorFactory.seed = 0
+        init_factory()
+    return detect, LangDetectException
+
+
+def _detect_with_langdetect(text: str) -> str:
+    """Fall back to langdetect for mixed-script text"""
+    hint = _hint_language(text)
+    if hint:
+        return hint
+    detect, LangDetectException = load_langdetect()
+    try:
+        detected_language = detect(text)
+    except LangDetectException:
+        logger.warning("Language detection failed. Defaulting to English.")
+        return "en"
+    return detected_language if detected_language in SUPPORTED_CODES else "en"
+
+
+@lru_cache(maxsize=settings.LANGUAGE_DETECT_CACHE_SIZE)
+def detect_language(text: str) -> str:
+    """
+    Detect the language code of text, restricted to the supported languages.
+
+    Native-script Hindi, Telugu, Kannada and Tamil are classified from a
+    script histogram. Text with no Indic letters can only map to English
+    (langdetect's Indic profiles are script-based), so only hint words are
+    checked. langdetect runs just for ambiguous mixed-script
+    text. Results are memoized by text.
+    """
+    histogram, latin = script_histogram(text)
+    script_lang, script_count = max(histogram.items(), key=lambda item: item[1])
+    indic = sum(histogram.values())
+    if indic == 0:
+        return _hint_language(text) or "en"
+    if script_count / (latin + indic) >= SCRIPT_CONFIDENCE:
+        return script_lang
+    return _detect_with_langdetect(text)
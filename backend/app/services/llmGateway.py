@@ -0,0 +1,120 @@
+import math
+import logging
+from typing import Dict, List, Optional, Any
+import httpx
+from config import settings
+from .groqClient import get_http_client
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LLMGatewayError(Exception):
+    """Structured error raised for failed upstream LLM calls.
+
+    status_code is the HTTP status the API should surface to its caller;
+    upstream_status is what Groq returned, if it answered at all.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int = 502,
+        upstream_status: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.upstream_status = upstream_status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the error for API responses and logs"""
+        return {
+            "error": self.message,
+            "upstream_status": self.upstream_status,
+            "retryable": self.retryable
+        }
+
+    def http_headers(self) -> Optional[Dict[str, str]]:
+        """Response headers telling the client when to retry, if known"""
+        if self.retry_after is None:
+            return None
+        return {"Retry-After": str(math.ceil(self.retry_after))}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP-date values are ignored"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+async def chat_completion(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """POST a chat completion to the Groq API over the shared pooled client and return the JSON body"""
+    headers = {
+        "Authorization": f"Bearer {settings.GROQ_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "model": model or settings.GROQ_MODEL,
+        "messages": messages,
+        "max_tokens": max_tokens if max_tokens is not None else settings.MAX_TOKENS,
+        "temperature": temperature if temperature is not None else settings.TEMPERATURE
+    }
+    request_timeout = httpx.Timeout(timeout or settings.GROQ_READ_TIMEOUT, connect=settings.GROQ_CONNECT_TIMEOUT)
+
+    try:
+        response = await get_http_client().post(settings.GROQ_API_URL, json=payload, headers=headers, timeout=request_timeout)
+    except httpx.TimeoutException as e:
+        logger.error(f"Groq request timed out: {str(e)}")
+        raise LLMGatewayError(f"Upstream timeout: {str(e) or type(e).__name__}", status_code=504, retryable=True)
+    except httpx.HTTPError as e:
+        logger.error(f"Groq request failed: {str(e)}")
+        raise LLMGatewayError(f"Upstream connection error: {str(e) or type(e).__name__}", status_code=502, retryable=True)
+
+    if response.status_code >= 400:
+        logger.error(f"Groq API returned {response.status_code}: {response.text[:200]}")
+        if response.status_code == 429:
+            raise LLMGatewayError(
+                "Upstream rate limit exceeded",
+                status_code=429,
+                upstream_status=429,
+                retryable=True,
+                retry_after=parse_retry_after(response.headers.get("retry-after"))
+            )
+        raise LLMGatewayError(
+            f"Upstream error {response.status_code}",
+            status_code=502,
+            upstream_status=response.status_code,
+            retryable=response.status_code >= 500,
+            retry_after=parse_retry_after(response.headers.get("retry-after"))
+        )
+
+    try:
+        return response.json()
+    except ValueError as e:
+        logger.error(f"Error parsing response from Groq API: {str(e)}")
+        raise LLMGatewayError("Invalid JSON from upstream", status_code=502, upstream_status=response.status_code)
+
+
+def first_choice_text(result: Dict[str, Any]) -> str:
+    """Extract the stripped text of the first choice from a completion body"""
+    try:
+        return result["choices"][0]["message"]["content"].strip()
+    except (KeyError, IndexError, TypeError, AttributeError):
+        logger.error(f"Invalid response structure from Groq API: {result}")
+        raise LLMGatewayError("Unexpected response format from Groq API", status_code=502)
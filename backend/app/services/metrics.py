@@ -0,0 +1,275 @@
+import time
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Common metric plumbing: name, help text, label names and a lock"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set"""
+
+    type = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram per label set; observe() is a bisect plus three adds"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, labels: Labels = ()) -> "Timer":
+        """Context manager observing the duration of its block"""
+        return Timer(self, labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        lines = self.header()
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Timer:
+    """Times a block into a histogram; failures also count in stage_errors"""
+
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.histogram.observe(time.perf_counter() - self.started, self.labels)
+        if exc_type is not None and self.histogram is stage_seconds:
+            stage_errors.inc(self.labels)
+        return False
+
+
+class CallbackMetric(_Metric):
+    """Metric read at scrape time from a callback returning {label values: value}.
+
+    Used to export counters the services already keep (cache and pool stats)
+    without touching their hot paths.
+    """
+
+    def __init__(self, name: str, documentation: str, type: str, labelnames: Sequence[str], callback: Callable[[], Dict[Labels, float]]):
+        super().__init__(name, documentation, labelnames)
+        self.type = type
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self.callback().items()
+            if value is not None
+        ]
+
+
+class Registry:
+    """Ordered set of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Pipeline stages (detect_language, llm_completion, tts, persist, ...)
+stage_seconds: Histogram = registry.register(Histogram(
+    "inclusive_stage_seconds", "Time spent in each request pipeline stage", ["stage"]
+))
+stage_errors: Counter = registry.register(Counter(
+    "inclusive_stage_errors_total", "Pipeline stages that raised", ["stage"]
+))
+
+# Upstream LLM calls, one observation per attempt
+upstream_seconds: Histogram = registry.register(Histogram(
+    "inclusive_upstream_request_seconds", "Latency of upstream LLM calls per attempt", ["model", "outcome"]
+))
+upstream_errors: Counter = registry.register(Counter(
+    "inclusive_upstream_errors_total", "Failed upstream LLM calls", ["model", "retryable"]
+))
+upstream_retries: Counter = registry.register(Counter(
+    "inclusive_upstream_retries_total", "Retried upstream LLM calls", ["model"]
+))
+llm_tokens: Counter = registry.register(Counter(
+    "inclusive_llm_tokens_total", "Tokens reported by Groq responses", ["model", "kind"]
+))
+
+# HTTP traffic
+http_seconds: Histogram = registry.register(Histogram(
+    "inclusive_http_request_seconds", "HTTP request latency (until the response body is sent)", ["method", "route", "status"]
+))
+http_in_flight: Gauge = registry.register(Gauge(
+    "inclusive_http_requests_in_flight", "HTTP requests being handled"
+))
+
+
+def stage(name: str) -> Timer:
+    """Time a pipeline stage: `with stage("detect_language"): ...`"""
+    return Timer(stage_seconds, (name,))
+
+
+def record_token_usage(model: str, usage: Optional[Dict[str, Any]]) -> None:
+    """Count prompt and completion tokens from a Groq usage block"""
+    if not usage:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            llm_tokens.inc((model, kind[:-len("_tokens")]), usage[kind])
+
+
+def register_callback(name: str, documentation: str, type: str, labelnames: Sequence[str], callback: Callable[[], Dict[Labels, float]]) -> None:
+    """Export values computed at scrape time"""
+    registry.register(CallbackMetric(name, documentation, type, labelnames, callback))
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the route that handled the request (e.g.
+    /api/v1/chat-history/{session_id}), keeping label cardinality bounded;
+    requests that matched no route share one label.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    # FastAPI leaves routes of included routers without their prefix; it is
+    # whatever precedes the longest tail of the path the route matches
+    path = scope["path"]
+    start = 0
+    while start != -1:
+        if route.path_regex.match(path[start:]):
+            return path[:start] + path_format
+        start = path.find("/", start + 1)
+    return path_format
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by route template and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            http_seconds.observe(time.perf_counter() - started, (scope["method"], route_template(scope), str(status["code"])))
+
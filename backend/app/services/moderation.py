@@ -0,0 +1,232 @@
+import os
+import json
+import logging
+import threading
+import unicodedata
+from collections import deque
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+from config import settings
+from .startup import timed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Joiners are part of words in Indic scripts
+JOINERS = ("\u200c", "\u200d")
+
+
+def normalize(text: str) -> str:
+    """Case-fold and NFC-normalize, so terms and queries compare alike"""
+    return unicodedata.normalize("NFC", text.casefold())
+
+
+def is_word_char(ch: str) -> bool:
+    """Letters, digits, combining marks (Indic vowel signs, viramas) and joiners"""
+    return ch.isalnum() or ch == "_" or ch in JOINERS or unicodedata.category(ch)[0] == "M"
+
+
+class _SeparatorMap(dict):
+    """str.translate table turning every non-word character into a space, filled in as characters are seen"""
+
+    def __missing__(self, code: int) -> int:
+        value = code if is_word_char(chr(code)) else 32
+        self[code] = value
+        return value
+
+
+_separators = _SeparatorMap()
+
+
+def words(text: str) -> str:
+    """Normalized text with each run of non-word characters collapsed to one space"""
+    return " ".join(normalize(text).translate(_separators).split())
+
+
+class TermAutomaton:
+    """Aho-Corasick automaton matching many terms in one pass over the text.
+
+    Terms match whole words only: text and terms go through words(), and
+    each term is anchored by the spaces around it, so word boundaries cost
+    nothing at search time. A term ending in "*" is a word prefix (useful
+    for inflected Dravidian forms), so "హత్య*" also matches "హత్యలు".
+    Search time is linear in the text length, however many terms are loaded.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        # Per state: outgoing edges, failure link and the categories of terms ending there
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[FrozenSet[str]] = [frozenset()]
+        self.term_count = 0
+
+        for term, category in terms:
+            is_prefix = term.endswith("*")
+            term = words(term.rstrip("*"))
+            if not term:
+                continue
+            state = 0
+            for ch in f" {term}" if is_prefix else f" {term} ":
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] |= {category}
+            self.term_count += 1
+
+        # Breadth-first failure links; each state also reports its suffixes' outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def search(self, text: str) -> Set[str]:
+        """Categories of the whole-word (or word-prefix) terms found in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        state = 0
+        for ch in f" {words(text)} ":
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class ModerationRule(NamedTuple):
+    """Refuse with response when all of all_of and (if given) any of any_of matched"""
+    name: str
+    all_of: FrozenSet[str]
+    any_of: FrozenSet[str]
+    response: str
+
+    def applies(self, categories: Set[str]) -> bool:
+        return self.all_of <= categories and (not self.any_of or not self.any_of.isdisjoint(categories))
+
+
+def compile_terms(config: Dict[str, Any]) -> Tuple[TermAutomaton, List[ModerationRule]]:
+    """
+    Build the automaton and rules from a term list document:
+    {"rules": [{"name", "all_of", "any_of", "response"}, ...],
+     "terms": {"<language>": {"<category>": ["term", "prefix*", ...]}}}
+    Every language goes into one automaton, so mixed-language text is covered.
+    """
+    rules = [
+        ModerationRule(rule["name"], frozenset(rule.get("all_of", ())), frozenset(rule.get("any_of", ())), rule["response"])
+        for rule in config["rules"]
+    ]
+    for rule in rules:
+        if not rule.all_of and not rule.any_of:
+            raise ValueError(f"Moderation rule {rule.name} has no conditions")
+    automaton = TermAutomaton(
+        (term, category)
+        for categories in config["terms"].values()
+        for category, terms in categories.items()
+        for term in terms
+    )
+    return automaton, rules
+
+
+class ModerationFilter:
+    """Screens queries against term lists compiled into a TermAutomaton.
+
+    The term list file is reloaded when it changes (checked every
+    reload_interval seconds by a watcher thread); a new automaton is built
+    off to the side and swapped in whole, so screening never sees a
+    half-built one. A file that fails to load leaves the previous lists in
+    place.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self.stats = {"reloads": 0, "reload_errors": 0}
+        self._compiled = self._load()
+
+        self._closed = threading.Event()
+        if reload_interval > 0:
+            threading.Thread(
+                target=self._watch_loop, args=(reload_interval,), name="moderation-reload", daemon=True
+            ).start()
+
+    def _load(self) -> Tuple[TermAutomaton, List[ModerationRule]]:
+        # Recorded first, so a broken file is not retried until it changes again
+        self._mtime = os.stat(self.path).st_mtime
+        with open(self.path, "r", encoding="utf-8") as f:
+            compiled = compile_terms(json.load(f))
+        logger.info(
+            f"Loaded {compiled[0].term_count} moderation terms ({compiled[0].state_count} states, "
+            f"{len(compiled[1])} rules) from {self.path}"
+        )
+        return compiled
+
+    def reload(self) -> bool:
+        """Recompile the term lists from disk; returns False (keeping the old lists) on error"""
+        with self._lock:
+            try:
+                self._compiled = self._load()
+            except Exception as e:
+                self.stats["reload_errors"] += 1
+                logger.error(f"Failed to reload moderation terms from {self.path}: {str(e)}")
+                return False
+            self.stats["reloads"] += 1
+            return True
+
+    def _watch_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                if os.stat(self.path).st_mtime != self._mtime:
+                    self.reload()
+            except OSError as e:
+                logger.error(f"Cannot stat moderation terms {self.path}: {str(e)}")
+
+    def screen(self, text: str) -> Optional[ModerationRule]:
+        """The first rule the text triggers, or None if it is fine"""
+        automaton, rules = self._compiled
+        categories = automaton.search(text)
+        if categories:
+            for rule in rules:
+                if rule.applies(categories):
+                    return rule
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        automaton, rules = self._compiled
+        return {**self.stats, "terms": automaton.term_count, "states": automaton.state_count, "rules": len(rules)}
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+# Shared filter, compiled on first use (or by the warm-up hook)
+_moderation_filter: Optional[ModerationFilter] = None
+_moderation_filter_lock = threading.Lock()
+
+
+def get_moderation_filter() -> ModerationFilter:
+    """Get the process-wide moderation filter, compiling the term lists on first call"""
+    global _moderation_filter
+    if _moderation_filter is None:
+        with _moderation_filter_lock:
+            if _moderation_filter is None:
+                with timed("moderation"):
+                    _moderation_filter = ModerationFilter(
+                        settings.MODERATION_TERMS_PATH, reload_interval=settings.MODERATION_RELOAD_INTERVAL
+                    )
+    return _moderation_filter
@@ -0,0 +1,320 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sys import getsizeof
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .sessionStore import MessageRecord, SessionStore, pack_message, unpack_message
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Memory per cached message besides its content: the record tuple and its list slot
+MESSAGE_OVERHEAD = getsizeof(MessageRecord("", "", "", None)) + 8
+
+
+def _record_size(record: MessageRecord) -> int:
+    return MESSAGE_OVERHEAD + getsizeof(record.content) + (getsizeof(record.extra) if record.extra else 0)
+
+
+class _HotSession:
+    """Cached messages of one session, tagged with the backend's updated stamp"""
+
+    __slots__ = ("updated", "messages", "nbytes", "last_access")
+
+    def __init__(self, updated: str, messages: List[MessageRecord]):
+        self.updated = updated
+        self.messages = messages
+        self.nbytes = sum(_record_size(record) for record in messages)
+        self.last_access = time.monotonic()
+
+
+class CachedSessionStore(SessionStore):
+    """Bounded hot-session cache in front of a session store.
+
+    Recently used sessions keep their messages in memory as compact
+    MessageRecord tuples. The cache is capped by session count and
+    approximate bytes, and the least recently used sessions are evicted
+    first. A background sweeper also evicts sessions idle for
+    idle_seconds. Writes go straight to the backing store, so eviction
+    just drops the entry, and the next read reloads it.
+
+    Every read checks the backing store's (updated, message_count) first,
+    so writes from other workers are never served stale.
+
+    Sessions with no activity for ttl seconds are deleted by the sweeper;
+    until it runs, reads treat them as missing.
+
+    Backends that already hold everything in memory (the journal) are not
+    cached, but TTL expiry still applies to them.
+    """
+
+    def __init__(
+        self,
+        backing: SessionStore,
+        max_sessions: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        idle_seconds: float = 900.0,
+        ttl: float = 0.0,
+        sweep_interval: float = 60.0
+    ):
+        self.backing = backing
+        self.in_memory = backing.in_memory
+        self.caching = max_sessions > 0 and not backing.in_memory
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[str, _HotSession]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+        self._closed = threading.Event()
+        if sweep_interval > 0 and (self.caching or ttl > 0):
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, args=(sweep_interval,), name="chat-session-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    # ------------------------------------------------------------------
+    # Cache bookkeeping
+    # ------------------------------------------------------------------
+    def _cutoff(self) -> Optional[str]:
+        """Sessions last updated before this ISO timestamp have expired"""
+        if self.ttl <= 0:
+            return None
+        return (datetime.now() - timedelta(seconds=self.ttl)).isoformat()
+
+    def _drop_locked(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def _evict_locked(self) -> None:
+        """Evict least recently used sessions until within both caps"""
+        while self._entries and (len(self._entries) > self.max_sessions or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self.stats["evictions"] += 1
+
+    def _insert(self, session_id: str, updated: str, messages: List[MessageRecord]) -> None:
+        entry = _HotSession(updated, messages)
+        with self._lock:
+            self._drop_locked(session_id)
+            self._entries[session_id] = entry
+            self._bytes += entry.nbytes
+            self._evict_locked()
+
+    def _update(self, session_id: str, apply: Callable[[_HotSession], Optional[int]]) -> None:
+        """
+        Apply a write to a cached entry. apply returns the change in bytes,
+        or None if the entry no longer lines up with the backend (another
+        writer got in between); such entries are dropped and reloaded on
+        next use.
+        """
+        meta = self.backing.get_session(session_id)
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return
+            delta = apply(entry) if meta is not None else None
+            if delta is None:
+                self._drop_locked(session_id)
+                return
+            entry.updated = meta["updated"]
+            entry.nbytes += delta
+            self._bytes += delta
+            self._evict_locked()
+
+    def _meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session metadata from the backend, or None if missing or past its TTL (the sweeper deletes it)"""
+        meta = self.backing.get_session(session_id)
+        if meta is None:
+            return None
+        cutoff = self._cutoff()
+        if cutoff is not None and meta["updated"] < cutoff:
+            return None
+        return meta
+
+    def _records(self, session_id: str) -> Optional[List[MessageRecord]]:
+        """The session's messages, from the cache if still current or else reloaded"""
+        meta = self._meta(session_id)
+        if meta is None:
+            with self._lock:
+                self._drop_locked(session_id)
+            return None
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry.updated == meta["updated"] and len(entry.messages) == meta["message_count"]:
+                self._entries.move_to_end(session_id)
+                entry.last_access = time.monotonic()
+                self.stats["hits"] += 1
+                return entry.messages
+            self.stats["misses"] += 1
+        messages = [pack_message(message) for message in self.backing.get_messages(session_id)]
+        self._insert(session_id, meta["updated"], messages)
+        return messages
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def session_exists(self, session_id: str) -> bool:
+        return self._meta(session_id) is not None
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._meta(session_id)
+
+    def get_messages(self, session_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        if not self.caching:
+            if self._meta(session_id) is None:
+                return []
+            return self.backing.get_messages(session_id, offset, limit)
+        records = self._records(session_id)
+        if records is None:
+            return []
+        end = None if limit is None else offset + limit
+        return [unpack_message(record) for record in records[offset:end]]
+
+    def message_count(self, session_id: str) -> int:
+        meta = self._meta(session_id)
+        return meta["message_count"] if meta else 0
+
+    def list_sessions(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "created",
+        order: str = "asc"
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        return self.backing.list_sessions(offset=offset, limit=limit, sort_by=sort_by, order=order)
+
+    def count_sessions(self) -> int:
+        return self.backing.count_sessions()
+
+    # ------------------------------------------------------------------
+    # Writes (through to the backing store)
+    # ------------------------------------------------------------------
+    def create_session(self, session_id: str, created: str) -> None:
+        self.backing.create_session(session_id, created)
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        count = self.backing.append_messages(session_id, messages)
+        if not self.caching:
+            return count
+        records = [pack_message(message) for message in messages]
+
+        def apply(entry: _HotSession) -> Optional[int]:
+            if len(entry.messages) != count - len(records):
+                return None
+            entry.messages.extend(records)
+            return sum(_record_size(record) for record in records)
+
+        with self._lock:
+            cached = session_id in self._entries
+        if cached:
+            self._update(session_id, apply)
+        elif count == len(records):
+            # A new session is likely to be read again right away
+            meta = self.backing.get_session(session_id)
+            if meta is not None:
+                self._insert(session_id, meta["updated"], records)
+        return count
+
+    def edit_message(self, session_id: str, message_index: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        message = self.backing.edit_message(session_id, message_index, fields)
+        if message is None or not self.caching:
+            return message
+        record = pack_message(message)
+
+        def apply(entry: _HotSession) -> Optional[int]:
+            if message_index >= len(entry.messages):
+                return None
+            delta = _record_size(record) - _record_size(entry.messages[message_index])
+            entry.messages[message_index] = record
+            return delta
+
+        self._update(session_id, apply)
+        return message
+
+    def replace_messages(self, session_id: str, start: int, messages: List[Dict[str, Any]]) -> Optional[int]:
+        count = self.backing.replace_messages(session_id, start, messages)
+        # The cached prefix cannot be checked against the backend's, so reload on next use
+        with self._lock:
+            self._drop_locked(session_id)
+        return count
+
+    def set_summary(
+        self,
+        session_id: str,
+        summary: str,
+        summary_upto: int,
+        based_on: Optional[Tuple[int, str]] = None
+    ) -> bool:
+        # Summaries are read from the backend metadata, never cached
+        return self.backing.set_summary(session_id, summary, summary_upto, based_on)
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            self._drop_locked(session_id)
+        return self.backing.delete_session(session_id)
+
+    def expire_sessions(self, updated_before: str) -> int:
+        expired = self.backing.expire_sessions(updated_before)
+        with self._lock:
+            for session_id in [sid for sid, entry in self._entries.items() if entry.updated < updated_before]:
+                self._drop_locked(session_id)
+            self.stats["expirations"] += expired
+        return expired
+
+    # ------------------------------------------------------------------
+    # Sweeping
+    # ------------------------------------------------------------------
+    def sweep(self) -> None:
+        """Evict idle sessions from the cache and delete expired ones"""
+        idle_before = time.monotonic() - self.idle_seconds
+        with self._lock:
+            # Entries are kept in access order, oldest first
+            while self._entries:
+                session_id, entry = next(iter(self._entries.items()))
+                if entry.last_access >= idle_before:
+                    break
+                self._drop_locked(session_id)
+                self.stats["evictions"] += 1
+        cutoff = self._cutoff()
+        if cutoff is not None:
+            expired = self.expire_sessions(cutoff)
+            if expired:
+                logger.info(f"Expired {expired} chat sessions idle since {cutoff}")
+
+    def _sweep_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Chat session sweep error: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hot-session cache statistics"""
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_sessions": self.max_sessions if self.caching else 0,
+                "max_bytes": self.max_bytes if self.caching else 0,
+                "ttl": self.ttl
+            }
+
+    def flush(self) -> None:
+        self.backing.flush()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self.backing.close()
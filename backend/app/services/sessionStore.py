@@ -0,0 +1,191 @@
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from config import settings
+
+# Supported sort keys for session listings
+SESSION_SORT_KEYS = ("created", "last_activity")
+
+
+class MessageRecord(NamedTuple):
+    """Compact form of a chat message: a tuple instead of a dict with repeated keys"""
+    role: Optional[str]
+    content: Optional[str]
+    time: Optional[str]
+    extra: Optional[Dict[str, Any]]  # any other fields, usually None
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def pack_message(message: Dict[str, Any]) -> MessageRecord:
+    """Message dict to its compact record; role and time strings are interned"""
+    extra = {key: value for key, value in message.items() if key not in MessageRecord._fields}
+    return MessageRecord(
+        _intern(message.get("role")),
+        message.get("content"),
+        _intern(message.get("time")),
+        extra or None
+    )
+
+
+def unpack_message(record: MessageRecord) -> Dict[str, Any]:
+    """Compact record back to the message dict returned by the API (absent fields stay absent)"""
+    message = {field: value for field, value in zip(MessageRecord._fields[:3], record) if value is not None}
+    if record.extra:
+        message.update(record.extra)
+    return message
+
+
+class SessionStore(ABC):
+    """Storage for chat sessions and their messages.
+
+    Sessions are addressed by id and hold an ordered message list plus
+    metadata (created/updated timestamps and the rolling summary). Reads
+    return copies, so callers never observe later writes through them.
+    Backends that can be shared by several processes (SQLite, a networked
+    KV store) let the chat API run with multiple workers.
+    """
+
+    # True when the backend keeps every session in process memory anyway,
+    # so a hot-session cache in front of it would only duplicate state
+    in_memory = False
+
+    @abstractmethod
+    def create_session(self, session_id: str, created: str) -> None:
+        """Create an empty session"""
+
+    @abstractmethod
+    def session_exists(self, session_id: str) -> bool:
+        """Whether the session exists"""
+
+    @abstractmethod
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session metadata (created, updated, summary, summary_upto, message_count), or None"""
+
+    @abstractmethod
+    def get_messages(self, session_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A slice of the session's messages (empty if the session does not exist)"""
+
+    @abstractmethod
+    def message_count(self, session_id: str) -> int:
+        """Number of messages in the session (0 if it does not exist)"""
+
+    @abstractmethod
+    def list_sessions(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "created",
+        order: str = "asc"
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """A page of (session_id, {created, last_activity, message_count}) pairs"""
+
+    @abstractmethod
+    def count_sessions(self) -> int:
+        """Total number of sessions"""
+
+    @abstractmethod
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        """Atomically append messages; returns the session's new message count"""
+
+    @abstractmethod
+    def edit_message(self, session_id: str, message_index: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update one message in place; returns the updated message, or None if it does not exist.
+
+        Editing a message covered by the rolling summary discards the summary.
+        """
+
+    @abstractmethod
+    def replace_messages(self, session_id: str, start: int, messages: List[Dict[str, Any]]) -> Optional[int]:
+        """Atomically drop the messages from start on and append messages in their place.
+
+        Returns the new message count, or None if the session does not exist
+        or has fewer than start messages. Replacing messages covered by the
+        rolling summary discards the summary.
+        """
+
+    @abstractmethod
+    def set_summary(
+        self,
+        session_id: str,
+        summary: str,
+        summary_upto: int,
+        based_on: Optional[Tuple[int, str]] = None
+    ) -> bool:
+        """Store the rolling summary covering messages before summary_upto.
+
+        based_on is the (summary_upto, updated) pair of the session the
+        summary was computed from; if either has changed since, nothing is
+        written. Returns whether the summary was stored.
+        """
+
+    @abstractmethod
+    def delete_session(self, session_id: str) -> bool:
+        """Delete a session; returns False if it did not exist"""
+
+    @abstractmethod
+    def expire_sessions(self, updated_before: str) -> int:
+        """Delete sessions with no activity since the given ISO timestamp; returns how many"""
+
+    def flush(self) -> None:
+        """Force buffered writes to durable storage"""
+
+    def close(self) -> None:
+        """Release files and connections"""
+
+
+def _journal_store() -> SessionStore:
+    from .chatJournal import ChatJournal
+    return ChatJournal(
+        settings.CHAT_STORAGE_PATH,
+        fsync_policy=settings.CHAT_JOURNAL_FSYNC,
+        flush_interval=settings.CHAT_JOURNAL_FLUSH_INTERVAL,
+        max_batch=settings.CHAT_JOURNAL_MAX_BATCH,
+        compact_interval=settings.CHAT_JOURNAL_COMPACT_INTERVAL,
+        compact_bytes=settings.CHAT_JOURNAL_COMPACT_BYTES,
+    )
+
+
+def _sqlite_store() -> SessionStore:
+    import os
+    from .sqliteSessionStore import SQLiteSessionStore
+    store = SQLiteSessionStore(settings.CHAT_SQLITE_PATH, busy_timeout=settings.CHAT_SQLITE_BUSY_TIMEOUT)
+    legacy = settings.CHAT_STORAGE_PATH
+    if store.count_sessions() == 0 and (os.path.exists(legacy) or os.path.exists(f"{legacy}.journal")):
+        # One-time move of sessions kept by the JSON journal backend
+        journal = _journal_store()
+        try:
+            store.import_sessions(journal)
+        finally:
+            journal.close()
+    return store
+
+
+# Session store backends by name (CHAT_STORE_BACKEND)
+SESSION_STORES: Dict[str, Callable[[], SessionStore]] = {
+    "journal": _journal_store,   # every session in memory with a JSON journal; single process only
+    "sqlite": _sqlite_store      # WAL-mode SQLite; safe across workers on one host
+}
+
+
+def register_session_store(name: str, factory: Callable[[], SessionStore]) -> None:
+    """Make another backend (e.g. a networked KV store) selectable by name"""
+    SESSION_STORES[name] = factory
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """Create the configured session store behind the hot-session cache"""
+    from .sessionCache import CachedSessionStore
+    backend = backend or settings.CHAT_STORE_BACKEND
+    if backend not in SESSION_STORES:
+        raise ValueError(f"Unknown chat store backend: {backend}")
+    return CachedSessionStore(
+        SESSION_STORES[backend](),
+        max_sessions=settings.CHAT_SESSION_CACHE_SIZE,
+        max_bytes=settings.CHAT_SESSION_CACHE_BYTES,
+        idle_seconds=settings.CHAT_SESSION_IDLE_SECONDS,
+        ttl=settings.CHAT_SESSION_TTL,
+        sweep_interval=settings.CHAT_SESSION_SWEEP_INTERVAL
+    )
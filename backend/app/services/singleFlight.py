@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one in-flight upstream call.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task and receive its result or
+    its exception. Cancelling one waiter never cancels the shared call.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def start(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start factory() for key unless it is already running; returns the shared task"""
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executions"] += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+        return task
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run factory() once per key at a time and share the outcome"""
+        return await asyncio.shield(self.start(key, factory))
+
+    def inflight(self, key: Hashable) -> Optional[asyncio.Task]:
+        """The running task for key, if any"""
+        return self._inflight.get(key)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Snapshot of the coalescing counters"""
+        return {**self.stats, "inflight": len(self._inflight)}
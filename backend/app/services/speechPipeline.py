@@ -0,0 +1,134 @@
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from config import settings
+from .executors import stt_pool
+from .metrics import stage
+from .translationService import translate_text
+from .ttsService import get_or_synthesize
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Stages timed per segment, in pipeline order
+SEGMENT_STAGES = ("recognize", "translate", "synthesize")
+
+LANGUAGE_NAMES = {code: name for name, code in settings.LANGUAGE_CODES.items()}
+
+
+def _seconds(value: float) -> float:
+    return round(value, 3)
+
+
+class SpeechPipeline:
+    """One speech-to-speech translation: STT, translation and TTS run per segment.
+
+    The upload is decoded and split on silence, then every chunk goes
+    through recognize -> translate -> synthesize as its own task. The
+    chunks are recognized in parallel on the STT pool and each one is
+    translated and synthesized as soon as its text is known, so later
+    audio is still being recognized while earlier segments are spoken.
+    Segments are yielded in order. timings holds the time spent in each
+    stage (summed over segments), when the first segment was ready and
+    the total, all in seconds since the pipeline was created.
+    """
+
+    def __init__(self, source_language: str, target_language: str, slow: bool = False):
+        self.source_language = source_language
+        self.target_language = target_language
+        self.slow = slow
+        self.duration = 0.0
+        self.chunks = 0
+        self.timings: Dict[str, float] = {"decode": 0.0, **{name: 0.0 for name in SEGMENT_STAGES}}
+        self._started = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def summary(self) -> Dict[str, Any]:
+        """Duration, chunk count and stage timings, with the total so far"""
+        return {
+            "duration": round(self.duration, 2),
+            "chunks": self.chunks,
+            "timings": {**{name: _seconds(value) for name, value in self.timings.items()}, "total": _seconds(self.elapsed())}
+        }
+
+    async def run(self, data: bytes) -> AsyncIterator[Tuple[Dict[str, Any], str]]:
+        """
+        Yield (segment, audio path) for every chunk with recognized speech.
+        A segment has index, text, translation, audio_id and its own stage timings.
+        Raises sttService.AudioDecodeError, speech_recognition.RequestError or
+        LLMGatewayError from the failing stage.
+        """
+        from . import sttService
+
+        with stage("stt_decode"):
+            self.duration, chunks = await stt_pool.run(sttService.prepare_chunks, data)
+        self.timings["decode"] = self.elapsed()
+        self.chunks = len(chunks)
+
+        recognizer = sttService.get_recognizer()
+        tasks: List["asyncio.Task[Optional[Tuple[Dict[str, Any], str]]]"] = [
+            asyncio.create_task(self._segment(index, recognizer, chunk))
+            for index, chunk in enumerate(chunks)
+        ]
+        try:
+            for task in tasks:
+                result = await task
+                if result is not None:
+                    if "first_segment" not in self.timings:
+                        self.timings["first_segment"] = self.elapsed()
+                    yield result
+        finally:
+            # A failed stage or a disconnected client abandons the rest
+            for task in tasks:
+                if task.done() and not task.cancelled():
+                    task.exception()
+                task.cancel()
+        logger.info(
+            f"Speech-to-speech {self.source_language}->{self.target_language}: "
+            f"{self.chunks} chunk(s) in {self.elapsed():.2f}s"
+        )
+
+    async def _segment(self, index: int, recognizer: Any, chunk: Any) -> Optional[Tuple[Dict[str, Any], str]]:
+        from . import sttService
+
+        timings: Dict[str, float] = {}
+
+        started = time.perf_counter()
+        with stage("stt_recognize"):
+            text = await stt_pool.run(sttService.recognize_chunk, recognizer, chunk, self.source_language)
+        timings["recognize"] = time.perf_counter() - started
+        if not text:
+            self.timings["recognize"] += timings["recognize"]
+            return None
+
+        started = time.perf_counter()
+        if self.source_language == self.target_language:
+            translation = text
+        else:
+            with stage("translate"):
+                translation = await translate_text(
+                    text,
+                    LANGUAGE_NAMES.get(self.source_language, self.source_language),
+                    LANGUAGE_NAMES.get(self.target_language, self.target_language)
+                )
+        timings["translate"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with stage("tts"):
+            key, path = await get_or_synthesize(translation, self.target_language, self.slow)
+        timings["synthesize"] = time.perf_counter() - started
+
+        for name, value in timings.items():
+            self.timings[name] += value
+        segment = {
+            "index": index,
+            "text": text,
+            "translation": translation,
+            "audio_id": key,
+            "timings": {**{name: _seconds(value) for name, value in timings.items()}, "ready": _seconds(self.elapsed())}
+        }
+        return segment, path
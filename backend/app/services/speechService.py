@@ -1,6 +1,6 @@
 from gtts import gTTS
 import speech_recognition as sr
-import os
+import io
 from typing import Optional
 import tempfile
 from ..config import settings
@@ -35,20 +35,10 @@ class SpeechService:
             # Get language code
             langCode = self.languageCodes.get(language, "en")
             
-            # Create a temporary file for the audio data
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tempFile:
-                tempFile.write(audioData)
-                tempPath = tempFile.name
-            
-            # Process the audio file
-            with sr.AudioFile(tempPath) as source:
+            # Decode from memory; no temporary file to write or clean up
+            with sr.AudioFile(io.BytesIO(audioData)) as source:
                 audio = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio, language=langCode)
-            
-            # Clean up
-            os.unlink(tempPath)
-            
-            return text
+            return self.recognizer.recognize_google(audio, language=langCode)
         except Exception as e:
             print(f"Error in speech-to-text conversion: {str(e)}")
-            return None 
\ No newline at end of file
+            return None 
@@ -0,0 +1,261 @@
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .sessionStore import SESSION_SORT_KEYS, MessageRecord, SessionStore, pack_message, unpack_message
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    summary_upto INTEGER NOT NULL DEFAULT 0,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    role TEXT,
+    content TEXT,
+    time TEXT,
+    extra TEXT,
+    PRIMARY KEY (session_id, idx)
+) WITHOUT ROWID;
+"""
+
+SORT_COLUMNS = {"created": "created", "last_activity": "updated"}
+
+
+def _message_row(session_id: str, idx: int, message: Dict[str, Any]) -> tuple:
+    role, content, time, extra = pack_message(message)
+    return (session_id, idx, role, content, time, json.dumps(extra, ensure_ascii=False) if extra else None)
+
+
+def _message_from_row(row: tuple) -> Dict[str, Any]:
+    return unpack_message(MessageRecord(row[0], row[1], row[2], json.loads(row[3]) if row[3] else None))
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a WAL-mode SQLite database.
+
+    Every process and thread gets its own connection; WAL lets readers run
+    alongside the single writer, and writes take the lock up front
+    (BEGIN IMMEDIATE) so appends from several uvicorn workers get
+    consecutive message indexes. Appending writes only the new rows, and
+    messages are stored as role/content/time columns rather than JSON.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._conn().executescript(SCHEMA)
+        logger.info(f"Using SQLite chat session store: {path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction holding the database write lock from the start"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # -- reads ----------------------------------------------------------
+    def session_exists(self, session_id: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone() is not None
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT created, updated, summary, summary_upto, message_count FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"created": row[0], "updated": row[1], "summary": row[2], "summary_upto": row[3], "message_count": row[4]}
+
+    def get_messages(self, session_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT role, content, time, extra FROM messages WHERE session_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+            (session_id, offset, -1 if limit is None else limit)
+        ).fetchall()
+        return [_message_from_row(row) for row in rows]
+
+    def message_count(self, session_id: str) -> int:
+        row = self._conn().execute("SELECT message_count FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row[0] if row else 0
+
+    def list_sessions(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sort_by: str = "created",
+        order: str = "asc"
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        if sort_by not in SESSION_SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort_by}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Invalid sort order: {order}")
+        direction = order.upper()
+        rows = self._conn().execute(
+            f"SELECT id, created, updated, message_count FROM sessions "
+            f"ORDER BY {SORT_COLUMNS[sort_by]} {direction}, rowid {direction} LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+        return [(row[0], {"created": row[1], "last_activity": row[2], "message_count": row[3]}) for row in rows]
+
+    def count_sessions(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    # -- writes ---------------------------------------------------------
+    def create_session(self, session_id: str, created: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sessions (id, created, updated) VALUES (?, ?, ?)",
+                (session_id, created, datetime.now().isoformat())
+            )
+
+    def append_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> int:
+        now = datetime.now().isoformat()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT message_count FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                conn.execute("INSERT INTO sessions (id, created, updated) VALUES (?, ?, ?)", (session_id, now, now))
+                start = 0
+            else:
+                start = row[0]
+            conn.executemany(
+                "INSERT INTO messages (session_id, idx, role, content, time, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                [_message_row(session_id, start + i, message) for i, message in enumerate(messages)]
+            )
+            count = start + len(messages)
+            conn.execute("UPDATE sessions SET message_count = ?, updated = ? WHERE id = ?", (count, now, session_id))
+        return count
+
+    def edit_message(self, session_id: str, message_index: int, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT role, content, time, extra FROM messages WHERE session_id = ? AND idx = ?", (session_id, message_index)
+            ).fetchone()
+            if row is None:
+                return None
+            message = {**_message_from_row(row), **fields}
+            conn.execute(
+                "REPLACE INTO messages (session_id, idx, role, content, time, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                _message_row(session_id, message_index, message)
+            )
+            # The summary covers the edited message; rebuild it from scratch
+            conn.execute(
+                "UPDATE sessions SET updated = ?, "
+                "summary = CASE WHEN ? < summary_upto THEN '' ELSE summary END, "
+                "summary_upto = CASE WHEN ? < summary_upto THEN 0 ELSE summary_upto END "
+                "WHERE id = ?",
+                (datetime.now().isoformat(), message_index, message_index, session_id)
+            )
+        return message
+
+    def replace_messages(self, session_id: str, start: int, messages: List[Dict[str, Any]]) -> Optional[int]:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT message_count FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None or not 0 <= start <= row[0]:
+                return None
+            conn.execute("DELETE FROM messages WHERE session_id = ? AND idx >= ?", (session_id, start))
+            conn.executemany(
+                "INSERT INTO messages (session_id, idx, role, content, time, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                [_message_row(session_id, start + i, message) for i, message in enumerate(messages)]
+            )
+            count = start + len(messages)
+            conn.execute(
+                "UPDATE sessions SET message_count = ?, updated = ?, "
+                "summary = CASE WHEN ? < summary_upto THEN '' ELSE summary END, "
+                "summary_upto = CASE WHEN ? < summary_upto THEN 0 ELSE summary_upto END "
+                "WHERE id = ?",
+                (count, datetime.now().isoformat(), start, start, session_id)
+            )
+        return count
+
+    def set_summary(
+        self,
+        session_id: str,
+        summary: str,
+        summary_upto: int,
+        based_on: Optional[Tuple[int, str]] = None
+    ) -> bool:
+        with self._transaction() as conn:
+            if based_on is None:
+                cursor = conn.execute("UPDATE sessions SET summary = ?, summary_upto = ? WHERE id = ?", (summary, summary_upto, session_id))
+            else:
+                cursor = conn.execute(
+                    "UPDATE sessions SET summary = ?, summary_upto = ? WHERE id = ? AND summary_upto = ? AND updated = ?",
+                    (summary, summary_upto, session_id, *based_on)
+                )
+            return cursor.rowcount > 0
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            return conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount > 0
+
+    def expire_sessions(self, updated_before: str) -> int:
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM messages WHERE session_id IN (SELECT id FROM sessions WHERE updated < ?)", (updated_before,)
+            )
+            return conn.execute("DELETE FROM sessions WHERE updated < ?", (updated_before,)).rowcount
+
+    def import_sessions(self, source: SessionStore) -> int:
+        """Copy every session from another store if this one is still empty; returns how many"""
+        sessions = []
+        for session_id, _ in source.list_sessions():
+            meta = source.get_session(session_id)
+            if meta is not None:
+                sessions.append((session_id, meta, source.get_messages(session_id)))
+        with self._transaction() as conn:
+            # Another worker may have imported while we were reading
+            if conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]:
+                return 0
+            for session_id, meta, messages in sessions:
+                conn.execute(
+                    "INSERT INTO sessions (id, created, updated, summary, summary_upto, message_count) VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, meta["created"], meta["updated"], meta["summary"], meta["summary_upto"], len(messages))
+                )
+                conn.executemany(
+                    "INSERT INTO messages (session_id, idx, role, content, time, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                    [_message_row(session_id, i, message) for i, message in enumerate(messages)]
+                )
+        logger.info(f"Imported {len(sessions)} chat sessions into {self.path}")
+        return len(sessions)
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,76 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+from .metrics import Gauge, registry
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Supported warm-up modes (WARM_UP)
+WARM_UP_OFF = "off"               # everything initializes on first use
+WARM_UP_BACKGROUND = "background" # serve immediately, warm up on a background thread
+WARM_UP_BLOCKING = "blocking"     # finish warming up before accepting requests
+WARM_UP_MODES = (WARM_UP_OFF, WARM_UP_BACKGROUND, WARM_UP_BLOCKING)
+
+startup_seconds: Gauge = registry.register(Gauge(
+    "inclusive_startup_seconds", "Time spent importing or initializing each subsystem", ["subsystem"]
+))
+
+# subsystem -> seconds, in the order they were initialized
+_timings: Dict[str, float] = {}
+_timings_lock = threading.Lock()
+
+# name -> hook, run in registration order by warm_up()
+_warm_up_hooks: Dict[str, Callable[[], object]] = {}
+
+
+@contextmanager
+def timed(subsystem: str) -> Iterator[None]:
+    """Record how long a subsystem takes to import or initialize"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _timings_lock:
+            _timings[subsystem] = _timings.get(subsystem, 0.0) + elapsed
+        startup_seconds.set(_timings[subsystem], (subsystem,))
+        logger.info(f"Initialized {subsystem} in {elapsed * 1000:.1f} ms")
+
+
+def startup_timings() -> Dict[str, float]:
+    """Seconds spent per subsystem so far"""
+    with _timings_lock:
+        return dict(_timings)
+
+
+def register_warm_up(name: str, hook: Callable[[], object]) -> None:
+    """
+    Add a hook that initializes a subsystem ahead of its first request.
+    Hooks are the subsystems' own lazy initializers, which time themselves.
+    """
+    _warm_up_hooks[name] = hook
+
+
+def warm_up() -> None:
+    """Run every warm-up hook (blocking); failures are logged and left to first use"""
+    started = time.perf_counter()
+    for name, hook in list(_warm_up_hooks.items()):
+        try:
+            hook()
+        except Exception as e:
+            logger.error(f"Warm-up of {name} failed: {str(e)}")
+    logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+def start_warm_up(mode: str) -> None:
+    """Warm up according to WARM_UP: not at all, on a background thread, or right here"""
+    if mode not in WARM_UP_MODES:
+        raise ValueError(f"Unknown warm-up mode: {mode}")
+    if mode == WARM_UP_BLOCKING:
+        warm_up()
+    elif mode == WARM_UP_BACKGROUND:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
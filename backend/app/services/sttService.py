@@ -0,0 +1,188 @@
+import io
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+import numpy as np
+import speech_recognition as sr
+from config import settings
+from .executors import stt_pool
+from .metrics import stage
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Analysis window for silence detection
+WINDOW_SECONDS = 0.03
+
+# Silence is measured relative to this percentile of window loudness,
+# so quiet and loud recordings split alike
+REFERENCE_PERCENTILE = 95
+
+
+class AudioDecodeError(ValueError):
+    """Raised when uploaded audio cannot be decoded"""
+
+
+class GoogleRecognizer:
+    """Google Web Speech API backend (the default)"""
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData, language: str) -> str:
+        return self.recognizer.recognize_google(audio, language=language)
+
+
+class SphinxRecognizer:
+    """Offline CMU Sphinx backend; needs pocketsphinx and its language models"""
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData, language: str) -> str:
+        return self.recognizer.recognize_sphinx(audio, language=language)
+
+
+# Recognizer backends by name; any object with recognize(audio, language) -> str works
+RECOGNIZERS: Dict[str, Callable[[], Any]] = {
+    "google": GoogleRecognizer,
+    "sphinx": SphinxRecognizer
+}
+
+_recognizer: Any = None
+
+
+def register_recognizer(name: str, factory: Callable[[], Any]) -> None:
+    """Make a recognizer backend selectable by name (e.g. a local stand-in for tests)"""
+    RECOGNIZERS[name] = factory
+
+
+def set_recognizer(name: str) -> None:
+    """Switch the active recognizer backend"""
+    global _recognizer
+    if name not in RECOGNIZERS:
+        raise ValueError(f"Unknown recognizer backend: {name}")
+    _recognizer = RECOGNIZERS[name]()
+
+
+def get_recognizer() -> Any:
+    """The active recognizer backend, created from STT_RECOGNIZER on first use"""
+    if _recognizer is None:
+        set_recognizer(settings.STT_RECOGNIZER)
+    return _recognizer
+
+
+def decode_audio(data: bytes) -> sr.AudioData:
+    """Decode WAV, AIFF or FLAC bytes from memory into 16-bit mono PCM"""
+    try:
+        with sr.AudioFile(io.BytesIO(data)) as source:
+            audio = sr.Recognizer().record(source)
+    except (ValueError, EOFError) as e:
+        raise AudioDecodeError("Unsupported or corrupt audio; send WAV, AIFF or FLAC") from e
+    return sr.AudioData(audio.get_raw_data(convert_width=2), audio.sample_rate, 2)
+
+
+def window_levels(samples: np.ndarray, window: int) -> np.ndarray:
+    """RMS level of each fixed-size window (the last partial window is dropped)"""
+    count = len(samples) // window
+    if count == 0:
+        return np.zeros(0)
+    frames = samples[:count * window].astype(np.float32).reshape(count, window)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def silence_cuts(silent: np.ndarray, min_windows: int) -> List[int]:
+    """Window indices at the middle of every silent run at least min_windows long"""
+    padded = np.concatenate(([False], silent, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [int((start + end) // 2) for start, end in zip(starts, ends) if end - start >= min_windows]
+
+
+def plan_chunks(cuts: List[int], total: int, max_len: int, min_len: int) -> List[Tuple[int, int]]:
+    """
+    Group the span [0, total) into chunks no longer than max_len, ending at
+    the latest silence cut that leaves at least min_len; spans with no
+    usable cut are split hard at max_len.
+    """
+    bounds: List[Tuple[int, int]] = []
+    start = 0
+    candidate = None
+    for cut in [*cuts, total]:
+        while cut - start > max_len:
+            end = candidate if candidate is not None else start + max_len
+            bounds.append((start, end))
+            start = end
+            candidate = None
+        if cut < total and cut - start >= min_len:
+            candidate = cut
+    if total > start:
+        bounds.append((start, total))
+    return bounds
+
+
+def split_on_silence(audio: sr.AudioData) -> List[sr.AudioData]:
+    """Split 16-bit mono audio at pauses into chunks, dropping chunks that are entirely silent"""
+    samples = np.frombuffer(audio.frame_data, dtype=np.int16)
+    window = max(int(audio.sample_rate * WINDOW_SECONDS), 1)
+    levels = window_levels(samples, window)
+    if levels.size == 0:
+        return [audio] if samples.size else []
+
+    threshold = np.percentile(levels, REFERENCE_PERCENTILE) * 10 ** (settings.STT_SILENCE_THRESHOLD_DB / 20)
+    silent = levels < threshold
+    cuts = silence_cuts(silent, max(int(settings.STT_MIN_SILENCE_SECONDS / WINDOW_SECONDS), 1))
+    bounds = plan_chunks(
+        cuts,
+        levels.size,
+        max(int(settings.STT_MAX_CHUNK_SECONDS / WINDOW_SECONDS), 1),
+        int(settings.STT_MIN_CHUNK_SECONDS / WINDOW_SECONDS)
+    )
+
+    chunks = []
+    for start, end in bounds:
+        if silent[start:end].all():
+            continue
+        # The final chunk also takes the trailing partial window
+        stop = len(samples) if end == levels.size else end * window
+        chunks.append(sr.AudioData(samples[start * window:stop].tobytes(), audio.sample_rate, 2))
+    return chunks
+
+
+def prepare_chunks(data: bytes) -> Tuple[float, List[sr.AudioData]]:
+    """Decode and split an upload; returns (duration in seconds, chunks)"""
+    audio = decode_audio(data)
+    return len(audio.frame_data) / (2 * audio.sample_rate), split_on_silence(audio)
+
+
+def recognize_chunk(recognizer: Any, audio: sr.AudioData, language: str) -> str:
+    """Recognize one chunk; silence or unintelligible speech yields an empty string"""
+    try:
+        return recognizer.recognize(audio, language).strip()
+    except sr.UnknownValueError:
+        return ""
+
+
+async def transcribe(data: bytes, language: str) -> Dict[str, Any]:
+    """
+    Decode audio bytes in memory, split long recordings on silence and
+    recognize the chunks in parallel on the STT executor pool.
+    """
+    started = time.monotonic()
+    with stage("stt_decode"):
+        duration, chunks = await stt_pool.run(prepare_chunks, data)
+    recognizer = get_recognizer()
+    with stage("stt_recognize"):
+        texts = await asyncio.gather(*(
+            stt_pool.run(recognize_chunk, recognizer, chunk, language) for chunk in chunks
+        ))
+    logger.info(f"Transcribed {len(chunks)} chunk(s) in {time.monotonic() - started:.2f}s")
+    return {
+        "text": " ".join(text for text in texts if text),
+        "language": language,
+        "duration": round(duration, 2),
+        "chunks": len(chunks)
+    }
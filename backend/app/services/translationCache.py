@@ -0,0 +1,229 @@
+import time
+import atexit
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from .executors import io_pool
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: NFC, trimmed, single-spaced"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_cache_key(text: str, source_language: str, target_language: str, model: str, prompt_version: str) -> str:
+    """Build a stable cache key for one translation request"""
+    parts = [
+        normalize_text(text),
+        source_language.strip().lower(),
+        target_language.strip().lower(),
+        model or "",
+        prompt_version
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Bounded in-memory LRU with TTL, backed by an optional SQLite tier.
+
+    Memory misses fall through to SQLite (when db_path is set) and disk hits
+    are promoted back into memory, so translations survive restarts. The
+    memory tier never touches SQLite: lookup() reads the disk tier on the
+    I/O pool, and put() queues disk writes for a background writer that
+    commits them in batches, so a miss never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: float = 86400.0,
+        db_path: Optional[str] = None,
+        flush_interval: float = 1.0
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # _lock guards the memory tier and the pending writes; _db_lock the connection
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending: Dict[str, Tuple[str, float]] = {}
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "bypasses": 0,
+            "disk_writes": 0
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM translations WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            threading.Thread(target=self._writer_loop, name="translation-cache-writer", daemon=True).start()
+            atexit.register(self.close)
+            logger.info(f"Translation cache disk tier enabled: {db_path}")
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        """Memory-tier lookup (caller holds _lock)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at >= now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+            del self._entries[key]
+            self.stats["expirations"] += 1
+        return None
+
+    def _get_disk(self, keys: List[str], now: float) -> Dict[str, str]:
+        """Disk-tier lookup of several keys, promoting hits into memory (blocking)"""
+        rows: Dict[str, Tuple[str, float]] = {}
+        found: Dict[str, str] = {}
+        with self._db_lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows.update((key, (value, expires_at)) for key, value, expires_at in self._db.execute(
+                    f"SELECT key, value, expires_at FROM translations WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            # Still holding _db_lock, so no queued write can land between the two checks
+            with self._lock:
+                for key in keys:
+                    # Entries put since the memory lookup, or queued but not yet written, are newer
+                    entry = self._entries.get(key) or self._pending.get(key) or rows.get(key)
+                    if entry is not None and entry[1] >= now:
+                        self._insert_locked(key, *entry)
+                        found[key] = entry[0]
+                        self.stats["disk_hits"] += 1
+                    else:
+                        self.stats["misses"] += 1
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached translation, or None on a miss (blocks on the disk tier; async callers use lookup)"""
+        found, missing = self._get_many_memory([key])
+        if missing:
+            found = self._get_disk(missing, time.time())
+        return found.get(key)
+
+    def _get_many_memory(self, keys: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        """Memory hits, and the keys left for the disk tier (counted as misses without one)"""
+        now = time.time()
+        found: Dict[str, str] = {}
+        missing: List[str] = []
+        with self._lock:
+            for key in keys:
+                value = self._get_memory(key, now)
+                if value is not None:
+                    found[key] = value
+                elif self._db is not None:
+                    missing.append(key)
+                else:
+                    self.stats["misses"] += 1
+        return found, missing
+
+    async def lookup(self, keys: List[str]) -> Dict[str, str]:
+        """get_many for async callers: the disk tier is read on the I/O pool, in one job"""
+        found, missing = self._get_many_memory(keys)
+        if missing:
+            found.update(await io_pool.run(self._get_disk, missing, time.time()))
+        return found
+
+    def put(self, key: str, value: str) -> None:
+        """Store a translation in memory and queue it for the disk tier, if enabled"""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._insert_locked(key, value, expires_at)
+            if self._db is not None and not self._closed:
+                self._pending[key] = (value, expires_at)
+        if self._db is not None:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write queued translations to the disk tier in one transaction"""
+        if self._db is None:
+            return
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            self._db.executemany(
+                "INSERT OR REPLACE INTO translations (key, value, expires_at) VALUES (?, ?, ?)",
+                [(key, value, expires_at) for key, (value, expires_at) in pending.items()]
+            )
+            self._db.commit()
+        with self._lock:
+            self.stats["disk_writes"] += len(pending)
+
+    def _writer_loop(self) -> None:
+        """Background batched writes to the disk tier"""
+        while not self._closed:
+            self._wakeup.wait()
+            # Let a burst of misses accumulate into one commit
+            time.sleep(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Translation cache writer error: {str(e)}")
+
+    def close(self) -> None:
+        """Write any queued translations and stop the background writer"""
+        if self._db is None or self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._wakeup.set()
+
+    def record_bypass(self) -> None:
+        """Count a request that skipped the cache"""
+        with self._lock:
+            self.stats["bypasses"] += 1
+
+    def _insert_locked(self, key: str, value: str, expires_at: float) -> None:
+        """Insert into the LRU, evicting the least recently used entries (caller holds _lock)"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """Snapshot of the cache counters"""
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "pending_writes": len(self._pending)
+            }
+
+    def clear(self) -> None:
+        """Drop every cached translation"""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
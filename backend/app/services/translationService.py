@@ -0,0 +1,237 @@
+import json
+import asyncio
+import logging
+from typing import Dict, List, Optional, Any
+from config import settings
+from .llmGateway import LLMGatewayError, chat_completion, first_choice_text
+from .translationCache import TranslationCache, make_cache_key
+from .singleFlight import SingleFlight
+from .contextBuilder import estimate_tokens
+from .upstreamScheduler import PRIORITY_BULK, PRIORITY_STANDARD, upstream_scheduler
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt changes so stale cached translations are not reused
+PROMPT_VERSION = "1"
+
+# Shared translation cache
+translation_cache = TranslationCache(
+    max_entries=settings.TRANSLATION_CACHE_SIZE,
+    ttl=settings.TRANSLATION_CACHE_TTL,
+    db_path=settings.TRANSLATION_CACHE_DB or None
+)
+
+# Upstream is overloaded or rate limiting us: retrying per segment would only add load
+OVERLOAD_STATUSES = (429, 503)
+
+# Identical in-flight translations share one upstream call
+translation_flight = SingleFlight("translation")
+
+
+def translation_stats() -> Dict[str, Any]:
+    """Cache and request-coalescing counters for translation"""
+    return {**translation_cache.get_stats(), "single_flight": translation_flight.get_stats()}
+
+
+def build_translation_prompt(text: str, source_language: str, target_language: str) -> str:
+    """Build the single-string translation prompt"""
+    return (
+        f"Translate the following text from {source_language} to {target_language}. "
+        f"Return only the translated text, with no additional explanation, transliteration, or formatting: {text}"
+    )
+
+
+async def translate_text(text: str, source_language: str, target_language: str, bypass_cache: bool = False) -> str:
+    """
+    Call the Groq API to translate text from source_language to target_language.
+    Returns only the translated text. Results are cached unless bypass_cache is set.
+    Raises LLMGatewayError on upstream failure.
+    """
+    if not text or not target_language:
+        return "Please provide text and select a language."
+
+    key = make_cache_key(text, source_language, target_language, settings.GROQ_MODEL, PROMPT_VERSION)
+    if bypass_cache:
+        translation_cache.record_bypass()
+    else:
+        cached = (await translation_cache.lookup([key])).get(key)
+        if cached is not None:
+            return cached
+
+    return await translation_flight.do(
+        key,
+        lambda: _translate_uncached(text, source_language, target_language, key, PRIORITY_STANDARD)
+    )
+
+
+def _completion_usage(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Token usage block of a raw completion body"""
+    return result.get("usage")
+
+
+async def _scheduled_completion(prompt: str, priority: int) -> Dict[str, Any]:
+    """Run a translation completion under upstream admission control"""
+    return await upstream_scheduler.run(
+        settings.GROQ_MODEL,
+        priority,
+        estimate_tokens(prompt) + settings.MAX_TOKENS,
+        lambda: chat_completion([{"role": "user", "content": prompt}]),
+        usage=_completion_usage
+    )
+
+
+async def _translate_uncached(text: str, source_language: str, target_language: str, key: str, priority: int) -> str:
+    """Translate one text upstream and store the result under key"""
+    prompt = build_translation_prompt(text, source_language, target_language)
+    result = await _scheduled_completion(prompt, priority)
+    translated_text = first_choice_text(result)
+    translation_cache.put(key, translated_text)
+    return translated_text
+
+
+def build_batch_prompt(segments: List[str], source_language: str, target_language: str) -> str:
+    """Build a prompt translating several segments at once, exchanged as JSON arrays"""
+    return (
+        f"Translate each string in the following JSON array from {source_language} to {target_language}. "
+        f"Return only a JSON array of the translated strings, in the same order and with the same length, "
+        f"with no additional explanation, transliteration, or formatting: {json.dumps(segments, ensure_ascii=False)}"
+    )
+
+
+def parse_batch_output(output: str, expected: int) -> Optional[List[str]]:
+    """Parse the model's JSON array; returns None if it is malformed or the wrong length"""
+    start, end = output.find("["), output.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        parsed = json.loads(output[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(parsed, list) or len(parsed) != expected or not all(isinstance(item, str) for item in parsed):
+        return None
+    return [item.strip() for item in parsed]
+
+
+def pack_segments(indices: List[int], segments: List[str]) -> List[List[int]]:
+    """Group segment indices into packs bounded by character and segment count"""
+    packs: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+    for index in indices:
+        length = len(segments[index])
+        if current and (current_chars + length > settings.TRANSLATION_BATCH_MAX_CHARS
+                        or len(current) >= settings.TRANSLATION_BATCH_MAX_SEGMENTS):
+            packs.append(current)
+            current, current_chars = [], 0
+        current.append(index)
+        current_chars += length
+    if current:
+        packs.append(current)
+    return packs
+
+
+async def _translate_pack(
+    pack: List[int],
+    segments: List[str],
+    source_language: str,
+    target_language: str,
+    results: List[Dict[str, Any]],
+    semaphore: asyncio.Semaphore
+) -> None:
+    """
+    Translate one pack in a single call, falling back to per-segment calls
+    only if the output cannot be parsed. If the call itself fails, the
+    pack's segments get error entries; overload errors (429/503) are raised,
+    since per-segment calls would fail the same way.
+    """
+    texts = [segments[i] for i in pack]
+    if len(pack) > 1:
+        try:
+            async with semaphore:
+                result = await _scheduled_completion(build_batch_prompt(texts, source_language, target_language), PRIORITY_BULK)
+            translations = parse_batch_output(first_choice_text(result), len(pack))
+        except LLMGatewayError as e:
+            if e.status_code in OVERLOAD_STATUSES:
+                raise
+            logger.warning(f"Packed translation to {target_language} failed: {e.message}")
+            for index in pack:
+                results[index] = {"index": index, "translated_text": None, "error": e.to_dict()}
+            return
+        if translations is not None:
+            for index, text, translated in zip(pack, texts, translations):
+                results[index] = {"index": index, "translated_text": translated, "error": None}
+                translation_cache.put(
+                    make_cache_key(text, source_language, target_language, settings.GROQ_MODEL, PROMPT_VERSION),
+                    translated
+                )
+            return
+        logger.warning(f"Unparseable packed translation to {target_language}; retrying {len(pack)} segments individually")
+
+    async def translate_one(index: int) -> None:
+        try:
+            async with semaphore:
+                key = make_cache_key(segments[index], source_language, target_language, settings.GROQ_MODEL, PROMPT_VERSION)
+                translated = await translation_flight.do(
+                    key,
+                    lambda: _translate_uncached(segments[index], source_language, target_language, key, PRIORITY_BULK)
+                )
+            results[index] = {"index": index, "translated_text": translated, "error": None}
+        except LLMGatewayError as e:
+            results[index] = {"index": index, "translated_text": None, "error": e.to_dict()}
+
+    await asyncio.gather(*(translate_one(index) for index in pack))
+
+
+async def translate_batch(
+    segments: List[str],
+    source_language: str,
+    target_languages: List[str],
+    bypass_cache: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Translate many segments into one or more target languages.
+
+    Cached segments are answered directly; the rest are packed several per
+    prompt and all packs for all targets run concurrently under
+    TRANSLATION_BATCH_CONCURRENCY. Results keep input order, with an error
+    entry instead of a translation for any segment that failed. Raises
+    LLMGatewayError (and abandons the remaining packs) if upstream is
+    overloaded or rate limiting.
+    """
+    semaphore = asyncio.Semaphore(settings.TRANSLATION_BATCH_CONCURRENCY)
+    tasks = []
+    output = []
+    for target_language in target_languages:
+        results: List[Dict[str, Any]] = [{} for _ in segments]
+        keys = {
+            index: make_cache_key(text, source_language, target_language, settings.GROQ_MODEL, PROMPT_VERSION)
+            for index, text in enumerate(segments) if text.strip()
+        }
+        if bypass_cache:
+            for _ in keys:
+                translation_cache.record_bypass()
+            cached = {}
+        else:
+            cached = await translation_cache.lookup(list(keys.values()))
+        missing: List[int] = []
+        for index in range(len(segments)):
+            if index not in keys:
+                results[index] = {"index": index, "translated_text": "", "error": None}
+            elif keys[index] in cached:
+                results[index] = {"index": index, "translated_text": cached[keys[index]], "error": None}
+            else:
+                missing.append(index)
+
+        for pack in pack_segments(missing, segments):
+            tasks.append(_translate_pack(pack, segments, source_language, target_language, results, semaphore))
+        output.append({"target_language": target_language, "translations": results})
+
+    running = [asyncio.ensure_future(task) for task in tasks]
+    try:
+        await asyncio.gather(*running)
+    finally:
+        for task in running:
+            task.cancel()
+    return output
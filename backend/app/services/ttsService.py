@@ -0,0 +1,181 @@
+import io
+import re
+import asyncio
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from config import settings
+from .audioCache import AudioCache, make_audio_key
+from .executors import io_pool, read_file, tts_pool
+from .metrics import stage
+from .singleFlight import SingleFlight
+from .startup import timed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Synthesis engine identifier, part of every audio cache key
+TTS_ENGINE = "gtts"
+
+# Sentence boundary: terminal punctuation (including the Devanagari danda) followed by whitespace, or a newline
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?\u0964\u0965])\s+|\n+")
+
+# Shared content-addressed audio cache
+audio_cache = AudioCache(settings.TTS_CACHE_DIR, settings.TTS_CACHE_MAX_BYTES)
+
+# Identical in-flight syntheses share one gTTS call
+tts_flight = SingleFlight("tts")
+
+
+def tts_stats() -> Dict[str, Any]:
+    """Cache and request-coalescing counters for speech synthesis"""
+    return {**audio_cache.get_stats(), "single_flight": tts_flight.get_stats()}
+
+
+@lru_cache(maxsize=None)
+def load_gtts() -> Any:
+    """Import gTTS (and requests) on first use; returns the gTTS class"""
+    with timed("gtts"):
+        from gtts import gTTS
+    return gTTS
+
+
+def synthesize_bytes(text: str, lang: str, slow: bool = False) -> bytes:
+    """Synthesize speech with gTTS and return the MP3 bytes"""
+    tts = load_gtts()(text=text, lang=lang, slow=slow)
+    with io.BytesIO() as audio_buffer:
+        tts.write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
+
+def audio_key(text: str, lang: str, slow: bool = False) -> str:
+    """Audio cache key of a synthesis request"""
+    return make_audio_key(text, lang, slow, TTS_ENGINE)
+
+
+def _synthesis(key: str, text: str, lang: str, slow: bool) -> Callable[[], Awaitable[str]]:
+    """Factory for the single-flight call that synthesizes text into the cache under key"""
+    async def synthesize() -> str:
+        logger.info(f"Synthesizing speech for text: '{text[:50]}' in language: {lang}")
+        with stage("tts_synthesize"):
+            data = await tts_pool.run(synthesize_bytes, text, lang, slow)
+        return await io_pool.run(audio_cache.put, key, data)
+
+    return synthesize
+
+
+async def get_or_synthesize(text: str, lang: str, slow: bool = False) -> Tuple[str, str]:
+    """Return (key, path) of cached audio, synthesizing it on a miss; synthesis and the cache write run on executor pools"""
+    key = audio_key(text, lang, slow)
+    path = audio_cache.get(key)
+    if path is None:
+        path = await tts_flight.do(key, _synthesis(key, text, lang, slow))
+    return key, path
+
+
+def _log_synthesis_error(task: "asyncio.Task[str]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background TTS error: {str(task.exception())}")
+
+
+def start_synthesis(text: str, lang: str, slow: bool = False) -> str:
+    """
+    Return the audio key for text right away, synthesizing it in the
+    background unless it is already cached. Fetches of the key made while
+    synthesis is running wait for it (see wait_for_audio).
+    """
+    key = audio_key(text, lang, slow)
+    if audio_cache.get(key) is None:
+        tts_flight.start(key, _synthesis(key, text, lang, slow)).add_done_callback(_log_synthesis_error)
+    return key
+
+
+async def wait_for_audio(key: str) -> Optional[str]:
+    """Path of the cached audio for key, waiting out an in-flight synthesis; None if unknown"""
+    path = audio_cache.get(key)
+    if path is None:
+        task = tts_flight.inflight(key)
+        # It may also have finished since the lookup above
+        path = await asyncio.shield(task) if task is not None else audio_cache.get(key)
+    return path
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences for pipelined synthesis"""
+    return [part.strip() for part in SENTENCE_BOUNDARY.split(text) if part.strip()]
+
+
+async def sentences_from_tokens(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Regroup a token stream (e.g. from a streaming LLM response) into complete sentences"""
+    buffer = ""
+    async for token in tokens:
+        buffer += token
+        parts = SENTENCE_BOUNDARY.split(buffer)
+        # The last part may still be growing
+        buffer = parts.pop()
+        for part in parts:
+            if part.strip():
+                yield part.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+async def _iterate(items: Union[Iterable[str], AsyncIterator[str]]) -> AsyncIterator[str]:
+    """Iterate a sync iterable or an async iterator uniformly"""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def stream_speech(
+    sentences: Union[Iterable[str], AsyncIterator[str]],
+    lang: str,
+    slow: bool = False,
+    concurrency: int = 0
+) -> AsyncIterator[bytes]:
+    """
+    Synthesize sentences concurrently (at most `concurrency` at a time) and
+    yield their MP3 bytes in input order. Each clip is yielded as soon as it
+    and those before it are ready, while later sentences are still being
+    read from the source, so playback can start after the first sentence.
+    Each sentence goes through the audio cache.
+    """
+    concurrency = concurrency or settings.TTS_STREAM_CONCURRENCY
+
+    async def synthesize(sentence: str) -> bytes:
+        _, path = await get_or_synthesize(sentence, lang, slow)
+        return await read_file(path)
+
+    source = _iterate(sentences)
+
+    async def next_sentence() -> str:
+        return await source.__anext__()
+
+    pending: "deque[asyncio.Task]" = deque()
+    reading: Optional["asyncio.Task[str]"] = None
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            if reading is None and not exhausted and len(pending) < concurrency:
+                reading = asyncio.create_task(next_sentence())
+            # Wake up for whichever comes first: the head clip or the next sentence
+            waiting = [task for task in (pending[0] if pending else None, reading) if task is not None]
+            await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if pending and pending[0].done():
+                yield pending.popleft().result()
+            if reading is not None and reading.done():
+                try:
+                    pending.append(asyncio.create_task(synthesize(reading.result())))
+                except StopAsyncIteration:
+                    exhausted = True
+                reading = None
+    finally:
+        for task in pending:
+            task.cancel()
+        if reading is not None:
+            reading.cancel()
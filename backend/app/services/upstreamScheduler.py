@@ -0,0 +1,340 @@
+import time
+import heapq
+import random
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import settings
+from .llmGateway import LLMGatewayError, parse_retry_after
+from .metrics import record_token_usage, upstream_errors, upstream_retries, upstream_seconds
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Lower values are admitted first
+PRIORITY_INTERACTIVE = 0   # chat turns
+PRIORITY_STANDARD = 5      # single translations
+PRIORITY_BULK = 10         # batch translation, background summaries
+
+# Weight of the newest sample in the service-time moving average
+SERVICE_TIME_ALPHA = 0.2
+
+
+def classify_error(exc: BaseException) -> Tuple[bool, Optional[float]]:
+    """Return (retryable, retry_after seconds) for an upstream exception"""
+    if isinstance(exc, LLMGatewayError):
+        return exc.retryable, exc.retry_after
+    # Imported here so the scheduler does not pull in the SDK at startup
+    import groq
+    if isinstance(exc, (groq.APITimeoutError, groq.APIConnectionError)):
+        return True, None
+    if isinstance(exc, groq.APIStatusError):
+        retryable = exc.status_code == 429 or exc.status_code >= 500
+        return retryable, parse_retry_after(exc.response.headers.get("retry-after"))
+    return False, None
+
+
+class _Waiter:
+    """A queued admission request"""
+
+    def __init__(self, tokens: int, future: asyncio.Future):
+        self.tokens = tokens
+        self.future = future
+
+
+class ModelLimiter:
+    """Admission control for one upstream model.
+
+    Enforces a concurrency cap and a tokens-per-minute bucket, admits queued
+    callers in priority order, sheds callers whose deadline cannot be met
+    and trips a circuit breaker after repeated upstream failures.
+    """
+
+    def __init__(self, model: str, concurrency: int, tokens_per_minute: int):
+        self.model = model
+        self.concurrency = concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.avg_service_time = 1.0
+
+        # Circuit breaker state
+        self.failures = 0
+        self.open_until = 0.0
+        self._trial_in_flight = False
+
+        self.stats: Dict[str, int] = {"admitted": 0, "queued": 0, "shed": 0, "breaker_rejections": 0, "breaker_trips": 0}
+
+    # -- token bucket ---------------------------------------------------
+    def _refill(self) -> None:
+        if not self.tokens_per_minute:
+            return
+        now = time.monotonic()
+        self.tokens = min(
+            float(self.tokens_per_minute),
+            self.tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0
+        )
+        self._refilled_at = now
+
+    def _clamp(self, tokens: int) -> int:
+        """A single request can never need more than the whole bucket"""
+        return min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+
+    def _can_grant(self, tokens: int) -> bool:
+        self._refill()
+        return self.in_flight < self.concurrency and (not self.tokens_per_minute or self.tokens >= tokens)
+
+    def _grant(self, tokens: int) -> None:
+        self.in_flight += 1
+        self.tokens -= tokens
+        self.stats["admitted"] += 1
+
+    def _dispatch(self) -> None:
+        """Admit queued waiters in priority order while capacity allows"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            waiter = self._waiters[0][2]
+            if waiter.future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_grant(waiter.tokens):
+                if self.in_flight < self.concurrency and self.tokens_per_minute:
+                    # Blocked on tokens only: wake up once enough have refilled
+                    delay = (waiter.tokens - self.tokens) * 60.0 / self.tokens_per_minute
+                    self._timer = asyncio.get_running_loop().call_later(max(delay, 0.01), self._dispatch)
+                break
+            heapq.heappop(self._waiters)
+            self._grant(waiter.tokens)
+            waiter.future.set_result(None)
+
+    # -- circuit breaker ------------------------------------------------
+    def _check_breaker(self) -> bool:
+        """Return True if this call is the half-open trial; raise if the breaker is open"""
+        if not self.open_until:
+            return False
+        if time.monotonic() < self.open_until or self._trial_in_flight:
+            self.stats["breaker_rejections"] += 1
+            raise LLMGatewayError(f"Upstream {self.model} unavailable (circuit open)", status_code=503, retryable=True)
+        self._trial_in_flight = True
+        return True
+
+    def end_trial(self) -> None:
+        """
+        Settle a half-open trial that ended without a verdict (cancelled or
+        never sent), so the next call can be the trial instead
+        """
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.open_until = 0.0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= settings.UPSTREAM_BREAKER_THRESHOLD:
+            if not self.open_until or self._trial_in_flight:
+                self.stats["breaker_trips"] += 1
+                logger.warning(f"Circuit breaker opened for upstream model {self.model}")
+            self.open_until = time.monotonic() + settings.UPSTREAM_BREAKER_COOLDOWN
+            self._trial_in_flight = False
+
+    # -- admission ------------------------------------------------------
+    def _expected_wait(self, priority: int) -> float:
+        """Rough queueing delay for a new caller at this priority"""
+        ahead = sum(1 for entry in self._waiters if entry[0] <= priority and not entry[2].future.done())
+        busy = max(self.in_flight - self.concurrency + 1, 0)
+        return (ahead + busy) / self.concurrency * self.avg_service_time
+
+    async def acquire(self, priority: int, tokens: int, deadline: float) -> bool:
+        """
+        Wait for admission or raise a 503 LLMGatewayError. Returns True if
+        the call is the breaker's half-open trial; the caller must then
+        record its outcome or call end_trial().
+        """
+        trial = self._check_breaker()
+        try:
+            await self._admit(priority, self._clamp(tokens), deadline)
+        except BaseException:
+            if trial:
+                self.end_trial()
+            raise
+        return trial
+
+    async def _admit(self, priority: int, tokens: int, deadline: float) -> None:
+        if not self._waiters and self._can_grant(tokens):
+            self._grant(tokens)
+            return
+
+        now = time.monotonic()
+        if now + self._expected_wait(priority) > deadline:
+            self.stats["shed"] += 1
+            raise LLMGatewayError(f"Upstream {self.model} overloaded, request shed", status_code=503, retryable=True)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), _Waiter(tokens, future)))
+        self.stats["queued"] += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - now, 0))
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Admitted right as the deadline passed; give the slot back
+                self.release(tokens, tokens, 0.0)
+            future.cancel()
+            self.stats["shed"] += 1
+            raise LLMGatewayError(f"Upstream {self.model} queue deadline exceeded", status_code=503, retryable=True)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(tokens, tokens, 0.0)
+            future.cancel()
+            raise
+
+    def release(self, tokens_reserved: int, tokens_used: Optional[int], elapsed: float) -> None:
+        """Free a slot, settle the token reservation against actual usage and admit the next waiter"""
+        self.in_flight -= 1
+        if self.tokens_per_minute and tokens_used is not None:
+            self.tokens -= self._clamp(tokens_used) - self._clamp(tokens_reserved)
+        if elapsed > 0:
+            self.avg_service_time += SERVICE_TIME_ALPHA * (elapsed - self.avg_service_time)
+        self._dispatch()
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            **self.stats,
+            "in_flight": self.in_flight,
+            "waiting": sum(1 for entry in self._waiters if not entry[2].future.done()),
+            "tokens_available": int(self.tokens) if self.tokens_per_minute else None,
+            "avg_service_time": round(self.avg_service_time, 3),
+            "breaker_open": bool(self.open_until and time.monotonic() < self.open_until)
+        }
+
+
+class UpstreamScheduler:
+    """Per-model admission control, prioritized queueing and retries for Groq calls"""
+
+    def __init__(self):
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self.retries = 0
+
+    def limiter(self, model: str) -> ModelLimiter:
+        """Get or create the limiter for a model, applying per-model overrides"""
+        if model not in self._limiters:
+            limits = settings.UPSTREAM_MODEL_LIMITS.get(model, {})
+            self._limiters[model] = ModelLimiter(
+                model,
+                concurrency=int(limits.get("concurrency", settings.UPSTREAM_MAX_CONCURRENCY)),
+                tokens_per_minute=int(limits.get("tokens_per_minute", settings.UPSTREAM_TOKENS_PER_MINUTE))
+            )
+        return self._limiters[model]
+
+    @asynccontextmanager
+    async def admit(self, model: str, priority: int, tokens: int, deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one admitted slot for the duration of the block (used for streaming calls)"""
+        limiter = self.limiter(model)
+        now = time.monotonic()
+        deadline = deadline or now + settings.UPSTREAM_QUEUE_TIMEOUT
+        trial = await limiter.acquire(priority, tokens, deadline)
+        started = time.monotonic()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            retryable, _ = classify_error(e)
+            outcome = "error"
+            upstream_errors.inc((model, str(retryable).lower()))
+            if retryable:
+                limiter.record_failure()
+            elif isinstance(e, Exception):
+                # Upstream answered; the request itself was bad
+                limiter.record_success()
+            raise
+        else:
+            limiter.record_success()
+        finally:
+            if trial:
+                limiter.end_trial()
+            elapsed = time.monotonic() - started
+            upstream_seconds.observe(elapsed, (model, outcome))
+            limiter.release(tokens, None, elapsed)
+
+    async def run(
+        self,
+        model: str,
+        priority: int,
+        tokens: int,
+        call: Callable[[], Awaitable[Any]],
+        usage: Optional[Callable[[Any], Optional[Dict[str, Any]]]] = None
+    ) -> Any:
+        """
+        Run an upstream call under admission control, retrying retryable
+        failures with jittered exponential backoff (honoring Retry-After)
+        until GROQ_MAX_RETRIES or the request deadline is exhausted.
+
+        usage extracts the response's token usage block (prompt_tokens,
+        completion_tokens, total_tokens) to settle the token reservation.
+        """
+        limiter = self.limiter(model)
+        deadline = time.monotonic() + settings.UPSTREAM_DEADLINE
+        attempt = 0
+        while True:
+            trial = await limiter.acquire(priority, tokens, min(deadline, time.monotonic() + settings.UPSTREAM_QUEUE_TIMEOUT))
+            started = time.monotonic()
+            used: Optional[int] = None
+            outcome = "error"
+            try:
+                result = await call()
+                outcome = "ok"
+                usage_block = usage(result) if usage else None
+                if usage_block:
+                    used = usage_block.get("total_tokens")
+                    record_token_usage(model, usage_block)
+                limiter.record_success()
+                return result
+            except Exception as e:
+                retryable, retry_after = classify_error(e)
+                upstream_errors.inc((model, str(retryable).lower()))
+                if not retryable:
+                    # Upstream answered; the request itself was bad
+                    limiter.record_success()
+                    raise
+                limiter.record_failure()
+                if attempt >= settings.GROQ_MAX_RETRIES:
+                    raise
+                backoff = retry_after if retry_after is not None else random.uniform(
+                    0, min(settings.UPSTREAM_BACKOFF_MAX, settings.UPSTREAM_BACKOFF_BASE * 2 ** attempt)
+                )
+                if time.monotonic() + backoff > deadline:
+                    raise
+                attempt += 1
+                self.retries += 1
+                upstream_retries.inc((model,))
+                logger.warning(f"Retrying {model} call in {backoff:.2f}s (attempt {attempt}): {str(e)}")
+            finally:
+                if trial:
+                    limiter.end_trial()
+                elapsed = time.monotonic() - started
+                upstream_seconds.observe(elapsed, (model, outcome))
+                limiter.release(tokens, used, elapsed)
+            await asyncio.sleep(backoff)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model admission counters"""
+        return {
+            "retries": self.retries,
+            "models": {model: limiter.get_stats() for model, limiter in self._limiters.items()}
+        }
+
+
+# Shared scheduler for all upstream LLM traffic
+upstream_scheduler = UpstreamScheduler()
@@ -0,0 +1 @@
+# Benchmarks; run individual modules with `python -m benchmarks.<name>` from backend/
@@ -0,0 +1,26 @@
+"""
+ASGI entry point used by the load test: imports the app under test with
+gTTS replaced by a stub, so TTS scenarios measure the service rather than
+Google's servers.
+
+BENCH_APP selects the module whose app is served ("main" or "app.main", both
+built by create_app); BENCH_TTS_LATENCY is the stub's synthesis time in seconds.
+"""
+import os
+import time
+import importlib
+from app.services import ttsService
+
+# A few hundred bytes that start like an MP3 frame
+STUB_MP3 = b"\xff\xfb\x90\x64" + b"\x00" * 412
+
+
+def stub_synthesize_bytes(text: str, lang: str, slow: bool = False) -> bytes:
+    """Blocking stand-in for gTTS with a fixed synthesis time"""
+    time.sleep(float(os.getenv("BENCH_TTS_LATENCY", "0.05")))
+    return STUB_MP3
+
+
+ttsService.synthesize_bytes = stub_synthesize_bytes
+
+app = importlib.import_module(os.getenv("BENCH_APP", "main")).app
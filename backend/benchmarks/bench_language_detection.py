@@ -0,0 +1,64 @@
+"""
+Compare the script-aware language detector with the previous implementation.
+
+Run from backend/:  python -m benchmarks.bench_language_detection [--number N]
+"""
+import argparse
+import json
+import timeit
+from langdetect import detect
+from langdetect.lang_detect_exception import LangDetectException
+from app.services.languageDetector import detect_language
+
+SAMPLES = {
+    "english": "Hello, could you tell me about the weather in Bangalore this week?",
+    "hindi": "नमस्ते, क्या आप मुझे इस सप्ताह बैंगलोर के मौसम के बारे में बता सकते हैं?",
+    "telugu": "నమస్కారం, ఈ వారం బెంగళూరు వాతావరణం గురించి చెప్పగలరా?",
+    "kannada": "ನಮಸ್ಕಾರ, ಈ ವಾರ ಬೆಂಗಳೂರಿನ ಹವಾಮಾನದ ಬಗ್ಗೆ ಹೇಳಬಹುದೇ?",
+    "tamil": "வணக்கம், இந்த வாரம் பெங்களூரு வானிலை பற்றி சொல்ல முடியுமா?",
+    "long_hindi_answer": "मौसम आज साफ रहेगा और तापमान सामान्य रहेगा। " * 40,
+}
+
+
+def legacy_detect_language(text: str) -> str:
+    """The pre-existing ChatService.detect_language, minus logging"""
+    try:
+        if any(word in text.lower() for word in ['namaste', 'hindi', 'बात', 'नमस्ते', 'हिंदी']):
+            return 'hi'
+        if any(word in text.lower() for word in ['telugu', 'తెలుగు', 'నమస్కారం']):
+            return 'te'
+        detected_language = detect(text)
+        if detected_language in ['en', 'hi', 'te', 'kn', 'ta']:
+            return detected_language
+        return "en"
+    except LangDetectException:
+        return "en"
+
+
+def bench(func, text: str, number: int) -> float:
+    """Mean microseconds per call"""
+    return timeit.timeit(lambda: func(text), number=number) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200, help="calls per sample")
+    args = parser.parse_args()
+
+    # Load langdetect profiles outside the timed region
+    legacy_detect_language("warm up")
+
+    results = {}
+    for name, text in SAMPLES.items():
+        results[name] = {
+            "legacy_us": round(bench(legacy_detect_language, text, args.number), 2),
+            "uncached_us": round(bench(detect_language.__wrapped__, text, args.number), 2),
+            "memoized_us": round(bench(detect_language, text, args.number), 2),
+            "legacy_result": legacy_detect_language(text),
+            "result": detect_language(text),
+        }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
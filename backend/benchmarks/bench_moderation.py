@@ -0,0 +1,100 @@
+"""
+Compare the compiled moderation prefilter with per-term substring scans as
+the term lists grow.
+
+Run from backend/:  python -m benchmarks.bench_moderation [--number N]
+"""
+import argparse
+import json
+import random
+import time
+import timeit
+from typing import Dict, List
+from app.services.moderation import TermAutomaton
+
+# Letter ranges per language used to generate synthetic terms and text
+SCRIPTS = {
+    "en": [chr(c) for c in range(ord("a"), ord("z") + 1)],
+    "hi": [chr(c) for c in range(0x0915, 0x0939 + 1)],
+    "te": [chr(c) for c in range(0x0C15, 0x0C39 + 1)],
+    "kn": [chr(c) for c in range(0x0C95, 0x0CB9 + 1)],
+    "ta": [chr(c) for c in range(0x0B95, 0x0BB9 + 1) if chr(c).isalpha()],
+}
+
+TERM_COUNTS = (100, 1000, 5000, 20000)
+TEXT_LENGTHS = (100, 1000, 10000)
+
+
+def random_word(rng: random.Random, letters: List[str]) -> str:
+    return "".join(rng.choice(letters) for _ in range(rng.randint(4, 9)))
+
+
+def make_terms(rng: random.Random, count: int, texts: List[str]) -> Dict[str, List[str]]:
+    """
+    count terms spread evenly over the five languages, none of them found in
+    texts, so neither approach can stop early
+    """
+    terms: Dict[str, List[str]] = {}
+    for lang, letters in SCRIPTS.items():
+        terms[lang] = []
+        while len(terms[lang]) < count // len(SCRIPTS):
+            term = random_word(rng, letters)
+            if not any(term in text for text in texts):
+                terms[lang].append(term)
+    return terms
+
+
+def make_text(rng: random.Random, length: int) -> str:
+    """Mixed-language text of roughly length characters"""
+    words: List[str] = []
+    size = 0
+    while size < length:
+        word = random_word(rng, SCRIPTS[rng.choice(list(SCRIPTS))])
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def legacy_screen(text: str, terms: List[str]) -> bool:
+    """The previous approach: one substring scan per term"""
+    lowered = text.lower()
+    return any(term in lowered for term in terms)
+
+
+def bench(func, number: int) -> float:
+    """Mean microseconds per call"""
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=50, help="calls per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = {length: make_text(rng, length) for length in TEXT_LENGTHS}
+    results = {}
+    for count in TERM_COUNTS:
+        terms = make_terms(rng, count, list(texts.values()))
+        flat = [term for lang_terms in terms.values() for term in lang_terms]
+
+        started = time.perf_counter()
+        automaton = TermAutomaton((term, lang) for lang, lang_terms in terms.items() for term in lang_terms)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        results[f"{count}_terms"] = {
+            "compile_ms": round(compile_ms, 1),
+            "states": automaton.state_count,
+            **{
+                f"{length}_chars": {
+                    "legacy_us": round(bench(lambda: legacy_screen(text, flat), args.number), 1),
+                    "automaton_us": round(bench(lambda: automaton.search(text), args.number), 1),
+                }
+                for length, text in texts.items()
+            }
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Load and latency benchmark for the chat, translation and TTS endpoints.
+
+Starts a mock Groq server and the app under test (with a stubbed TTS
+engine) as subprocesses on local ports, drives each scenario at each
+concurrency level and reports throughput, p50/p95/p99 latency and the
+app's memory use. Results are written as JSON; pass --baseline with an
+earlier results file to print the change per scenario.
+
+Run from backend/:
+    python -m benchmarks.load_test [--app main|app.main] [--scenarios text-query,translate,text-to-speech]
+        [--concurrency 1,8,32] [--requests 200] [--latency 0.2] [--token-rate 200]
+        [--output bench_results.json] [--baseline old_results.json]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Environment the app needs to start; real values from the caller win except
+# for the Groq endpoints, which always point at the mock server
+BASE_ENV = {
+    "API_V1_STR": "/api/v1",
+    "PROJECT_NAME": "Inclusive AI Benchmark",
+    "HOST": "127.0.0.1",
+    "PORT": "8000",
+    "GROQ_API_KEY": "mock-key",
+    "GROQ_MODEL": "mock-model",
+    "CHAT_MODEL": "mock-model",
+    "MAX_TOKENS": "256",
+    "TEMPERATURE": "0.3",
+    "GESTURE_CONFIDENCE_THRESHOLD": "0.7",
+    "SWIPE_THRESHOLD": "0.2",
+}
+
+
+def scenario_request(name: str, api: str, index: int) -> Tuple[str, str, Dict[str, Any]]:
+    """(method, path, JSON body) for request number index; bodies vary so caches miss"""
+    if name == "text-query":
+        return "POST", f"{api}/text-query/", {"query": f"Tell me something interesting, request {index}", "history_mode": "none"}
+    if name == "translate":
+        return "POST", f"{api}/translate", {"text": f"Good morning, how are you today? ({index})", "source_language": "English", "target_language": "Hindi"}
+    if name == "text-to-speech":
+        return "POST", f"{api}/text-to-speech", {"text": f"Hello there, this is sentence number {index}.", "language": "en"}
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+SCENARIOS = ("text-query", "translate", "text-to-speech")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_kb(pid: int, field: str = "VmRSS") -> Optional[int]:
+    """Resident (VmRSS) or peak (VmHWM) memory of a process in KiB; Linux only"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def start_process(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited during startup:\n{process.stderr.read().decode(errors='replace')}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, api: str, concurrency: int, total: int, offset: int) -> Dict[str, Any]:
+    """Issue total requests with at most concurrency in flight; collect latencies"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(offset, offset + total))
+
+    async def worker() -> None:
+        for index in counter:
+            method, path, body = scenario_request(name, api, index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code) if response.status_code >= 400 else None
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if status:
+                errors[status] = errors.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0
+        }
+    }
+
+
+async def drive(args: argparse.Namespace, app_url: str, app_pid: int, mock_url: str) -> List[Dict[str, Any]]:
+    api = args.api_prefix
+    results = []
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2, max_keepalive_connections=max(args.concurrency) * 2)
+    async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=args.timeout) as client:
+        offset = 0
+        for name in args.scenarios:
+            # Warm up imports, pools and connections outside the measurement
+            await run_scenario(client, name, api, 1, args.warmup, offset)
+            offset += args.warmup
+            for concurrency in args.concurrency:
+                rss_before = rss_kb(app_pid)
+                upstream_before = httpx.get(f"{mock_url}/stats").json()["requests"]
+                result = await run_scenario(client, name, api, concurrency, args.requests, offset)
+                offset += args.requests
+                rss_after = rss_kb(app_pid)
+                peak = rss_kb(app_pid, "VmHWM")
+                result.update({
+                    "scenario": name,
+                    "concurrency": concurrency,
+                    "upstream_calls": httpx.get(f"{mock_url}/stats").json()["requests"] - upstream_before,
+                    "memory_mb": {
+                        "rss_before": round(rss_before / 1024, 1) if rss_before else None,
+                        "rss_after": round(rss_after / 1024, 1) if rss_after else None,
+                        "peak": round(peak / 1024, 1) if peak else None
+                    }
+                })
+                results.append(result)
+                latency = result["latency_ms"]
+                print(
+                    f"{name:<15} c={concurrency:<4} {result['throughput_rps']:>9.1f} req/s  "
+                    f"p50={latency['p50']:>8.1f}ms p95={latency['p95']:>8.1f}ms p99={latency['p99']:>8.1f}ms  "
+                    f"errors={sum(result['errors'].values())}  rss={result['memory_mb']['rss_after']}MB"
+                )
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print throughput and p95 changes against an earlier results file"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    def change(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        old = baseline.get((result["scenario"], result["concurrency"]))
+        if old is None:
+            continue
+        print(
+            f"{result['scenario']:<15} c={result['concurrency']:<4} "
+            f"throughput {change(result['throughput_rps'], old['throughput_rps']):>8}  "
+            f"p95 {change(result['latency_ms']['p95'], old['latency_ms']['p95']):>8}  "
+            f"p99 {change(result['latency_ms']['p99'], old['latency_ms']['p99']):>8}"
+        )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comma_list(cast: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+    return lambda value: [cast(item) for item in value.split(",") if item]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="main", choices=["main", "app.main"], help="app module to benchmark")
+    parser.add_argument("--scenarios", type=comma_list(str), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=comma_list(int), default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per scenario")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock Groq time to first token (s)")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="mock Groq tokens per second (0 = instant)")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="mock Groq tokens per answer")
+    parser.add_argument("--tts-latency", type=float, default=0.05, help="stub TTS synthesis time (s)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request (s)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+
+    mock_port, app_port = free_port(), free_port()
+    mock_url, app_url = f"http://127.0.0.1:{mock_port}", f"http://127.0.0.1:{app_port}"
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        env = {
+            **BASE_ENV,
+            **os.environ,
+            "API_V1_STR": args.api_prefix,
+            "GROQ_BASE_URL": mock_url,
+            "GROQ_API_URL": f"{mock_url}/openai/v1/chat/completions",
+            # Fresh state per run so results do not depend on earlier runs
+            "CHAT_STORAGE_PATH": os.path.join(workdir, "chat_histories.json"),
+            "CHAT_SQLITE_PATH": os.path.join(workdir, "chat_sessions.db"),
+            "TTS_CACHE_DIR": os.path.join(workdir, "tts_cache"),
+            "TRANSLATION_CACHE_DB": os.path.join(workdir, "translations.db"),
+            "BENCH_APP": args.app,
+            "BENCH_TTS_LATENCY": str(args.tts_latency),
+        }
+
+        mock = start_process([
+            "-m", "benchmarks.mock_groq", "--port", str(mock_port), "--latency", str(args.latency),
+            "--token-rate", str(args.token_rate), "--answer-tokens", str(args.answer_tokens)
+        ], env)
+        app = None
+        try:
+            wait_ready(f"{mock_url}/stats", mock)
+            app = start_process([
+                "-m", "uvicorn", "benchmarks.bench_app:app", "--host", "127.0.0.1", "--port", str(app_port),
+                "--workers", str(args.workers), "--log-level", "warning"
+            ], env)
+            wait_ready(f"{app_url}/docs", app)
+            results = asyncio.run(drive(args, app_url, app.pid, mock_url))
+        finally:
+            for process in (app, mock):
+                if process is not None:
+                    process.terminate()
+                    process.wait(timeout=10)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "app": args.app,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "workers": args.workers,
+            "mock_latency": args.latency,
+            "mock_token_rate": args.token_rate,
+            "mock_answer_tokens": args.answer_tokens,
+            "tts_latency": args.tts_latency
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
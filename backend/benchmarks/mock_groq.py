@@ -0,0 +1,113 @@
+"""
+Local OpenAI-compatible stand-in for the Groq chat completions API.
+
+Answers POST /openai/v1/chat/completions (the Groq SDK path; point
+GROQ_BASE_URL at this server and GROQ_API_URL at the full path) after a
+configurable latency, emitting tokens at a configurable rate. Streaming
+(stream=true) responses are sent as server-sent events.
+
+Run from backend/:  python -m benchmarks.mock_groq [--port 8900] [--latency 0.2] [--token-rate 200]
+"""
+import time
+import json
+import asyncio
+import argparse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+# Canned answer; the first max_tokens words are returned
+ANSWER_WORDS = (
+    "This is a simulated answer from the mock Groq server. It is long enough to cover typical "
+    "responses and contains several sentences. Each word counts as one token for pacing. "
+).split() * 20
+
+
+def create_mock_app(latency: float = 0.2, token_rate: float = 200.0, answer_tokens: int = 60) -> FastAPI:
+    """
+    Build the mock server. latency is the time to first token in seconds;
+    token_rate is tokens per second after that (0 = instant).
+    """
+    app = FastAPI(title="Mock Groq")
+    app.state.requests = 0
+
+    def completion_words(body: dict) -> list:
+        limit = min(int(body.get("max_tokens") or answer_tokens), answer_tokens)
+        return ANSWER_WORDS[:limit]
+
+    def usage(body: dict, completion_tokens: int) -> dict:
+        prompt_tokens = sum(len(str(message.get("content", ""))) // 4 for message in body.get("messages", []))
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    @app.post(COMPLETIONS_PATH)
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        words = completion_words(body)
+        created = int(time.time())
+        model = body.get("model", "mock")
+        await asyncio.sleep(latency)
+
+        if not body.get("stream"):
+            if token_rate:
+                await asyncio.sleep(len(words) / token_rate)
+            return JSONResponse({
+                "id": f"chatcmpl-mock-{app.state.requests}",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage(body, len(words))
+            })
+
+        async def events():
+            for index, word in enumerate(words):
+                chunk = {
+                    "id": f"chatcmpl-mock-{app.state.requests}",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word if index == 0 else " " + word}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if token_rate:
+                    await asyncio.sleep(1 / token_rate)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds to first token")
+    parser.add_argument("--token-rate", type=float, default=200.0, help="tokens per second (0 = instant)")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="tokens per answer")
+    args = parser.parse_args()
+    uvicorn.run(
+        create_mock_app(args.latency, args.token_rate, args.answer_tokens),
+        host=args.host,
+        port=args.port,
+        log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
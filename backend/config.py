@@ -1,4 +1,5 @@
 import os
+import json
 from typing import List
 from dotenv import load_dotenv
 
@@ -8,10 +9,13 @@ load_dotenv()
 class Settings:
     # API Settings
     API_V1_STR: str = os.getenv("API_V1_STR", "/api/v1")
+    PROJECT_NAME: str = os.getenv("PROJECT_NAME", "Inclusive AI Backend")
     
     # Server Settings
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    # Initialize lazily loaded subsystems ahead of traffic: off | background | blocking
+    WARM_UP: str = os.getenv("WARM_UP", "background")
     
     # Groq API Settings
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY")
@@ -19,12 +23,100 @@ class Settings:
     GROQ_MODEL: str = os.getenv("GROQ_MODEL")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "1000"))
     TEMPERATURE: float = float(os.getenv("TEMPERATURE"))
+
+    # Groq Connection Pool Settings
+    GROQ_MAX_CONNECTIONS: int = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    GROQ_KEEPALIVE_EXPIRY: float = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))
+    GROQ_CONNECT_TIMEOUT: float = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+    GROQ_READ_TIMEOUT: float = float(os.getenv("GROQ_READ_TIMEOUT", "60"))
+    GROQ_MAX_RETRIES: int = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+    GROQ_HTTP2: bool = os.getenv("GROQ_HTTP2", "true").lower() == "true"
+
+    # Upstream Admission Control Settings
+    UPSTREAM_MAX_CONCURRENCY: int = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "32"))
+    UPSTREAM_TOKENS_PER_MINUTE: int = int(os.getenv("UPSTREAM_TOKENS_PER_MINUTE", "0"))  # 0 = unlimited
+    # Per-model overrides, e.g. {"llama3-8b-8192": {"concurrency": 8, "tokens_per_minute": 30000}}
+    UPSTREAM_MODEL_LIMITS: dict = json.loads(os.getenv("UPSTREAM_MODEL_LIMITS", "{}"))
+    UPSTREAM_QUEUE_TIMEOUT: float = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "10"))
+    UPSTREAM_DEADLINE: float = float(os.getenv("UPSTREAM_DEADLINE", "60"))
+    UPSTREAM_BACKOFF_BASE: float = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+    UPSTREAM_BACKOFF_MAX: float = float(os.getenv("UPSTREAM_BACKOFF_MAX", "8"))
+    UPSTREAM_BREAKER_THRESHOLD: int = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "5"))
+    UPSTREAM_BREAKER_COOLDOWN: float = float(os.getenv("UPSTREAM_BREAKER_COOLDOWN", "30"))
     
     # Chat Settings
     CHAT_MODEL: str = os.getenv("CHAT_MODEL")
+
+    # Chat Context Settings
+    CHAT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+    CHAT_SUMMARY_TRIGGER: int = int(os.getenv("CHAT_SUMMARY_TRIGGER", "4"))
+    CHAT_SUMMARY_MAX_TOKENS: int = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+
+    # Chat Storage Settings
+    CHAT_STORE_BACKEND: str = os.getenv("CHAT_STORE_BACKEND", "sqlite")  # sqlite | journal
+    CHAT_SQLITE_PATH: str = os.getenv("CHAT_SQLITE_PATH", "chat_sessions.db")
+    CHAT_SQLITE_BUSY_TIMEOUT: float = float(os.getenv("CHAT_SQLITE_BUSY_TIMEOUT", "5"))
+    CHAT_SESSION_CACHE_SIZE: int = int(os.getenv("CHAT_SESSION_CACHE_SIZE", "1000"))  # hot sessions kept in memory
+    CHAT_SESSION_CACHE_BYTES: int = int(os.getenv("CHAT_SESSION_CACHE_BYTES", str(64 * 1024 * 1024)))
+    CHAT_SESSION_IDLE_SECONDS: float = float(os.getenv("CHAT_SESSION_IDLE_SECONDS", "900"))  # evict from memory after
+    CHAT_SESSION_TTL: float = float(os.getenv("CHAT_SESSION_TTL", "0"))  # delete after this long without activity; 0 = never
+    CHAT_SESSION_SWEEP_INTERVAL: float = float(os.getenv("CHAT_SESSION_SWEEP_INTERVAL", "60"))
+    CHAT_STORAGE_PATH: str = os.getenv("CHAT_STORAGE_PATH", "chat_histories.json")
+    CHAT_JOURNAL_FSYNC: str = os.getenv("CHAT_JOURNAL_FSYNC", "interval")
+    CHAT_JOURNAL_FLUSH_INTERVAL: float = float(os.getenv("CHAT_JOURNAL_FLUSH_INTERVAL", "0.05"))
+    CHAT_JOURNAL_MAX_BATCH: int = int(os.getenv("CHAT_JOURNAL_MAX_BATCH", "256"))
+    CHAT_JOURNAL_COMPACT_INTERVAL: float = float(os.getenv("CHAT_JOURNAL_COMPACT_INTERVAL", "300"))
+    CHAT_JOURNAL_COMPACT_BYTES: int = int(os.getenv("CHAT_JOURNAL_COMPACT_BYTES", str(4 * 1024 * 1024)))
     
+    # Moderation Settings
+    # Per-language term lists and refusal rules, compiled into one automaton
+    MODERATION_TERMS_PATH: str = os.getenv(
+        "MODERATION_TERMS_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "data", "moderation_terms.json")
+    )
+    MODERATION_RELOAD_INTERVAL: float = float(os.getenv("MODERATION_RELOAD_INTERVAL", "5"))  # 0 = no hot reload
+
+    # Chat WebSocket Settings
+    CHAT_WS_SEND_QUEUE: int = int(os.getenv("CHAT_WS_SEND_QUEUE", "64"))  # token/audio frames buffered per connection
+    CHAT_WS_MAX_PENDING: int = int(os.getenv("CHAT_WS_MAX_PENDING", "8"))  # queued turns per connection
+    CHAT_WS_PING_INTERVAL: float = float(os.getenv("CHAT_WS_PING_INTERVAL", "20"))
+    CHAT_WS_IDLE_TIMEOUT: float = float(os.getenv("CHAT_WS_IDLE_TIMEOUT", "60"))  # close after this long without client frames
+
+    # Language Detection Settings
+    LANGUAGE_DETECT_CACHE_SIZE: int = int(os.getenv("LANGUAGE_DETECT_CACHE_SIZE", "4096"))
+
+    # Translation Cache Settings
+    TRANSLATION_CACHE_SIZE: int = int(os.getenv("TRANSLATION_CACHE_SIZE", "10000"))
+    TRANSLATION_CACHE_TTL: float = float(os.getenv("TRANSLATION_CACHE_TTL", "86400"))
+    TRANSLATION_CACHE_DB: str = os.getenv("TRANSLATION_CACHE_DB", "")
+
+    # Batch Translation Settings
+    TRANSLATION_BATCH_MAX_CHARS: int = int(os.getenv("TRANSLATION_BATCH_MAX_CHARS", "1500"))
+    TRANSLATION_BATCH_MAX_SEGMENTS: int = int(os.getenv("TRANSLATION_BATCH_MAX_SEGMENTS", "20"))
+    TRANSLATION_BATCH_CONCURRENCY: int = int(os.getenv("TRANSLATION_BATCH_CONCURRENCY", "4"))
+
+    # Text-to-Speech Cache Settings
+    TTS_CACHE_DIR: str = os.getenv("TTS_CACHE_DIR", "tts_cache")
+    TTS_CACHE_MAX_BYTES: int = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    TTS_STREAM_CONCURRENCY: int = int(os.getenv("TTS_STREAM_CONCURRENCY", "3"))
+
+    # Speech-to-Text Settings
+    STT_RECOGNIZER: str = os.getenv("STT_RECOGNIZER", "google")
+    STT_MAX_UPLOAD_BYTES: int = int(os.getenv("STT_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+    STT_MAX_CHUNK_SECONDS: float = float(os.getenv("STT_MAX_CHUNK_SECONDS", "15"))
+    STT_MIN_CHUNK_SECONDS: float = float(os.getenv("STT_MIN_CHUNK_SECONDS", "3"))
+    STT_MIN_SILENCE_SECONDS: float = float(os.getenv("STT_MIN_SILENCE_SECONDS", "0.3"))
+    STT_SILENCE_THRESHOLD_DB: float = float(os.getenv("STT_SILENCE_THRESHOLD_DB", "-30"))  # relative to the clip's loud level
+
+    # Executor Pool Settings (blocking stages run off the event loop)
+    EXECUTOR_TTS_WORKERS: int = int(os.getenv("EXECUTOR_TTS_WORKERS", "8"))    # gTTS, network-bound
+    EXECUTOR_STT_WORKERS: int = int(os.getenv("EXECUTOR_STT_WORKERS", "4"))    # speech recognition
+    EXECUTOR_STT_KIND: str = os.getenv("EXECUTOR_STT_KIND", "thread")          # "thread" or "process"
+    EXECUTOR_IO_WORKERS: int = int(os.getenv("EXECUTOR_IO_WORKERS", "4"))      # file and journal I/O
+
     # CORS Settings
-    ALLOW_ORIGINS: List[str] = os.getenv("ALLOW_ORIGINS", "*").split(",")
+    ALLOW_ORIGINS: List[str] = os.getenv("ALLOW_ORIGINS", os.getenv("CORS_ORIGINS", "*")).split(",")
     
     # Gesture Recognition Settings
     GESTURE_CONFIDENCE_THRESHOLD: float = float(os.getenv("GESTURE_CONFIDENCE_THRESHOLD"))
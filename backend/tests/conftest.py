@@ -0,0 +1,14 @@
+import os
+import sys
+
+# config.py reads these without defaults; the values do not matter to the tests
+for name, value in {
+    "TEMPERATURE": "0.7",
+    "GESTURE_CONFIDENCE_THRESHOLD": "0.5",
+    "SWIPE_THRESHOLD": "0.5",
+    "GROQ_API_KEY": "test",
+    "GROQ_MODEL": "test-model",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
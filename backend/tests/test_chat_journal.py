@@ -0,0 +1,97 @@
+import os
+import threading
+from app.services.chatJournal import ChatJournal
+
+
+def open_journal(tmp_path, **kwargs):
+    return ChatJournal(str(tmp_path / "chat_sessions.json"), fsync_policy="never", compact_interval=0, **kwargs)
+
+
+def message(content):
+    return {"role": "user", "content": content, "time": "12:00"}
+
+
+def test_replay_restores_state(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append_messages("s", [message("a"), message("b"), message("c")])
+    journal.edit_message("s", 1, {"content": "B"})
+    journal.set_summary("s", "summary", 1)
+    journal.replace_messages("s", 2, [message("d")])
+    journal.append_message("gone", message("x"))
+    journal.delete_session("gone")
+    journal.close()
+
+    journal = open_journal(tmp_path)
+    assert [m["content"] for m in journal.get_messages("s")] == ["a", "B", "d"]
+    assert journal.get_session("s")["summary"] == "summary"
+    assert not journal.session_exists("gone")
+    journal.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append_messages("s", [message("a"), message("b")])
+    journal.close()
+    size = os.path.getsize(journal.journal_path)
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "append", "sid": "s", "msg": {"content": "c"')
+
+    journal = open_journal(tmp_path)
+    assert [m["content"] for m in journal.get_messages("s")] == ["a", "b"]
+    assert os.path.getsize(journal.journal_path) == size
+    # New records land after the truncated tail and replay cleanly
+    journal.append_message("s", message("c"))
+    journal.close()
+    journal = open_journal(tmp_path)
+    assert [m["content"] for m in journal.get_messages("s")] == ["a", "b", "c"]
+    journal.close()
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append_messages("s", [message("a"), message("b")])
+    journal.compact()
+    assert os.path.getsize(journal.journal_path) == 0
+    assert not os.path.exists(journal.rotated_path)
+    journal.append_message("s", message("c"))
+    journal.close()
+
+    journal = open_journal(tmp_path)
+    assert [m["content"] for m in journal.get_messages("s")] == ["a", "b", "c"]
+    journal.close()
+
+
+def test_conditional_writes_are_atomic_with_truncation(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append_messages("s", [message(str(index)) for index in range(4)])
+    errors = []
+    stop = threading.Event()
+
+    def edit():
+        try:
+            while not stop.is_set():
+                for index in range(4):
+                    edited = journal.edit_message("s", index, {"content": "edited"})
+                    assert edited is None or edited["content"] == "edited"
+        except Exception as e:
+            errors.append(e)
+
+    def truncate():
+        try:
+            for _ in range(2000):
+                count = journal.replace_messages("s", 1, [])
+                assert count == 1
+                count = journal.replace_messages("s", 1, [message("1"), message("2"), message("3")])
+                assert count == 4
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stop.set()
+
+    threads = [threading.Thread(target=edit), threading.Thread(target=truncate)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.close()
+    assert errors == []
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+from config import settings
+from app.factory import create_app
+from app.services import chatService
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    async def fake_generate_response(self, query, chat_history, summary=""):
+        return f"Answer {len(chat_history) // 2}"
+
+    monkeypatch.setattr(settings, "CHAT_STORE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "CHAT_SQLITE_PATH", str(tmp_path / "chat_sessions.db"))
+    monkeypatch.setattr(chatService, "get_async_groq", lambda: None)
+    monkeypatch.setattr(chatService, "start_synthesis", lambda text, lang, slow=False: f"audio-{text}")
+    monkeypatch.setattr(chatService.AsyncChatService, "generate_response", fake_generate_response)
+    monkeypatch.setattr(chatService, "_chat_service", None)
+    yield TestClient(create_app(warm_up="off"))
+    chatService.close_chat_service()
+
+
+def test_voice_query_in_default_history_mode(client):
+    response = client.post(f"{settings.API_V1_STR}/voice-query/", json={"query": "Hello there"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["text_response"] == "Answer 0"
+    assert body["message_count"] == 2
+    assert [message["content"] for message in body["chat_history"]] == ["Hello there", "Answer 0"]
+    assert body["audio_id"] == "audio-Answer 0"
+    assert body["audio_url"] == f"{settings.API_V1_STR}/chat-history/{body['session_id']}/messages/1/audio"
+
+    response = client.post(
+        f"{settings.API_V1_STR}/voice-query/",
+        json={"query": "And again", "session_id": body["session_id"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["audio_url"].endswith("/messages/3/audio")
+
+
+def test_request_metrics_are_labelled_by_route_template(client):
+    from app.services.metrics import http_seconds
+
+    client.get(f"{settings.API_V1_STR}/chat-history/unknown/messages/1/audio")
+    # A parameter value equal to a path segment must not be templated back into the label
+    client.get(f"{settings.API_V1_STR}/chat-history/chat-history")
+    client.get("/no-such-route")
+
+    routes = {labels[1] for labels in http_seconds._series}
+    assert routes >= {
+        f"{settings.API_V1_STR}/chat-history/{{session_id}}/messages/{{message_index}}/audio",
+        f"{settings.API_V1_STR}/chat-history/{{session_id}}",
+        "unmatched"
+    }
+    assert f"{settings.API_V1_STR}/{{session_id}}/{{session_id}}" not in routes
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from config import settings
+from app.services import chatService
+from app.services.contextBuilder import message_tokens
+
+
+def turn(index):
+    return [
+        {"role": "user", "content": f"question {index}", "time": "12:00"},
+        {"role": "assistant", "content": f"answer {index}", "time": "12:00"}
+    ]
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.prompts = []
+        self.before_reply = None
+
+    async def create(self, messages, **kwargs):
+        self.prompts.append(messages)
+        if self.before_reply is not None:
+            self.before_reply()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="the summary"))], usage=None)
+
+
+@pytest.fixture(params=["sqlite", "journal"])
+def service(request, monkeypatch, tmp_path):
+    completions = FakeCompletions()
+    monkeypatch.setattr(settings, "CHAT_STORE_BACKEND", request.param)
+    monkeypatch.setattr(settings, "CHAT_SQLITE_PATH", str(tmp_path / "chat_sessions.db"))
+    monkeypatch.setattr(settings, "CHAT_STORAGE_PATH", str(tmp_path / "chat_sessions.json"))
+    # Room for three turns
+    monkeypatch.setattr(settings, "CHAT_HISTORY_TOKEN_BUDGET", 3 * sum(message_tokens(m) for m in turn(0)))
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_TRIGGER", 4)
+    monkeypatch.setattr(chatService, "get_async_groq", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    service = chatService.AsyncChatService()
+    service.completions = completions
+    yield service
+    service.store.close()
+
+
+def test_prompt_history_starts_where_the_summary_ends(service):
+    for index in range(3):
+        service.store.append_messages("s", turn(index))
+    service.store.set_summary("s", "first turn", 2)
+
+    _, history, summary = service._turn_context("s")
+    assert summary == "first turn"
+    assert [m["content"] for m in history] == ["question 1", "answer 1", "question 2", "answer 2"]
+    messages, _ = service._build_messages("question 3", history, summary)
+    assert [m["content"] for m in messages[1:]] == ["question 1", "answer 1", "question 2", "answer 2", "question 3"]
+
+
+def test_refresh_folds_every_message_before_the_window(service):
+    for index in range(4):
+        service.store.append_messages("s", turn(index))
+    # Three turns fit, so only the first has left the window
+    asyncio.run(service._refresh_summary("s"))
+
+    session = service.store.get_session("s")
+    assert session["summary"] == "the summary"
+    # The window start plus CHAT_SUMMARY_TRIGGER messages, keeping the last exchange
+    assert session["summary_upto"] == 6
+    folded = service.completions.prompts[0][1]["content"]
+    assert "question 0" in folded and "answer 2" in folded and "question 3" not in folded
+
+    # Everything after summary_upto fits again, so the next turn needs no refresh
+    service.store.append_messages("s", turn(4))
+    asyncio.run(service._refresh_summary("s"))
+    assert len(service.completions.prompts) == 1
+
+
+def test_summary_of_an_edited_session_is_discarded(service):
+    for index in range(4):
+        service.store.append_messages("s", turn(index))
+    service.completions.before_reply = lambda: service.store.replace_messages("s", 2, turn(9))
+
+    asyncio.run(service._refresh_summary("s"))
+    session = service.store.get_session("s")
+    assert session["summary"] == ""
+    assert session["summary_upto"] == 0
+
+
+def test_scheduled_refresh_is_held_until_done(service):
+    for index in range(4):
+        service.store.append_messages("s", turn(index))
+
+    async def scenario():
+        service._schedule_summary("s")
+        task = service._summarizing["s"]
+        # A second turn while the refresh runs does not start another
+        service._schedule_summary("s")
+        assert service._summarizing["s"] is task
+        await task
+        await asyncio.sleep(0)
+        assert service._summarizing == {}
+
+    asyncio.run(scenario())
+    assert service.store.get_session("s")["summary"] == "the summary"
+    assert len(service.completions.prompts) == 1
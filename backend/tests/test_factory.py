@@ -0,0 +1,29 @@
+from fastapi.testclient import TestClient
+from app import factory
+from app.services import chatService, executors, groqClient
+from app.services.translationService import translation_cache
+
+
+def test_lifespan_sets_up_and_tears_down(monkeypatch, tmp_path):
+    calls = []
+
+    async def close_clients():
+        calls.append("close_clients")
+
+    monkeypatch.setattr(factory, "STATIC_DIR", str(tmp_path / "static"))
+    monkeypatch.setattr(factory, "start_warm_up", lambda mode: calls.append(f"warm_up:{mode}"))
+    monkeypatch.setattr(groqClient, "close_clients", close_clients)
+    monkeypatch.setattr(executors, "shutdown_executors", lambda: calls.append("shutdown_executors"))
+    monkeypatch.setattr(chatService, "close_chat_service", lambda: calls.append("close_chat_service"))
+    monkeypatch.setattr(translation_cache, "close", lambda: calls.append("translation_cache"))
+
+    app = factory.create_app(warm_up="background")
+    # Building the app has no side effects
+    assert not (tmp_path / "static").exists()
+    assert calls == []
+
+    with TestClient(app) as client:
+        assert (tmp_path / "static").is_dir()
+        assert calls == ["warm_up:background"]
+        assert client.get("/").status_code == 200
+    assert calls == ["warm_up:background", "close_clients", "shutdown_executors", "close_chat_service", "translation_cache"]
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from app.services import translationService
+from app.services.llmGateway import LLMGatewayError
+
+
+def completion(content: str):
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def run_batch(monkeypatch, reply, segments):
+    prompts = []
+
+    async def fake_completion(prompt, priority):
+        prompts.append(prompt)
+        return reply(prompt)
+
+    monkeypatch.setattr(translationService, "_scheduled_completion", fake_completion)
+    result = asyncio.run(translationService.translate_batch(segments, "English", ["Hindi"], bypass_cache=True))
+    return result, prompts
+
+
+def test_overload_is_raised_without_per_segment_retries(monkeypatch):
+    def reply(prompt):
+        raise LLMGatewayError("Upstream overloaded, request shed", status_code=503, retryable=True)
+
+    with pytest.raises(LLMGatewayError) as error:
+        run_batch(monkeypatch, reply, ["overload one", "overload two", "overload three"])
+    assert error.value.status_code == 503
+
+
+def test_failed_pack_reports_errors_without_per_segment_retries(monkeypatch):
+    def reply(prompt):
+        raise LLMGatewayError("Unexpected response format from Groq API", status_code=502)
+
+    (result,), prompts = run_batch(monkeypatch, reply, ["failed one", "failed two"])
+    assert len(prompts) == 1
+    assert [entry["error"]["error"] for entry in result["translations"]] == ["Unexpected response format from Groq API"] * 2
+
+
+def test_unparseable_pack_falls_back_per_segment(monkeypatch):
+    def reply(prompt):
+        return completion("not a json array")
+
+    (result,), prompts = run_batch(monkeypatch, reply, ["garbled one", "garbled two"])
+    assert len(prompts) == 3
+    assert all(entry["translated_text"] == "not a json array" for entry in result["translations"])
@@ -0,0 +1,26 @@
+import asyncio
+from app.services.translationCache import TranslationCache
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "translations.db")
+    cache = TranslationCache(max_entries=10, db_path=db_path, flush_interval=60)
+    cache.put("k1", "one")
+    # Queued, not yet written: still served from memory
+    assert cache.get_stats()["pending_writes"] == 1
+    assert cache.get("k1") == "one"
+    cache.close()
+
+    reopened = TranslationCache(max_entries=10, db_path=db_path)
+    assert asyncio.run(reopened.lookup(["k1", "k2"])) == {"k1": "one"}
+    stats = reopened.get_stats()
+    assert stats["disk_hits"] == 1 and stats["misses"] == 1
+    reopened.close()
+
+
+def test_lookup_finds_queued_writes_evicted_from_memory(tmp_path):
+    cache = TranslationCache(max_entries=1, db_path=str(tmp_path / "translations.db"), flush_interval=60)
+    cache.put("k1", "one")
+    cache.put("k2", "two")
+    assert asyncio.run(cache.lookup(["k1", "k2"])) == {"k1": "one", "k2": "two"}
+    cache.close()
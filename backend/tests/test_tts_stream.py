@@ -0,0 +1,60 @@
+import time
+import asyncio
+from app.services import ttsService
+
+
+async def slow_sentences(count: int, interval: float):
+    for index in range(count):
+        await asyncio.sleep(interval)
+        yield f"Sentence {index}."
+
+
+def test_first_clip_does_not_wait_for_later_sentences(monkeypatch):
+    async def fake_synthesize(text, lang, slow=False):
+        await asyncio.sleep(0.05)
+        return text, text
+
+    async def fake_read_file(path):
+        return path.encode()
+
+    monkeypatch.setattr(ttsService, "get_or_synthesize", fake_synthesize)
+    monkeypatch.setattr(ttsService, "read_file", fake_read_file)
+
+    async def scenario():
+        started = time.perf_counter()
+        arrivals = []
+        async for clip in ttsService.stream_speech(slow_sentences(4, 0.2), "en", concurrency=3):
+            arrivals.append((clip, time.perf_counter() - started))
+        return arrivals
+
+    arrivals = asyncio.run(scenario())
+    assert [clip for clip, _ in arrivals] == [f"Sentence {index}.".encode() for index in range(4)]
+    # Sentence 0 is read at ~0.2 s and synthesized by ~0.25 s, long before sentence 2 exists
+    assert arrivals[0][1] < 0.4
+    for index, (_, arrived) in enumerate(arrivals):
+        assert arrived < 0.2 * (index + 1) + 0.2
+
+
+def test_concurrency_limits_synthesis_in_flight(monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_synthesize(text, lang, slow=False):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return text, text
+
+    async def fake_read_file(path):
+        return path.encode()
+
+    monkeypatch.setattr(ttsService, "get_or_synthesize", fake_synthesize)
+    monkeypatch.setattr(ttsService, "read_file", fake_read_file)
+
+    async def scenario():
+        return [clip async for clip in ttsService.stream_speech([f"S{index}." for index in range(10)], "en", concurrency=2)]
+
+    assert asyncio.run(scenario()) == [f"S{index}.".encode() for index in range(10)]
+    assert peak == 2
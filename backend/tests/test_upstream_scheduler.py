@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from config import settings
+from app.services.llmGateway import LLMGatewayError
+from app.services.upstreamScheduler import PRIORITY_STANDARD, UpstreamScheduler
+
+
+def open_breaker(scheduler: UpstreamScheduler, model: str) -> None:
+    """Trip the model's breaker and let its cooldown run out, so the next call is the trial"""
+    limiter = scheduler.limiter(model)
+    for _ in range(settings.UPSTREAM_BREAKER_THRESHOLD):
+        limiter.record_failure()
+    limiter.open_until = 1.0
+
+
+async def ok() -> str:
+    return "ok"
+
+
+async def bad_request() -> str:
+    raise LLMGatewayError("Upstream error 400", status_code=400, upstream_status=400)
+
+
+def test_non_retryable_trial_closes_breaker():
+    async def scenario():
+        scheduler = UpstreamScheduler()
+        open_breaker(scheduler, "m")
+        with pytest.raises(LLMGatewayError) as error:
+            await scheduler.run("m", PRIORITY_STANDARD, 10, bad_request)
+        assert error.value.status_code == 400
+        # Upstream answered, so later calls go through
+        for _ in range(3):
+            assert await scheduler.run("m", PRIORITY_STANDARD, 10, ok) == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_trial_allows_another_trial():
+    async def scenario():
+        scheduler = UpstreamScheduler()
+        open_breaker(scheduler, "m")
+        started = asyncio.Event()
+
+        async def hang() -> str:
+            started.set()
+            await asyncio.sleep(60)
+            return "late"
+
+        trial = asyncio.create_task(scheduler.run("m", PRIORITY_STANDARD, 10, hang))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert await scheduler.run("m", PRIORITY_STANDARD, 10, ok) == "ok"
+        assert not scheduler.limiter("m").get_stats()["breaker_open"]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_streaming_trial_allows_another_trial():
+    async def scenario():
+        scheduler = UpstreamScheduler()
+        open_breaker(scheduler, "m")
+
+        async def stream() -> None:
+            async with scheduler.admit("m", PRIORITY_STANDARD, 10):
+                await asyncio.sleep(60)
+
+        trial = asyncio.create_task(stream())
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        async with scheduler.admit("m", PRIORITY_STANDARD, 10):
+            pass
+        assert scheduler.limiter("m").get_stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
@@ -91,6 +91,9 @@ const Chatbot = () => {
             time: new Date().toLocaleTimeString()
         };
         
+        // Only ask the server for messages we don't have yet
+        const lastIndex = currentSessionId ? chatHistory.length - 1 : null;
+        
         setChatHistory(prev => [...prev, userMessage]);
         setTextInput('');
         setIsLoading(true);
@@ -102,7 +105,9 @@ const Chatbot = () => {
                 body: JSON.stringify({ 
                     query, 
                     session_id: currentSessionId, 
-                    output_as_voice: false 
+                    output_as_voice: false,
+                    history_mode: "delta",
+                    last_index: lastIndex
                 })
             });
             
@@ -112,8 +117,11 @@ const Chatbot = () => {
             
             const data = await response.json();
             
-            if (data.text_response) {
-                setChatHistory(data.chat_history);
+            if (data.text_response && data.chat_history_delta) {
+                setChatHistory(prev => [
+                    ...prev.slice(0, data.history_start),
+                    ...data.chat_history_delta
+                ]);
             }
             
             setCurrentSessionId(data.session_id);
@@ -169,13 +177,17 @@ const Chatbot = () => {
         if (!newContent || newContent === originalContent) return;
         
         try {
-            const response = await fetch(`${baseUrl}/edit-message/`, {
+            // Editing a user message regenerates the answer in the same request,
+            // replacing the old answer and everything after it
+            const regenerate = chatHistory[messageIndex]?.role === "user";
+            const response = await fetch(`${baseUrl}/edit-message/${regenerate ? "regenerate" : ""}`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({
                     session_id: currentSessionId,
                     message_index: messageIndex,
-                    new_content: newContent
+                    new_content: newContent,
+                    history_mode: "delta"
                 })
             });
             
@@ -185,26 +197,13 @@ const Chatbot = () => {
             
             const data = await response.json();
             
-            if (data.status === "success") {
-                setChatHistory(data.chat_history);
-                
-                // If we edited a user message, we need to regenerate the AI response
-                if (messageIndex % 2 === 0) { // User messages are at even indices
-                    const response = await fetch(`${baseUrl}/text-query/`, {
-                        method: "POST",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify({
-                            query: newContent,
-                            session_id: currentSessionId,
-                            output_as_voice: false
-                        })
-                    });
-                    
-                    if (response.ok) {
-                        const data = await response.json();
-                        setChatHistory(data.chat_history);
-                    }
-                }
+            if (data.chat_history_delta) {
+                setChatHistory(prev => [
+                    ...prev.slice(0, data.history_start),
+                    ...data.chat_history_delta
+                ]);
+            } else if (data.status === "success" && data.message) {
+                setChatHistory(prev => prev.map((msg, index) => index === data.message_index ? data.message : msg));
             }
         } catch (error) {
             console.error("Error editing message:", error);
@@ -229,13 +228,10 @@ const Chatbot = () => {
             
             const data = await response.json();
             
-            if (data.audio_response) {
-                const audioBlob = base64ToBlob(data.audio_response, 'audio/mpeg');
-                const audioUrl = URL.createObjectURL(audioBlob);
-                
-                // Play audio using HTML audio element
+            if (data.audio_url) {
+                // Play audio using HTML audio element; the browser streams it from the API
                 if (audioPlayerRef.current) {
-                    audioPlayerRef.current.src = audioUrl;
+                    audioPlayerRef.current.src = data.audio_url;
                     audioPlayerRef.current.style.display = 'block';
                     audioPlayerRef.current.play().catch(err => console.error("Audio play error:", err));
                     
@@ -252,17 +248,6 @@ const Chatbot = () => {
         }
     };
 
-    // Helper function to convert base64 to Blob
-    const base64ToBlob = (base64, mimeType) => {
-        const byteCharacters = atob(base64);
-        const byteNumbers = new Array(byteCharacters.length);
-        for (let i = 0; i < byteCharacters.length; i++) {
-            byteNumbers[i] = byteCharacters.charCodeAt(i);
-        }
-        const byteArray = new Uint8Array(byteNumbers);
-        return new Blob([byteArray], { type: mimeType });
-    };
-
     // Format text with HTML (code blocks, lists, etc)
     const formatTextToHtml = (text) => {
         // Split text into lines